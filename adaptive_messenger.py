@@ -1,12 +1,20 @@
 import asyncio
 import json
-import time
 import uuid
 import threading
-from typing import Dict, List, Optional, Set
+import sys
+from array import array
+from typing import Callable, Dict, List, Optional, Set
 from dataclasses import dataclass, asdict
 from enum import Enum
 import hashlib
+from clock import get_clock
+from dedup_cache import DedupCache
+from event_log import ERROR, INFO, NULL_LOG, WARNING, EventLog, get_event_log
+from message_scheduler import MessageScheduler
+from routing_table import DistanceVectorTable, RoutingTable
+from sim_random import get_rng
+from transmission_batcher import TransmissionBatcher
 
 class NetworkType(Enum):
     WIFI = "wifi"
@@ -18,35 +26,499 @@ class NetworkType(Enum):
     CELLULAR = "cellular"
     RADIO = "radio"
 
-@dataclass
+class NodeRegistry:
+    """Interna ids de dispositivos como inteiros pequenos (compartilhado pelo processo)"""
+    
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+    
+    def intern(self, name: str) -> int:
+        node = self._ids.get(name)
+        if node is None:
+            node = len(self._names)
+            name = sys.intern(name)
+            self._ids[name] = node
+            self._names.append(name)
+        return node
+    
+    def name(self, node: int) -> str:
+        return self._names[node]
+    
+    def __len__(self) -> int:
+        return len(self._names)
+
+NODE_IDS = NodeRegistry()
+
+class _PathSegment:
+    """Prefixo congelado de um caminho, compartilhado entre clones"""
+    __slots__ = ('parent', 'hops', 'length')
+    
+    def __init__(self, parent: Optional['_PathSegment'], hops: array):
+        self.parent = parent
+        self.hops = hops
+        self.length = len(hops) + (parent.length if parent else 0)
+
+class NodePath:
+    """
+    Caminho da mensagem como array de ids internados, com interface de lista de strings.
+    
+    copy() é O(1): os saltos atuais viram um prefixo congelado compartilhado
+    (ponteiro para o pai) e cada cópia passa a acrescentar apenas no seu array.
+    """
+    __slots__ = ('_parent', '_hops')
+    
+    def __init__(self, nodes=()):
+        self._parent: Optional[_PathSegment] = None
+        self._hops = array('I', [NODE_IDS.intern(node) for node in nodes])
+    
+    def append(self, node: str):
+        self._hops.append(NODE_IDS.intern(node))
+    
+    def extend(self, nodes):
+        for node in nodes:
+            self.append(node)
+    
+    def copy(self) -> 'NodePath':
+        if self._hops:
+            self._parent = _PathSegment(self._parent, self._hops)
+            self._hops = array('I')
+        path = NodePath.__new__(NodePath)
+        path._parent = self._parent
+        path._hops = array('I')
+        return path
+    
+    def _ids(self) -> List[int]:
+        """Ids do caminho completo, do início ao fim"""
+        segments = []
+        segment = self._parent
+        while segment is not None:
+            segments.append(segment.hops)
+            segment = segment.parent
+        
+        ids = []
+        for hops in reversed(segments):
+            ids.extend(hops)
+        ids.extend(self._hops)
+        return ids
+    
+    def __iter__(self):
+        names = NODE_IDS._names
+        for node in self._ids():
+            yield names[node]
+    
+    def __len__(self) -> int:
+        return len(self._hops) + (self._parent.length if self._parent else 0)
+    
+    def __getitem__(self, index):
+        if index == -1 and self._hops:
+            return NODE_IDS.name(self._hops[-1])
+        if isinstance(index, slice):
+            return [NODE_IDS.name(node) for node in self._ids()[index]]
+        return NODE_IDS.name(self._ids()[index])
+    
+    def __contains__(self, node: str) -> bool:
+        node_id = NODE_IDS._ids.get(node)
+        if node_id is None:
+            return False
+        if node_id in self._hops:
+            return True
+        segment = self._parent
+        while segment is not None:
+            if node_id in segment.hops:
+                return True
+            segment = segment.parent
+        return False
+    
+    def __eq__(self, other) -> bool:
+        return list(self) == list(other)
+    
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+class DecayedCounter:
+    """Contador com decaimento exponencial (meia-vida em segundos)"""
+    __slots__ = ('value', 'updated_at')
+    
+    def __init__(self, value: float = 0.0, updated_at: float = 0.0):
+        self.value = value
+        self.updated_at = updated_at
+    
+    def get(self, now: float, half_life: float) -> float:
+        if self.value == 0.0:
+            return 0.0
+        return self.value * 0.5 ** ((now - self.updated_at) / half_life)
+    
+    def add(self, amount: float, now: float, half_life: float):
+        self.value = self.get(now, half_life) + amount
+        self.updated_at = now
+
+class RouteStats:
+    """
+    Agregados de aprendizado de rota de tamanho fixo.
+    
+    Guarda contadores de sucesso com decaimento exponencial por tipo de rede
+    e por próximo salto (limitados a MAX_HOPS vizinhos), totais de tentativas
+    e uma roda de tempo de falhas recentes indexada por próximo salto, de modo
+    que a pontuação de cada rota candidata é O(1) e a memória não cresce
+    com o número de tentativas.
+    """
+    __slots__ = ('half_life', 'successes', 'failures', '_network', '_hops',
+                 '_failed_at', '_wheel', '_wheel_start')
+    
+    MAX_HOPS = 16           # Próximos saltos acompanhados
+    FAILURE_WINDOW = 60.0   # Falha "recente" (segundos)
+    WHEEL_SLOTS = 6         # Fatias da roda de falhas
+    
+    def __init__(self, half_life: float = 300.0):
+        self.half_life = half_life
+        self.successes = 0
+        self.failures = 0
+        self._network: Dict[str, DecayedCounter] = {}   # tipo de rede -> sucessos decaídos
+        self._hops: Dict[str, DecayedCounter] = {}      # próximo salto -> sucessos decaídos
+        self._failed_at: Dict[str, float] = {}          # próximo salto -> última falha
+        self._wheel: List[Optional[Set[str]]] = [None] * self.WHEEL_SLOTS
+        self._wheel_start = 0  # Índice absoluto da fatia mais antiga ainda na roda
+    
+    def copy(self) -> 'RouteStats':
+        """Cópia de custo limitado (todos os agregados têm tamanho fixo)"""
+        learning = RouteStats(self.half_life)
+        learning.successes = self.successes
+        learning.failures = self.failures
+        learning._network = {k: DecayedCounter(c.value, c.updated_at) for k, c in self._network.items()}
+        learning._hops = {k: DecayedCounter(c.value, c.updated_at) for k, c in self._hops.items()}
+        learning._failed_at = dict(self._failed_at)
+        learning._wheel = [set(slot) if slot else None for slot in self._wheel]
+        learning._wheel_start = self._wheel_start
+        return learning
+    
+    def record_attempt(self, network_type: Optional[str], next_hop: Optional[str],
+                       success: bool, now: Optional[float] = None):
+        """Registra o resultado de uma tentativa (sucesso aumenta a preferência pelo tipo de rede)"""
+        if now is None:
+            now = get_clock().time()
+        
+        if success:
+            self.successes += 1
+            if network_type is not None:
+                self.add_preference(network_type, now=now)
+            if next_hop is not None:
+                counter = self._hops.get(next_hop)
+                if counter is None:
+                    if len(self._hops) >= self.MAX_HOPS:
+                        self._evict_weakest_hop(now)
+                    counter = self._hops[next_hop] = DecayedCounter()
+                counter.add(1.0, now, self.half_life)
+        else:
+            self.failures += 1
+            if next_hop is not None:
+                self._record_failure(next_hop, now)
+    
+    def add_preference(self, network_type: str, amount: float = 1.0, now: Optional[float] = None):
+        counter = self._network.get(network_type)
+        if counter is None:
+            counter = self._network[network_type] = DecayedCounter()
+        counter.add(amount, get_clock().time() if now is None else now, self.half_life)
+    
+    def preference(self, network_type: str, now: float) -> float:
+        """Sucessos decaídos de um tipo de rede - O(1)"""
+        counter = self._network.get(network_type)
+        return counter.get(now, self.half_life) if counter else 0.0
+    
+    def hop_score(self, next_hop: str, now: float) -> float:
+        """Sucessos decaídos por um próximo salto - O(1)"""
+        counter = self._hops.get(next_hop)
+        return counter.get(now, self.half_life) if counter else 0.0
+    
+    def recently_failed(self, next_hop: str, now: float) -> bool:
+        """Se o próximo salto falhou na última FAILURE_WINDOW - O(1)"""
+        failed_at = self._failed_at.get(next_hop)
+        return failed_at is not None and now - failed_at < self.FAILURE_WINDOW
+    
+    def has_preferences(self) -> bool:
+        return bool(self._network)
+    
+    def preferences_at(self, now: float) -> Dict[str, float]:
+        """Sucessos decaídos por tipo de rede no instante `now` (só leitura)"""
+        return {network_type: counter.get(now, self.half_life) for network_type, counter in self._network.items()}
+    
+    def failures_at(self, now: float) -> Dict[str, float]:
+        """Falhas dentro da janela no instante `now` (só leitura: não gira a roda)"""
+        return {hop: at for hop, at in self._failed_at.items() if now - at < self.FAILURE_WINDOW}
+    
+    @property
+    def network_preferences(self) -> Dict[str, float]:
+        return self.preferences_at(get_clock().time())
+    
+    @property
+    def recent_failures(self) -> Dict[str, float]:
+        return self.failures_at(get_clock().time())
+    
+    @property
+    def attempts(self) -> int:
+        return self.successes + self.failures
+    
+    def to_dict(self, now: Optional[float] = None) -> Dict:
+        if now is None:
+            now = get_clock().time()
+        return {
+            'successes': self.successes,
+            'failures': self.failures,
+            'network_preferences': self.preferences_at(now),
+            'next_hop_scores': {hop: counter.get(now, self.half_life) for hop, counter in self._hops.items()},
+            'recent_failures': self.failures_at(now)
+        }
+    
+    def _slot_index(self, timestamp: float) -> int:
+        return int(timestamp // (self.FAILURE_WINDOW / self.WHEEL_SLOTS))
+    
+    def _record_failure(self, next_hop: str, now: float):
+        self._advance_wheel(now)
+        self._failed_at[next_hop] = now
+        slot = self._slot_index(now) % self.WHEEL_SLOTS
+        if self._wheel[slot] is None:
+            self._wheel[slot] = set()
+        self._wheel[slot].add(next_hop)
+    
+    def _advance_wheel(self, now: float):
+        """Esvazia as fatias que saíram da janela, esquecendo falhas antigas"""
+        current = self._slot_index(now)
+        oldest_valid = current - self.WHEEL_SLOTS + 1
+        if self._wheel_start >= oldest_valid:
+            return
+        
+        for index in range(self._wheel_start, min(oldest_valid, self._wheel_start + self.WHEEL_SLOTS)):
+            slot = index % self.WHEEL_SLOTS
+            hops = self._wheel[slot]
+            if hops:
+                for hop in hops:
+                    failed_at = self._failed_at.get(hop)
+                    if failed_at is not None and self._slot_index(failed_at) < oldest_valid:
+                        del self._failed_at[hop]
+            self._wheel[slot] = None
+        
+        self._wheel_start = oldest_valid
+    
+    def _evict_weakest_hop(self, now: float):
+        weakest = min(self._hops, key=lambda hop: self._hops[hop].get(now, self.half_life))
+        del self._hops[weakest]
+
+class LearningData:
+    """
+    Camada de aprendizado de uma mensagem sobre agregados compartilhados.
+    
+    Clones compartilham o mesmo RouteStats (copiado só na primeira escrita
+    de qualquer um dos lados) e cada camada guarda as próprias dicas de
+    destino em uma tupla imutável. Aceita acesso estilo dicionário às chaves
+    'network_preferences' e 'destination_hints'.
+    """
+    __slots__ = ('_stats', '_shared', 'hints')
+    
+    MAX_HINTS = 8  # Dicas de destino guardadas
+    
+    def __init__(self, stats: Optional[RouteStats] = None, hints: tuple = ()):
+        self._stats = stats if stats is not None else RouteStats()
+        self._shared = False
+        self.hints = hints
+    
+    @classmethod
+    def from_dict(cls, data: Dict, now: Optional[float] = None) -> 'LearningData':
+        learning = cls()
+        stats = learning._stats
+        if now is None:
+            now = get_clock().time()
+        for network_type, count in data.get('network_preferences', {}).items():
+            stats.add_preference(network_type, float(count), now)
+        for route_info in data.get('successful_routes', []):
+            stats.record_attempt(None, route_info.get('next_hop'), True, route_info.get('timestamp', now))
+        for route_info in data.get('failed_routes', []):
+            stats.record_attempt(None, route_info.get('next_hop'), False, route_info.get('timestamp', now))
+        for node in data.get('destination_hints', []):
+            learning.add_hint(node)
+        return learning
+    
+    def fork(self) -> 'LearningData':
+        """Camada filha O(1) que compartilha os agregados em copy-on-write"""
+        self._shared = True
+        child = LearningData(self._stats, self.hints)
+        child._shared = True
+        return child
+    
+    def _own(self) -> RouteStats:
+        if self._shared:
+            self._stats = self._stats.copy()
+            self._shared = False
+        return self._stats
+    
+    def record_attempt(self, network_type: Optional[str], next_hop: Optional[str],
+                       success: bool, now: Optional[float] = None):
+        self._own().record_attempt(network_type, next_hop, success, now)
+    
+    def add_preference(self, network_type: str, amount: float = 1.0, now: Optional[float] = None):
+        self._own().add_preference(network_type, amount, now)
+    
+    def add_hint(self, node: str):
+        self.hints = (self.hints + (node,))[-self.MAX_HINTS:]
+    
+    def preference(self, network_type: str, now: float) -> float:
+        return self._stats.preference(network_type, now)
+    
+    def hop_score(self, next_hop: str, now: float) -> float:
+        return self._stats.hop_score(next_hop, now)
+    
+    def recently_failed(self, next_hop: str, now: float) -> bool:
+        return self._stats.recently_failed(next_hop, now)
+    
+    def has_preferences(self) -> bool:
+        return self._stats.has_preferences()
+    
+    @property
+    def successes(self) -> int:
+        return self._stats.successes
+    
+    @property
+    def failures(self) -> int:
+        return self._stats.failures
+    
+    @property
+    def attempts(self) -> int:
+        return self._stats.attempts
+    
+    @property
+    def network_preferences(self) -> Dict[str, float]:
+        return self._stats.network_preferences
+    
+    @property
+    def destination_hints(self) -> List[str]:
+        return list(self.hints)
+    
+    def __getitem__(self, key: str):
+        if key not in ('network_preferences', 'destination_hints'):
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def to_dict(self, now: Optional[float] = None) -> Dict:
+        data = self._stats.to_dict(now)
+        data['destination_hints'] = self.destination_hints
+        return data
+
 class Message:
-    id: str
-    source: str
-    destination: str
-    content: str
-    timestamp: float
-    ttl: int = 100  # Time to live (hops)
-    path: List[str] = None
-    priority: int = 1
-    cognizant: bool = True  # Cognitivo: Clona-se nas bases
-    deliveries: Set[str] = None  # Dispositivos que receberam com sucesso
-    clone_count: int = 0  # Quantas vezes foi clonada
-    learning_data: Dict = None  # Dados de aprendizado da rota
-    
-    def __post_init__(self):
-        if self.deliveries is None:
-            self.deliveries = set()
-        if self.path is None:
-            self.path = []
-        if self.learning_data is None:
-            self.learning_data = {
-                'successful_routes': [],
-                'failed_routes': [],
-                'network_preferences': {},
-                'destination_hints': []
-            }
+    """
+    Mensagem cognitiva em representação compacta (__slots__).
+    
+    O caminho é um array de ids internados, origem/destino são strings
+    internadas e deliveries/learning_data só são alocados no primeiro acesso.
+    Clones (fork) compartilham conteúdo, caminho, entregas e agregados de
+    aprendizado em copy-on-write: ocupam cerca de metade da memória de uma
+    cópia, com tempo de criação equivalente. A interface de atributos é a
+    mesma do antigo dataclass.
+    """
+    __slots__ = ('id', 'source', 'destination', 'content', 'timestamp', 'ttl',
+                 '_path', 'priority', 'cognizant', '_deliveries', '_shared_deliveries',
+                 'clone_count', '_learning_data', '_payload')
+    
+    def __init__(self, id: str, source: str, destination: str, content: str,
+                 timestamp: float, ttl: int = 100, path: List[str] = None,
+                 priority: int = 1, cognizant: bool = True, deliveries: Set[str] = None,
+                 clone_count: int = 0, learning_data: Dict = None):
+        self.id = id
+        self.source = sys.intern(source)
+        self.destination = sys.intern(destination)
+        self.content = content
+        self.timestamp = timestamp
+        self.ttl = ttl  # Time to live (hops)
+        self.path = path
+        self.priority = priority
+        self.cognizant = cognizant  # Cognitivo: Clona-se nas bases
+        self._deliveries = deliveries  # Dispositivos que receberam com sucesso
+        self._shared_deliveries = False
+        self.clone_count = clone_count  # Quantas vezes foi clonada
+        self.learning_data = learning_data  # Dados de aprendizado da rota
+        self._payload: Optional[bytes] = None
+    
+    @property
+    def path(self) -> NodePath:
+        return self._path
+    
+    @path.setter
+    def path(self, value):
+        self._path = value if isinstance(value, NodePath) else NodePath(value or ())
+    
+    @property
+    def deliveries(self) -> Set[str]:
+        if self._deliveries is None:
+            self._deliveries = set()
+        elif self._shared_deliveries:
+            # Copy-on-write: o conjunto é compartilhado com clones
+            self._deliveries = set(self._deliveries)
+            self._shared_deliveries = False
+        return self._deliveries
+    
+    @deliveries.setter
+    def deliveries(self, value: Set[str]):
+        self._deliveries = value
+        self._shared_deliveries = False
+    
+    def was_delivered_to(self, device_id: str) -> bool:
+        return self._deliveries is not None and device_id in self._deliveries
+    
+    @property
+    def learning_data(self) -> LearningData:
+        if self._learning_data is None:
+            self._learning_data = LearningData()
+        return self._learning_data
+    
+    @learning_data.setter
+    def learning_data(self, value):
+        if isinstance(value, dict):
+            value = LearningData.from_dict(value)
+        self._learning_data = value
+    
+    @property
+    def learning_view(self) -> Optional[LearningData]:
+        """Aprendizado para leitura, sem copiar nem alocar"""
+        return self._learning_data
+    
+    @property
+    def has_learned(self) -> bool:
+        """Se a mensagem já registrou preferências de rede (sem alocar learning_data)"""
+        return self._learning_data is not None and self._learning_data.has_preferences()
+    
+    @property
+    def payload(self) -> bytes:
+        """Conteúdo codificado, calculado uma vez e compartilhado com os clones"""
+        if self._payload is None:
+            self._payload = self.content.encode('utf-8')
+        return self._payload
+    
+    def fork(self, ttl: Optional[int] = None) -> 'Message':
+        """Clone que compartilha conteúdo, caminho, entregas e aprendizado (copy-on-write; ganho em memória)"""
+        clone = Message.__new__(Message)
+        clone.id = self.id
+        clone.source = self.source
+        clone.destination = self.destination
+        clone.content = self.content
+        clone.timestamp = self.timestamp
+        clone.ttl = self.ttl if ttl is None else ttl
+        clone._path = self._path.copy()
+        clone.priority = self.priority
+        clone.cognizant = self.cognizant
+        clone._deliveries = self._deliveries
+        clone._shared_deliveries = self._deliveries is not None
+        self._shared_deliveries = self._shared_deliveries or clone._shared_deliveries
+        clone.clone_count = self.clone_count + 1
+        clone._learning_data = self._learning_data.fork() if self._learning_data is not None else None
+        clone._payload = self._payload
+        return clone
+    
+    def __repr__(self) -> str:
+        return (f"Message(id={self.id!r}, source={self.source!r}, destination={self.destination!r}, "
+                f"ttl={self.ttl}, priority={self.priority}, path={self.path!r})")
+
+def _silent(*args):
+    pass
 
-@dataclass
+@dataclass(slots=True)
 class NetworkRoute:
     network_type: NetworkType
     signal_strength: float
@@ -56,61 +528,189 @@ class NetworkRoute:
     cost: float = 1.0
 
 class AdaptiveMessenger:
-    def __init__(self, device_id: str):
+    # Modos de roteamento: melhor enlace global ou próximo salto por destino
+    ROUTING_MODES = ("best_link", "distance_vector")
+    
+    # Cadência de varredura por meio (segundos): meios rápidos atualizam mais vezes
+    SCAN_INTERVALS = {
+        NetworkType.WIFI: 2.0,
+        NetworkType.BLUETOOTH: 3.0,
+        NetworkType.LORA: 15.0,
+        NetworkType.ACOUSTIC: 10.0,
+        NetworkType.LIGHT: 2.0,
+        NetworkType.MESH: 2.0,
+        NetworkType.CELLULAR: 5.0,
+        NetworkType.RADIO: 8.0
+    }
+    # Janela de agrupamento por meio (segundos): só meios de alta latência agrupam
+    BATCH_WINDOWS = {
+        NetworkType.LORA: 0.5,
+        NetworkType.ACOUSTIC: 0.5,
+        NetworkType.RADIO: 0.2
+    }
+    # Modelos dos eventos de log (formatados só na thread escritora)
+    LOG_EVENTS = {
+        "started": "Sistema iniciado - Varrendo todas as redes...",
+        "scan_timeout": "Varredura {0} excedeu {1}s - nova tentativa em {2:.0f}s",
+        "scan_error": "Erro na varredura {0}: {1} - nova tentativa em {2:.0f}s",
+        "routes_discovered": "Rotas descobertas: {0} - Total conhecidas: {1}",
+        "queued": "Mensagem adicionada à fila: {0:.8} -> {1}",
+        "duplicate": "Mensagem já processada, clonando para melhorar alcance: {0:.8}",
+        "route_error": "Erro ao rotear mensagem {0:.8}: {1}",
+        "routing": "Roteando mensagem {0:.8} para {1}",
+        "ttl_expired": "TTL expirado para mensagem: {0:.8}",
+        "no_route": "Nenhuma rota encontrada, mantendo em fila: {0:.8}",
+        "table_aged": "Tabela envelhecida: {0} rotas removidas, {1} reativadas",
+        "forwarding": "Encaminhando via {0} -> {1}",
+        "retry": "Falha na transmissão, tentando outra rota...",
+        "transmit_ok": "✓ Transmissão bem-sucedida via {0}",
+        "transmit_failed": "✗ Falha na transmissão via {0}",
+        "bundle_sent": "✓ Pacote enviado via {0}: {1} mensagens, {2} bytes",
+        "bundle_failed": "✗ Falha no pacote via {0}: {1} mensagens, {2} bytes",
+        "bundle_error": "❌ Erro ao enviar pacote via {0} para {1} ({2} mensagens): {3!r}",
+        "delivered": ("📨 MENSAGEM ENTREGUE!\n   ID: {0:.8}\n   De: {1}\n   Para: {2}\n"
+                      "   Conteúdo: {3}\n   Caminho: {4}\n   Tempo: {5:.2f}s"),
+        "cloned": "✨ Mensagem clonada cognitiva #{0} - Disseminando inteligentemente",
+        "learned": "🧠 Mensagem aprendeu: {0} = {1}",
+    }
+    SCAN_TIMEOUT = 5.0        # Tempo máximo de uma varredura
+    MAX_SCAN_BACKOFF = 120.0  # Espera máxima após falhas seguidas
+    
+    def __init__(self, device_id: str, max_concurrency: int = 8, retry_delay: float = 1.0,
+                 routing_mode: str = "best_link", advertisement_interval: float = 5.0,
+                 dedup_ttl: float = 300.0, dedup_max_entries: int = 100_000, dedup_mode: str = "exact",
+                 scan_intervals: Optional[Dict[NetworkType, float]] = None,
+                 route_max_age: float = 30.0, route_failure_cooldown: float = 10.0, route_failure_threshold: int = 3,
+                 batch_windows: Optional[Dict[NetworkType, float]] = None, batch_max_bytes: int = 4096,
+                 clock=None, verbose: bool = True, announce_self: bool = True, export_links: bool = True,
+                 rng=None, event_log: Optional[EventLog] = None):
+        if routing_mode not in self.ROUTING_MODES:
+            raise ValueError(f"Modo de roteamento inválido: {routing_mode}")
+        
         self.device_id = device_id
-        self.message_queue: List[Message] = []
-        self.known_routes: Dict[str, List[NetworkRoute]] = {}
-        self.network_scanners = {}
+        self.clock = clock or get_clock()  # Relógio real ou virtual (time/sleep)
+        self.verbose = verbose
+        self.use_event_log(event_log if verbose else NULL_LOG)
+        self.rng = rng or get_rng(f"adaptive_messenger.{device_id}")  # Varredura e transmissão simuladas
+        self.message_queue = MessageScheduler(clock=self.clock.time)
+        self.max_concurrency = max_concurrency  # Roteamentos simultâneos
+        self.retry_delay = retry_delay  # Espera antes de tentar de novo (sem rota ou após falha)
+        self._queue_ready = asyncio.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.message_queue.on_push = self._notify_queue
+        self.routing_table = RoutingTable(max_age=route_max_age, failure_cooldown=route_failure_cooldown,
+                                          failure_threshold=route_failure_threshold)
+        self.routing_table.subscribe(self._on_route_change)
+        self.routing_mode = routing_mode
+        self.distance_vector = DistanceVectorTable(device_id, announce_self=announce_self,
+                                                   export_links=export_links)
+        self.advertisement_interval = advertisement_interval
+        self._routes_changed = asyncio.Event()
+        self.peers: Dict[str, 'AdaptiveMessenger'] = {}  # Vizinhos no mesmo processo
+        self.network = None  # Camada de enlace (ex.: MeshNetwork); None = transmissão simulada local
+        self.on_delivery: Optional[Callable[['AdaptiveMessenger', 'Message'], None]] = None
+        self.scan_intervals = {**self.SCAN_INTERVALS, **(scan_intervals or {})}
+        self.network_scanners: Dict[NetworkType, asyncio.Task] = {}  # Uma tarefa por meio
+        self.forwarded = 0  # Mensagens entregues ao próximo salto
+        self.transmissions = 0  # Quadros colocados no enlace (um pacote agrupado conta uma vez)
+        self.batcher = TransmissionBatcher(
+            self.transmit_bundle,
+            windows={**self.BATCH_WINDOWS, **(batch_windows or {})},
+            max_bytes=batch_max_bytes,
+            on_error=self._on_bundle_error
+        )
         self.is_scanning = False
-        self.message_cache: Set[str] = set()  # Para evitar loops
+        # Para evitar loops: expira por entrada e respeita limite de memória
+        self.message_cache = DedupCache(ttl=dedup_ttl, max_entries=dedup_max_entries, mode=dedup_mode,
+                                        clock=self.clock.time)
         
+    def _log(self, component: str, level: int, event: str, *fields):
+        """Emite um evento estruturado; formatação e escrita ficam na thread do log"""
+        self.events.emit(self.device_id, component, level, event, *fields)
+    
+    def use_event_log(self, event_log: Optional[EventLog]):
+        """Troca o destino dos eventos em tempo de execução (NULL_LOG = silencioso)"""
+        self.events = event_log or get_event_log()
+        self.events.register(self.LOG_EVENTS)
+        if self.events is NULL_LOG:
+            # Silencioso: nem a chamada ao log é feita
+            self._log = _silent
+        else:
+            self.__dict__.pop('_log', None)
+    
+    @property
+    def known_routes(self) -> Dict[str, List[NetworkRoute]]:
+        """Visão {next_hop: [rotas]} da tabela de roteamento (cópia)"""
+        return self.routing_table.as_dict()
+    
     async def start(self):
         """Inicia o sistema de varredura e roteamento"""
-        print(f"[{self.device_id}] Sistema iniciado - Varrendo todas as redes...")
+        self._log("lifecycle", INFO, "started")
         
         # Inicia scanners em paralelo
         tasks = [
             self.scan_networks(),
             self.process_message_queue(),
-            self.cleanup_cache()
+            self.age_routes()
         ]
         
+        if self.routing_mode == "distance_vector":
+            tasks.append(self.advertise_routes())
+        
         await asyncio.gather(*tasks)
     
     async def scan_networks(self):
-        """Varre continuamente todas as redes disponíveis"""
+        """Varre continuamente todas as redes, cada meio em sua própria tarefa e cadência"""
         self.is_scanning = True
         
+        for network_type in NetworkType:
+            self.network_scanners[network_type] = asyncio.create_task(self.scan_medium(network_type))
+        
+        try:
+            await asyncio.gather(*self.network_scanners.values())
+        finally:
+            self.is_scanning = False
+            for task in self.network_scanners.values():
+                task.cancel()
+            self.network_scanners.clear()
+    
+    async def scan_medium(self, network_type: NetworkType):
+        """Varre um único meio com timeout e backoff exponencial em caso de falha"""
+        interval = self.scan_intervals.get(network_type, 2.0)
+        delay = interval
+        
         while self.is_scanning:
-            available_routes = []
+            try:
+                routes = await asyncio.wait_for(self.scan_network_type(network_type), self.SCAN_TIMEOUT)
+            except asyncio.TimeoutError:
+                delay = min(delay * 2, self.MAX_SCAN_BACKOFF)
+                self._log("scan", WARNING, "scan_timeout", network_type.value, self.SCAN_TIMEOUT, delay)
+            except Exception as e:
+                delay = min(delay * 2, self.MAX_SCAN_BACKOFF)
+                self._log("scan", ERROR, "scan_error", network_type.value, e, delay)
+            else:
+                # Resultados entram na tabela assim que chegam
+                if routes:
+                    await self.update_routing_table(routes)
+                delay = interval
             
-            # Simula varredura de diferentes tipos de rede
-            for network_type in NetworkType:
-                routes = await self.scan_network_type(network_type)
-                available_routes.extend(routes)
-            
-            # Atualiza tabela de roteamento
-            await self.update_routing_table(available_routes)
-            
-            # Espera antes da próxima varredura
-            await asyncio.sleep(2)
+            await self.clock.sleep(delay)
     
     async def scan_network_type(self, network_type: NetworkType) -> List[NetworkRoute]:
         """Simula varredura de um tipo específico de rede"""
-        import random
-        
+        rng = self.rng
         routes = []
         
         # Simula descoberta de redes/dispositivos próximos
-        if random.random() > 0.3:  # 70% chance de encontrar algo
-            for i in range(random.randint(1, 3)):
+        if rng.random() > 0.3:  # 70% chance de encontrar algo
+            for i in range(rng.randint(1, 3)):
                 route = NetworkRoute(
                     network_type=network_type,
-                    signal_strength=random.uniform(0.1, 1.0),
-                    latency=random.uniform(10, 500),
+                    signal_strength=rng.uniform(0.1, 1.0),
+                    latency=rng.uniform(10, 500),
                     available=True,
                     next_hop=f"device_{network_type.value}_{i}",
-                    cost=random.uniform(0.5, 2.0)
+                    cost=rng.uniform(0.5, 2.0)
                 )
                 routes.append(route)
         
@@ -118,22 +718,12 @@ class AdaptiveMessenger:
     
     async def update_routing_table(self, routes: List[NetworkRoute]):
         """Atualiza tabela de roteamento com novas rotas descobertas"""
-        current_time = time.time()
-        
+        now = self.clock.time()
         for route in routes:
-            if route.next_hop not in self.known_routes:
-                self.known_routes[route.next_hop] = []
-            
-            # Remove rotas antigas do mesmo tipo
-            self.known_routes[route.next_hop] = [
-                r for r in self.known_routes[route.next_hop] 
-                if r.network_type != route.network_type
-            ]
-            
-            # Adiciona nova rota
-            self.known_routes[route.next_hop].append(route)
+            # Atualiza a rota deste vizinho/tipo; mudanças saem pelo feed da tabela
+            self.routing_table.upsert(route, now)
         
-        print(f"[{self.device_id}] Rotas descobertas: {len(routes)} - Total conhecidas: {len(self.known_routes)}")
+        self._log("scan", INFO, "routes_discovered", len(routes), self.routing_table.hop_count)
     
     def send_message(self, destination: str, content: str, priority: int = 1):
         """Envia uma mensagem para o destino"""
@@ -142,231 +732,339 @@ class AdaptiveMessenger:
             source=self.device_id,
             destination=destination,
             content=content,
-            timestamp=time.time(),
+            timestamp=self.clock.time(),
             priority=priority,
             path=[self.device_id]
         )
         
-        self.message_queue.append(message)
-        print(f"[{self.device_id}] Mensagem adicionada à fila: {message.id[:8]} -> {destination}")
+        self.message_cache.add(message.id)
+        self.message_queue.push(message)
+        self._log("queue", INFO, "queued", message.id, destination)
+        return message
+    
+    def receive_message(self, message: Message):
+        """Recebe uma mensagem de um vizinho pela camada de enlace"""
+        # Evita loops: cópias repetidas são clonadas (ou descartadas se já entregues aqui)
+        if self.message_cache.check_and_add(message.id):
+            if message.destination != self.device_id:
+                self._log("routing", INFO, "duplicate", message.id)
+                self.clone_message(message)
+            return
+        
+        self.message_queue.push(message)
+    
+    def _notify_queue(self):
+        """Acorda o consumidor da fila (seguro a partir de outras threads)"""
+        loop = self._loop
+        if loop is None:
+            return
+        
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        
+        if running is loop:
+            self._queue_ready.set()
+        else:
+            loop.call_soon_threadsafe(self._queue_ready.set)
     
     async def process_message_queue(self):
-        """Processa fila de mensagens continuamente"""
+        """Processa fila de mensagens continuamente, acordando a cada enfileiramento"""
+        self._loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        in_flight = set()
+        
         while True:
-            if self.message_queue:
-                # Ordena por prioridade
-                self.message_queue.sort(key=lambda m: m.priority, reverse=True)
-                
-                message = self.message_queue.pop(0)
-                await self.route_message(message)
+            await semaphore.acquire()
+            message = self.message_queue.pop()
+            
+            if message is None:
+                semaphore.release()
+                self._queue_ready.clear()
+                if not self.message_queue:
+                    await self._queue_ready.wait()
+                continue
             
-            await asyncio.sleep(1)
+            task = asyncio.create_task(self._route_and_release(message, semaphore))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+    
+    async def _route_and_release(self, message: Message, semaphore: asyncio.Semaphore):
+        """Roteia uma mensagem e libera a vaga de concorrência"""
+        released = False
+        
+        def release():
+            # Mensagem já no lote do enlace: a vaga volta para a fila enquanto espera o envio
+            nonlocal released
+            if not released:
+                released = True
+                semaphore.release()
+        
+        try:
+            await self.route_message(message, on_queued=release)
+        except Exception as e:
+            self._log("routing", ERROR, "route_error", message.id, e)
+        finally:
+            release()
     
-    async def route_message(self, message: Message):
+    def _requeue_later(self, message: Message):
+        """Recoloca a mensagem na fila após retry_delay, sem ocupar o consumidor"""
+        if self._loop is None:
+            self.message_queue.push(message)
+        else:
+            self._loop.call_later(self.retry_delay, self.message_queue.push, message)
+    
+    async def route_message(self, message: Message, on_queued: Optional[Callable[[], None]] = None):
         """Encontra e executa a melhor rota para a mensagem"""
-        print(f"[{self.device_id}] Roteando mensagem {message.id[:8]} para {message.destination}")
+        self._log("routing", INFO, "routing", message.id, message.destination)
         
         # Verifica se chegou ao destino
         if message.destination == self.device_id:
             await self.deliver_message(message)
             return
         
-        # Evita loops
-        if message.id in self.message_cache:
-            print(f"[{self.device_id}] Mensagem já processada, clonando para melhorar alcance: {message.id[:8]}")
-            self.clone_message(message)
-            return
-        
-        self.message_cache.add(message.id)
-        
         # Verifica TTL
         if message.ttl <= 0:
-            print(f"[{self.device_id}] TTL expirado para mensagem: {message.id[:8]}")
+            self._log("routing", WARNING, "ttl_expired", message.id)
             return
         
         # Busca melhor rota usando aprendizado da mensagem
-        if message.cognizant and message.learning_data['network_preferences']:
+        if self.routing_mode == "distance_vector":
+            best_route = self.find_route_to_destination(message.destination)
+        elif message.cognizant and message.has_learned:
             best_route = await self.find_best_route_with_learning(message)
         else:
             best_route = await self.find_best_route(message.destination)
         
         if best_route:
-            await self.forward_message(message, best_route)
+            await self.forward_message(message, best_route, on_queued)
         else:
-            print(f"[{self.device_id}] Nenhuma rota encontrada, mantendo em fila: {message.id[:8]}")
+            self._log("routing", INFO, "no_route", message.id)
             # Recoloca na fila para tentar novamente
             message.ttl -= 1
-            self.message_queue.append(message)
+            self._requeue_later(message)
     
     async def find_best_route(self, destination: str) -> Optional[NetworkRoute]:
         """Encontra a melhor rota para o destino"""
-        if not self.known_routes:
+        # A tabela já está ordenada pelo score (latência * custo) / sinal
+        return self.routing_table.best()
+    
+    def find_route_to_destination(self, destination: str) -> Optional[NetworkRoute]:
+        """Rota até o próximo salto escolhido pelo distance-vector para o destino"""
+        next_hop = self.distance_vector.next_hop(destination)
+        if next_hop is None:
             return None
+        return self.routing_table.best_route_to(next_hop)
+    
+    async def age_routes(self):
+        """Envelhece a tabela: remove rotas sumidas e reativa rotas após falha"""
+        interval = min(self.routing_table.max_age, self.routing_table.failure_cooldown) / 2
+        while True:
+            await self.clock.sleep(interval)
+            result = self.routing_table.age(self.clock.time())
+            if result["removed"] or result["restored"]:
+                self._log("table", INFO, "table_aged", result["removed"], result["restored"])
+    
+    def _on_route_change(self, event: str, route: NetworkRoute):
+        """Reage ao feed de mudanças da tabela de roteamento"""
+        self._refresh_link(route.next_hop)
+    
+    def _refresh_link(self, next_hop: str):
+        """Propaga o custo do melhor enlace para um vizinho ao distance-vector"""
+        route = self.routing_table.best_route_to(next_hop)
+        cost = RoutingTable.base_score(route) if route else None
+        # Enlace só em espera após falha: guarda os anúncios do vizinho para a volta
+        suspended = route is None and next_hop in self.routing_table
+        if self.distance_vector.set_link(next_hop, cost, keep_adverts=suspended):
+            self._routes_changed.set()
+    
+    def connect_peer(self, peer: 'AdaptiveMessenger'):
+        """Registra um vizinho no mesmo processo para troca de anúncios"""
+        self.peers[peer.device_id] = peer
+    
+    async def advertise_routes(self):
+        """Anuncia alcançabilidade aos vizinhos: updates disparados por mudanças e refresh periódico"""
+        while True:
+            try:
+                await asyncio.wait_for(self._routes_changed.wait(), timeout=self.advertisement_interval)
+                full = False
+            except asyncio.TimeoutError:
+                full = True
+            
+            self._routes_changed.clear()
+            await self.send_advertisements(full=full)
+    
+    async def send_advertisements(self, full: bool = False) -> int:
+        """Envia a cada vizinho os destinos alterados (ou a tabela completa)"""
+        changes = self.distance_vector.pop_changes()
+        if not changes and not full:
+            return 0
         
-        best_route = None
-        best_score = float('inf')
-        
-        # Avalia todas as rotas conhecidas
-        for next_hop, routes in self.known_routes.items():
-            for route in routes:
-                if route.available:
-                    # Score baseado em latência, força do sinal e custo
-                    score = (route.latency * route.cost) / route.signal_strength
-                    
-                    if score < best_score:
-                        best_score = score
-                        best_route = route
+        sent = 0
+        for neighbor in self.distance_vector.neighbors():
+            vector = self.distance_vector.build_advertisement(neighbor, None if full else changes)
+            if vector:
+                await self.send_advertisement(neighbor, vector)
+                sent += 1
         
-        return best_route
+        return sent
+    
+    async def send_advertisement(self, neighbor: str, vector: Dict):
+        """Entrega um anúncio ao vizinho (no mesmo processo, se registrado)"""
+        peer = self.peers.get(neighbor)
+        if peer is not None:
+            peer.receive_advertisement(self.device_id, vector)
     
-    async def forward_message(self, message: Message, route: NetworkRoute):
-        """Encaminha mensagem pela rota selecionada"""
-        print(f"[{self.device_id}] Encaminhando via {route.network_type.value} -> {route.next_hop}")
+    def receive_advertisement(self, neighbor: str, vector: Dict):
+        """Incorpora o anúncio de alcançabilidade de um vizinho"""
+        if self.distance_vector.receive_advertisement(neighbor, vector):
+            self._routes_changed.set()
+    
+    async def forward_message(self, message: Message, route: NetworkRoute,
+                              on_queued: Optional[Callable[[], None]] = None):
+        """
+        Encaminha mensagem pela rota selecionada.
+        
+        on_queued é chamado quando a mensagem entra no lote do enlace, antes
+        de esperar o envio: o consumidor da fila libera a vaga ali, e o lote
+        pode juntar mais mensagens do que max_concurrency.
+        """
+        self._log("routing", INFO, "forwarding", route.network_type.value, route.next_hop)
         
-        # Adiciona este dispositivo ao caminho
-        message.path.append(self.device_id)
+        # Adiciona este dispositivo ao caminho (uma vez, mesmo em novas tentativas)
+        if not message.path or message.path[-1] != self.device_id:
+            message.path.append(self.device_id)
         message.ttl -= 1
         
-        # Simula envio pela rede
-        success = await self.transmit_via_network(message, route)
+        # Simula envio pela rede (agrupado com outras mensagens para o mesmo enlace, se o meio permitir)
+        if self.batcher.enabled_for(route):
+            result = self.batcher.enqueue(message, route)
+            if on_queued is not None:
+                on_queued()
+            success = await result
+        else:
+            success = await self.transmit_via_network(message, route)
         
         # Mensagem aprende com o resultado
         if message.cognizant:
             self.message_learns_route(message, route, success)
         
-        if not success:
-            print(f"[{self.device_id}] Falha na transmissão, tentando outra rota...")
-            # Remove rota com falha temporariamente
-            route.available = False
-            # Recoloca mensagem na fila
-            self.message_queue.append(message)
+        if success:
+            self.forwarded += 1
+            self.routing_table.record_success(route)
+        else:
+            self._log("transmit", WARNING, "retry")
+            # Falhas seguidas desativam a rota temporariamente (reativada após o tempo de espera)
+            self.routing_table.record_failure(route, self.clock.time())
+            # Recoloca na fila após retry_delay: contra um enlace morto não vira laço quente
+            self._requeue_later(message)
     
     async def transmit_via_network(self, message: Message, route: NetworkRoute) -> bool:
         """Simula transmissão pela rede específica"""
-        import random
-        
         # Simula delay da rede
-        await asyncio.sleep(route.latency / 1000)
-        
-        # Simula chance de falha baseada na força do sinal
-        success_rate = route.signal_strength * 0.8 + 0.2
-        success = random.random() < success_rate
+        self.transmissions += 1
+        if self.network is not None:
+            success = (await self.network.transmit(self, route, [message]))[0]
+        else:
+            await self.clock.sleep(route.latency / 1000)
+            # Simula chance de falha baseada na força do sinal
+            success_rate = route.signal_strength * 0.8 + 0.2
+            success = self.rng.random() < success_rate
         
         if success:
-            print(f"[{self.device_id}] ✓ Transmissão bem-sucedida via {route.network_type.value}")
+            self._log("transmit", INFO, "transmit_ok", route.network_type.value)
             # Aqui conectaria com o próximo dispositivo da rede
         else:
-            print(f"[{self.device_id}] ✗ Falha na transmissão via {route.network_type.value}")
+            self._log("transmit", WARNING, "transmit_failed", route.network_type.value)
         
         return success
     
+    async def transmit_bundle(self, route: NetworkRoute, messages: List[Message], bundle: bytes) -> List[bool]:
+        """Simula transmissão de um pacote enquadrado: a latência do enlace é paga uma vez"""
+        self.transmissions += 1
+        if self.network is not None:
+            results = await self.network.transmit(self, route, messages)
+        else:
+            await self.clock.sleep(route.latency / 1000)
+            success_rate = route.signal_strength * 0.8 + 0.2
+            results = [self.rng.random() < success_rate] * len(messages)
+        
+        success = any(results)
+        self._log("transmit", INFO if success else WARNING, "bundle_sent" if success else "bundle_failed",
+                  route.network_type.value, len(messages), len(bundle))
+        
+        return results
+    
+    def _on_bundle_error(self, route: NetworkRoute, messages: List[Message], error: Exception):
+        self._log("transmit", ERROR, "bundle_error", route.network_type.value, route.next_hop, len(messages), error)
+    
     async def deliver_message(self, message: Message):
         """Entrega mensagem no destino final e registra entrega"""
         message.deliveries.add(self.device_id)
-        print(f"[{self.device_id}] 📨 MENSAGEM ENTREGUE!")
-        print(f"   ID: {message.id[:8]}")
-        print(f"   De: {message.source}")
-        print(f"   Para: {message.destination}")
-        print(f"   Conteúdo: {message.content}")
-        arrow = ' -> '
-        print(f"   Caminho: {arrow.join(message.path)}")
-        print(f"   Tempo: {time.time() - message.timestamp:.2f}s")
+        if self.on_delivery is not None:
+            self.on_delivery(self, message)
+        if self.events.enabled("delivery", INFO):
+            self._log("delivery", INFO, "delivered", message.id, message.source, message.destination,
+                      message.content, " -> ".join(message.path), self.clock.time() - message.timestamp)
     
     def clone_message(self, message: Message):
         """Clona a mensagem cognitiva para tentar entrega em novos nós"""
         if not message.cognizant or message.clone_count >= 5:  # Limite de clones
             return
             
-        # Cria uma nova cópia para tentar diferentes rotas
-        clone = Message(
-            id=message.id,
-            source=message.source,
-            destination=message.destination,
-            content=message.content,
-            timestamp=message.timestamp,
-            ttl=max(message.ttl - 10, 20),  # Reduz TTL do clone
-            path=message.path.copy(),
-            priority=message.priority,
-            cognizant=message.cognizant,
-            deliveries=message.deliveries.copy(),
-            clone_count=message.clone_count + 1,
-            learning_data=message.learning_data.copy()
-        )
+        # Cria uma cópia copy-on-write para tentar diferentes rotas
+        clone = message.fork(ttl=max(message.ttl - 10, 20))  # Reduz TTL do clone
         
         # Adiciona dados de aprendizado
-        clone.learning_data['destination_hints'].append(self.device_id)
+        clone.learning_data.add_hint(self.device_id)
         
-        self.message_queue.append(clone)
-        print(f"[{self.device_id}] ✨ Mensagem clonada cognitiva #{clone.clone_count} - Disseminando inteligentemente")
+        self.message_queue.push(clone)
+        self._log("routing", INFO, "cloned", clone.clone_count)
     
     def message_learns_route(self, message: Message, route: NetworkRoute, success: bool):
         """Mensagem aprende sobre a eficácia das rotas"""
-        route_info = {
-            'network_type': route.network_type.value,
-            'next_hop': route.next_hop,
-            'signal_strength': route.signal_strength,
-            'latency': route.latency,
-            'timestamp': time.time()
-        }
+        # Sucesso também aumenta a preferência por este tipo de rede
+        message.learning_data.record_attempt(route.network_type.value, route.next_hop, success,
+                                             self.clock.time())
         
-        if success:
-            message.learning_data['successful_routes'].append(route_info)
-            # Aumenta preferência por este tipo de rede
-            network_type = route.network_type.value
-            if network_type not in message.learning_data['network_preferences']:
-                message.learning_data['network_preferences'][network_type] = 0
-            message.learning_data['network_preferences'][network_type] += 1
-        else:
-            message.learning_data['failed_routes'].append(route_info)
-            
-        print(f"[{self.device_id}] 🧠 Mensagem aprendeu: {route.network_type.value} = {'✓' if success else '✗'}")
+        self._log("learning", INFO, "learned", route.network_type.value, "✓" if success else "✗")
     
     async def find_best_route_with_learning(self, message: Message) -> Optional[NetworkRoute]:
         """Encontra a melhor rota usando dados de aprendizado da mensagem"""
-        if not self.known_routes:
+        if not self.routing_table:
             return None
         
         best_route = None
         best_score = float('inf')
         
-        # Avalia todas as rotas conhecidas
-        for next_hop, routes in self.known_routes.items():
-            for route in routes:
-                if route.available:
-                    # Score base
-                    base_score = (route.latency * route.cost) / route.signal_strength
-                    
-                    # Aplica aprendizado da mensagem
-                    network_pref = message.learning_data['network_preferences'].get(
-                        route.network_type.value, 0
-                    )
-                    
-                    # Bonifica redes que funcionaram antes
-                    learning_bonus = 1.0 - (network_pref * 0.1)  # Até 50% de desconto
-                    final_score = base_score * max(learning_bonus, 0.5)
-                    
-                    # Verifica se esta rota já falhou recentemente
-                    recent_failures = [
-                        f for f in message.learning_data['failed_routes']
-                        if f['next_hop'] == route.next_hop and 
-                           time.time() - f['timestamp'] < 60  # 1 minuto
-                    ]
-                    
-                    if recent_failures:
-                        final_score *= 2.0  # Penaliza rotas que falharam recentemente
-                    
-                    if final_score < best_score:
-                        best_score = final_score
-                        best_route = route
+        learning = message.learning_view
+        now = self.clock.time()
+        
+        # Percorre cada tipo de rede em ordem de score base
+        for network_type in self.routing_table.network_types():
+            # Bonifica redes que funcionaram antes - até 50% de desconto
+            network_pref = learning.preference(network_type.value, now) if learning else 0.0
+            learning_bonus = max(1.0 - (network_pref * 0.1), 0.5)
+            
+            for base_score, route in self.routing_table.iter_by_type(network_type):
+                # Penalidades só aumentam o score: nenhuma rota seguinte deste tipo pode vencer
+                if base_score * learning_bonus >= best_score:
+                    break
+                
+                if not route.available:
+                    continue
+                
+                final_score = base_score * learning_bonus
+                
+                if learning and learning.recently_failed(route.next_hop, now):
+                    final_score *= 2.0  # Penaliza rotas que falharam recentemente
+                
+                if final_score < best_score:
+                    best_score = final_score
+                    best_route = route
         
         return best_route
-    
-    async def cleanup_cache(self):
-        """Limpa cache periodicamente"""
-        while True:
-            await asyncio.sleep(300)  # 5 minutos
-            self.message_cache.clear()
-            print(f"[{self.device_id}] Cache de mensagens limpo")
 
 # Exemplo de uso
 async def demo():
@@ -1,63 +1,252 @@
 import asyncio
+import itertools
 import json
 import time
 import uuid
 import random
-from typing import Dict, List, Optional, Any, Callable
+from collections import deque
+from typing import Dict, List, Optional, Any, Callable, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime
+from clock import get_clock, run_virtual
 from intelligent_message import ThinkingMessage
+from network_conditions import ConditionsEngine
+from network_topology import Topology
+from route_planner import RoutePlanner
+from sim_random import get_rng
 from delivery_channels import DeliveryManager, EmailChannel
 
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: sem ele a pontuação é calculada rota a rota
+    np = None
+
+
+class LogEntry:
+    """Entrada de log; timestamp ISO só é formatado quando lido"""
+    
+    __slots__ = ('seq', 'ts', 'level', 'message', 'data')
+    
+    def __init__(self, seq: int, ts: float, level: str, message: str, data: Optional[Dict]):
+        self.seq = seq
+        self.ts = ts
+        self.level = level
+        self.message = message
+        self.data = data
+    
+    @property
+    def timestamp(self) -> str:
+        return datetime.fromtimestamp(self.ts).isoformat()
+    
+    def __getitem__(self, key: str):
+        # Compatível com o formato antigo em dict
+        if key == "data":
+            return self.data or {}
+        if key in ("timestamp", "level", "message", "seq", "ts"):
+            return getattr(self, key)
+        raise KeyError(key)
+    
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "seq": self.seq,
+            "timestamp": self.timestamp,
+            "level": self.level,
+            "message": self.message,
+            "data": self.data or {}
+        }
+
 
 class RealTimeLogger:
-    """Sistema de logs em tempo real para mensagens inteligentes"""
+    """
+    Sistema de logs em tempo real para mensagens inteligentes.
+    
+    Guarda as últimas `capacity` entradas em um buffer circular, descarta
+    níveis abaixo de min_level e entrega novas entradas aos assinantes em
+    lotes, no próximo ciclo do event loop (ou na hora, fora de um loop).
+    O eco no console segue o mesmo lote: o horário só é formatado ali, uma
+    vez por segundo, e não a cada chamada de log(). Assinantes recebem o
+    dict de sempre (serializável em JSON), montado uma vez por entrega;
+    com raw=True recebem o próprio LogEntry, sem formatação nenhuma.
+    """
+    
+    # Severidade de cada nível; níveis desconhecidos contam como INFO
+    LEVELS = {
+        "DEBUG": 10,
+        "THINKING": 15,
+        "MOVEMENT": 15,
+        "NETWORK": 15,
+        "CLONE": 15,
+        "ANCHOR": 15,
+        "INFO": 20,
+        "SUCCESS": 25,
+        "DELIVERY": 25,
+        "WARNING": 30,
+        "ERROR": 40
+    }
+    EMOJI_MAP = {
+        "INFO": "ℹ️",
+        "SUCCESS": "✅", 
+        "WARNING": "⚠️",
+        "ERROR": "❌",
+        "THINKING": "🧠",
+        "MOVEMENT": "📍",
+        "CLONE": "🔀",
+        "ANCHOR": "🔗",
+        "NETWORK": "📡",
+        "DELIVERY": "📧"
+    }
+    
+    def __init__(self, log_callback: Optional[Callable] = None, capacity: int = 10_000,
+                 min_level: str = "DEBUG", echo: bool = True):
+        self.capacity = capacity
+        self.min_level = self.LEVELS.get(min_level, 20)
+        self.echo = echo  # Também imprime no console
+        self._entries: deque = deque(maxlen=capacity)
+        self._seq = 0
+        self._subscribers: List[Tuple[Callable, bool, bool]] = []
+        self._pending: List[LogEntry] = []
+        self._delivery_scheduled = False
+        self._echo_second: Optional[int] = None  # Segundo do último horário formatado
+        self._echo_clock = ""
+        
+        if log_callback:
+            self.subscribe(log_callback)
     
-    def __init__(self, log_callback: Optional[Callable] = None):
-        self.log_callback = log_callback
-        self.log_history = []
+    @property
+    def total_logged(self) -> int:
+        """Total de entradas aceitas desde a criação (inclusive as já descartadas do buffer)"""
+        return self._seq
+    
+    @property
+    def log_history(self) -> List[LogEntry]:
+        """Entradas ainda no buffer, da mais antiga para a mais recente"""
+        return list(self._entries)
+    
+    def subscribe(self, callback: Callable, batched: bool = False, raw: bool = False):
+        """
+        Assina novas entradas: callback(dict), ou callback(lista) com batched=True.
+        Com raw=True as entradas chegam como LogEntry (timestamp formatado só se lido).
+        """
+        self._subscribers.append((callback, batched, raw))
+    
+    def unsubscribe(self, callback: Callable):
+        self._subscribers = [subscriber for subscriber in self._subscribers if subscriber[0] is not callback]
     
     def log(self, level: str, message: str, data: Dict = None):
         """Registra um log com timestamp"""
-        log_entry = {
-            "timestamp": datetime.now().isoformat(),
-            "level": level,
-            "message": message,
-            "data": data or {}
-        }
+        if self.LEVELS.get(level, 20) < self.min_level:
+            return
         
-        self.log_history.append(log_entry)
-        
-        # Emite via callback se disponível
-        if self.log_callback:
-            self.log_callback(log_entry)
-        
-        # Print para console
-        emoji_map = {
-            "INFO": "ℹ️",
-            "SUCCESS": "✅", 
-            "WARNING": "⚠️",
-            "ERROR": "❌",
-            "THINKING": "🧠",
-            "MOVEMENT": "📍",
-            "CLONE": "🔀",
-            "ANCHOR": "🔗",
-            "NETWORK": "📡",
-            "DELIVERY": "📧"
-        }
+        self._seq += 1
+        entry = LogEntry(self._seq, get_clock().time(), level, message, data)
+        self._entries.append(entry)
         
-        emoji = emoji_map.get(level, "📝")
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        print(f"[{timestamp}] {emoji} {message}")
+        # Assinantes e console recebem no lote seguinte
+        if self._subscribers or self.echo:
+            self._pending.append(entry)
+            self._schedule_delivery()
+    
+    def recent(self, n: int = 50, min_level: Optional[str] = None) -> List[LogEntry]:
+        """Últimas n entradas (opcionalmente só a partir de um nível)"""
+        threshold = self.LEVELS.get(min_level, 0) if min_level else 0
+        result = []
+        for entry in reversed(self._entries):
+            if len(result) >= n:
+                break
+            if self.LEVELS.get(entry.level, 20) >= threshold:
+                result.append(entry)
+        result.reverse()
+        return result
+    
+    def since(self, ts: float, limit: Optional[int] = None) -> List[LogEntry]:
+        """Entradas com timestamp posterior a ts (as mais antigas primeiro)"""
+        result = []
+        for entry in reversed(self._entries):
+            if entry.ts <= ts:
+                break
+            result.append(entry)
+        result.reverse()
+        return result[:limit] if limit is not None else result
+    
+    def after(self, seq: int, limit: Optional[int] = None) -> List[LogEntry]:
+        """Entradas com seq maior que o informado (paginação por cursor)"""
+        if not self._entries or seq >= self._seq:
+            return []
+        # seq é contíguo no buffer: a posição sai direto do deslocamento
+        start = max(0, len(self._entries) - (self._seq - seq))
+        result = list(itertools.islice(self._entries, start, None))
+        return result[:limit] if limit is not None else result
+    
+    def flush(self):
+        """Entrega imediatamente as entradas pendentes aos assinantes"""
+        self._deliver()
+    
+    def _schedule_delivery(self):
+        if self._delivery_scheduled:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._deliver()
+            return
+        self._delivery_scheduled = True
+        loop.call_soon(self._deliver)
+    
+    def _deliver(self):
+        self._delivery_scheduled = False
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        if self.echo:
+            print("\n".join(self._echo_line(entry) for entry in batch))
+        dicts = None
+        for callback, batched, raw in self._subscribers:
+            if raw:
+                entries = batch
+            else:
+                if dicts is None:
+                    dicts = [entry.to_dict() for entry in batch]
+                entries = dicts
+            try:
+                if batched:
+                    callback(entries)
+                else:
+                    for entry in entries:
+                        callback(entry)
+            except Exception as e:
+                print(f"⚠️ Falha ao entregar logs a assinante: {e}")
+    
+    def _echo_line(self, entry: LogEntry) -> str:
+        second = int(entry.ts)
+        if second != self._echo_second:
+            self._echo_second = second
+            self._echo_clock = time.strftime('%H:%M:%S', time.localtime(entry.ts))
+        return f"[{self._echo_clock}] {self.EMOJI_MAP.get(entry.level, '📝')} {entry.message}"
 
 
 class IntelligentNetworkSimulator:
     """Simula uma rede complexa com múltiplos nós e caminhos"""
     
-    def __init__(self, logger: RealTimeLogger):
+    # A partir de quantas rotas fora do cache vale vetorizar com NumPy
+    VECTORIZE_THRESHOLD = 64
+    
+    def __init__(self, logger: RealTimeLogger, rng: Optional[random.Random] = None,
+                 topology: Optional[Topology] = None, conditions_options: Optional[Dict[str, Any]] = None):
         self.logger = logger
-        self.nodes = self._create_network_topology()
-        self.network_conditions = {}
+        self.rng = rng or get_rng("network_simulator")
+        # Grafo compacto (CSR); sem topologia usa a rede de demonstração de 21 nós
+        self.topology = topology or Topology.from_adjacency(self._create_network_topology())
+        self.nodes = self.topology.adjacency()
+        if topology is not None:
+            self.logger.log("INFO", f"Topologia carregada com {topology.node_count} nós e {topology.edge_count} enlaces")
+        self.conditions_options = conditions_options or {}
+        self._score_cache: Dict[str, float] = {}  # nó -> pontuação (use update_conditions para alterar)
         self._simulate_network_conditions()
     
     def _create_network_topology(self) -> Dict[str, List[str]]:
@@ -90,43 +279,108 @@ class IntelligentNetworkSimulator:
         return topology
     
     def _simulate_network_conditions(self):
-        """Simula condições dinâmicas da rede"""
-        for node in self.nodes.keys():
-            self.network_conditions[node] = {
-                "latency": random.uniform(10, 500),
-                "reliability": random.uniform(0.5, 0.95),
-                "bandwidth": random.uniform(1, 100),
-                "congestion": random.uniform(0, 0.8),
-                "status": "active" if random.random() > 0.1 else "degraded"
-            }
+        """Simula condições dinâmicas da rede (colunas que evoluem a cada tick)"""
+        self.invalidate_scores()
+        self.conditions = ConditionsEngine(
+            self.topology.node_count, self.topology.name, self.topology.index,
+            rng=self.rng.spawn("conditions") if hasattr(self.rng, "spawn") else self.rng,
+            **self.conditions_options
+        )
+        self.conditions.subscribe(self._on_conditions_changed)
+        self.network_conditions = self.conditions.view()
+    
+    def _on_conditions_changed(self, changed: List[int]):
+        """Deltas do motor de condições: descarta só as pontuações dos nós alterados"""
+        cache = self._score_cache
+        name = self.topology.name
+        for index in changed:
+            cache.pop(name(index), None)
+    
+    def tick_conditions(self, dt: float) -> List[str]:
+        """Avança as condições dt segundos; retorna os nós que mudaram"""
+        return [self.topology.name(index) for index in self.conditions.tick(dt)]
     
     def get_available_routes(self, current_node: str) -> List[str]:
         """Retorna rotas disponíveis de um nó"""
-        if current_node not in self.nodes:
+        topology = self.topology
+        index = topology.index(current_node)
+        if index is None:
             return []
         
         available = []
-        for next_node in self.nodes[current_node]:
-            conditions = self.network_conditions.get(next_node, {})
-            if conditions.get("status") == "active" and conditions.get("reliability", 0) > 0.3:
+        for neighbor in topology.neighbor_indices(index):
+            next_node = topology.name(neighbor)
+            if self.is_available(next_node):
                 available.append(next_node)
         
         return available
     
+    def is_available(self, node: str) -> bool:
+        """Nó ativo e com confiabilidade mínima para receber a mensagem"""
+        index = self.topology.index(node)
+        return index is not None and self.conditions.is_available(index)
+    
+    def update_conditions(self, node: str, **changes):
+        """Altera condições de um nó; o delta publicado invalida apenas a pontuação dele"""
+        index = self.topology.index(node)
+        if index is None:
+            raise KeyError(node)
+        self.conditions.set(index, **changes)
+    
+    def record_traffic(self, node: str, amount: float = 1.0):
+        """Carga de mensagens no nó (alimenta o congestionamento do próximo tick)"""
+        index = self.topology.index(node)
+        if index is not None:
+            self.conditions.record_load(index, amount)
+    
+    def invalidate_scores(self, node: Optional[str] = None):
+        """Descarta a pontuação em cache de um nó (ou de todos)"""
+        if node is None:
+            self._score_cache.clear()
+        else:
+            self._score_cache.pop(node, None)
+    
     def calculate_route_score(self, route: str) -> float:
-        """Calcula pontuação de uma rota baseada nas condições"""
-        conditions = self.network_conditions.get(route, {})
-        
-        # Pontuação baseada em múltiplos fatores
-        reliability = conditions.get("reliability", 0.5)
-        latency = conditions.get("latency", 100)
-        bandwidth = conditions.get("bandwidth", 10)
-        congestion = conditions.get("congestion", 0.5)
+        """Calcula pontuação de uma rota baseada nas condições (memoizada por nó)"""
+        score = self._score_cache.get(route)
+        if score is None:
+            index = self.topology.index(route)
+            if index is None:
+                reliability, latency, bandwidth, congestion = 0.5, 100, 10, 0.5
+            else:
+                columns = self.conditions.columns
+                # Pontuação baseada em múltiplos fatores
+                reliability = columns["reliability"][index]
+                latency = columns["latency"][index]
+                bandwidth = columns["bandwidth"][index]
+                congestion = columns["congestion"][index]
+            
+            # Fórmula de pontuação (maior = melhor)
+            score = (reliability * 100) + (bandwidth * 2) - (latency / 10) - (congestion * 50)
+            score = self._score_cache[route] = max(float(score), 0)
         
-        # Fórmula de pontuação (maior = melhor)
-        score = (reliability * 100) + (bandwidth * 2) - (latency / 10) - (congestion * 50)
+        return score
+    
+    def score_routes(self, routes: List[str]) -> List[float]:
+        """Pontua várias rotas de uma vez; com NumPy os nós fora do cache são calculados vetorizados"""
+        cache = self._score_cache
+        missing = [route for route in routes if route not in cache]
+        
+        if np is not None and len(missing) >= self.VECTORIZE_THRESHOLD:
+            index = self.topology.index
+            missing = [route for route in missing if index(route) is not None]
+            indices = np.fromiter((index(route) for route in missing), np.int64, len(missing))
+            columns = self.conditions.columns
+            # Lê direto das colunas do motor de condições
+            reliability = np.asarray(columns["reliability"])[indices]
+            latency = np.asarray(columns["latency"])[indices]
+            bandwidth = np.asarray(columns["bandwidth"])[indices]
+            congestion = np.asarray(columns["congestion"])[indices]
+            
+            scores = reliability * 100 + bandwidth * 2 - latency / 10 - congestion * 50
+            cache.update(zip(missing, np.maximum(scores, 0).tolist()))
         
-        return max(score, 0)
+        return [cache[route] if route in cache else self.calculate_route_score(route) for route in routes]
 
 
 class AdvancedThinkingMessage(ThinkingMessage):
@@ -136,6 +390,7 @@ class AdvancedThinkingMessage(ThinkingMessage):
         super().__init__(*args, **kwargs)
         self.logger = None
         self.network_simulator = None
+        self.planner: Optional[RoutePlanner] = None  # Modo planejador (caminhos mínimos)
         self.propagation_history = []
         self.decision_tree = []
     
@@ -147,6 +402,10 @@ class AdvancedThinkingMessage(ThinkingMessage):
         """Define o simulador de rede"""
         self.network_simulator = simulator
     
+    def set_planner(self, planner: Optional[RoutePlanner]):
+        """Ativa o modo planejador: segue caminhos mínimos em vez de escolher salto a salto"""
+        self.planner = planner
+    
     async def intelligent_propagation(self) -> bool:
         """Propagação inteligente com logs detalhados"""
         
@@ -157,6 +416,9 @@ class AdvancedThinkingMessage(ThinkingMessage):
         self.logger.log("INFO", f"Destino: {self.destination}")
         self.logger.log("INFO", f"Localização atual: {self.current_location}")
         
+        if self.planner is not None:
+            return await self._planned_propagation()
+        
         max_iterations = 50
         iteration = 0
         
@@ -178,14 +440,8 @@ class AdvancedThinkingMessage(ThinkingMessage):
                 await self._handle_dead_end()
                 continue
             
-            # IA pensa sobre as opções
-            context = f"Localização: {self.current_location}, Rotas: {available_routes}, Destino: {self.destination}"
-            thought = await self.think(context)
-            
-            self.logger.log("THINKING", f"IA pensou: {thought}")
-            
-            # Analisa e escolhe estratégia
-            strategy = await self._analyze_and_decide(available_routes, thought)
+            # Decide localmente; a explicação da IA (se ativada) chega em segundo plano
+            strategy = await self._analyze_and_decide(available_routes)
             
             # Executa estratégia
             success = await self._execute_strategy(strategy, available_routes)
@@ -196,53 +452,81 @@ class AdvancedThinkingMessage(ThinkingMessage):
                 self.logger.log("WARNING", "Estratégia falhou, tentando alternativa")
             
             # Simula delay de rede
-            await asyncio.sleep(0.5)
+            await get_clock().sleep(0.5)
         
         self.logger.log("ERROR", "Limite de iterações atingido sem entrega")
         return False
     
-    async def _analyze_and_decide(self, available_routes: List[str], ai_thought: str) -> Dict[str, Any]:
-        """Analisa opções e decide estratégia"""
+    async def _planned_propagation(self) -> bool:
+        """Segue a árvore de caminhos mínimos; enlaces que falham disparam replanejamento"""
+        planner = self.planner
+        planned = planner.path(self.current_location, self.destination)
+        self.logger.log("THINKING", f"Caminho planejado com {max(len(planned) - 1, 0)} saltos: {planned}")
         
-        # Avalia cada rota
-        route_scores = {}
-        for route in available_routes:
-            score = self.network_simulator.calculate_route_score(route)
-            route_scores[route] = score
+        max_failures = 50
+        failures = 0
         
-        # Ordena rotas por pontuação
-        sorted_routes = sorted(route_scores.items(), key=lambda x: x[1], reverse=True)
+        while failures < max_failures:
+            if self.current_location == self.destination:
+                self.logger.log("SUCCESS", "🎯 Mensagem chegou ao destino!")
+                return True
+            
+            next_node = planner.next_hop(self.current_location, self.destination)
+            if next_node is None:
+                self.logger.log("ERROR", f"Nenhum caminho de {self.current_location} até {self.destination}")
+                return False
+            
+            if await self._attempt_route(next_node):
+                self.propagation_history.append({
+                    "from": self.current_location,
+                    "to": next_node,
+                    "success": True,
+                    "timestamp": get_clock().time(),
+                    "strategy_used": "planned"
+                })
+                self.move_to(next_node, True)
+                self.logger.log("MOVEMENT", f"Movido com sucesso para {next_node}")
+            else:
+                failures += 1
+                planner.fail_link(self.current_location, next_node)
+                self.logger.log("WARNING", f"Enlace {self.current_location} -> {next_node} falhou, replanejando")
         
-        self.logger.log("INFO", f"Rotas avaliadas: {dict(sorted_routes)}")
+        self.logger.log("ERROR", "Limite de falhas atingido sem entrega")
+        return False
+    
+    async def _analyze_and_decide(self, available_routes: List[str]) -> Dict[str, Any]:
+        """Analisa opções e decide estratégia com o motor de decisão local"""
         
-        # Decide estratégia baseada no pensamento da IA
-        strategy = {
-            "type": "single_route",
-            "primary_route": sorted_routes[0][0] if sorted_routes else None,
-            "backup_routes": [r[0] for r in sorted_routes[1:3]],
-            "should_clone": False,
-            "should_anchor": False
-        }
+        # Avalia todas as rotas de uma vez (pontuações em cache por nó)
+        scores = self.network_simulator.score_routes(available_routes)
+        strategy = self.decision_engine.decide(self, available_routes, scores)
         
-        # IA decide se deve clonar
-        if len(available_routes) > 2 and "clone" in ai_thought.lower():
-            strategy["should_clone"] = True
-            strategy["type"] = "multi_route"
-            self.logger.log("THINKING", "IA decidiu criar clones para explorar múltiplas rotas")
+        self.logger.log("INFO", f"Rotas avaliadas: {dict(zip(available_routes, scores))}")
+        self.logger.log("THINKING", f"Decisão: {strategy['reason']}")
         
-        # IA decide se deve ancorar
-        if "ancorar" in ai_thought.lower() or "segur" in ai_thought.lower():
-            strategy["should_anchor"] = True
-            self.logger.log("THINKING", "IA decidiu ancorar antes de prosseguir")
+        if strategy["should_clone"]:
+            self.logger.log("THINKING", "Decidido criar clones para explorar múltiplas rotas")
+        if strategy["should_anchor"]:
+            self.logger.log("THINKING", "Decidido ancorar antes de prosseguir")
         
-        self.decision_tree.append({
+        entry = {
             "iteration": len(self.decision_tree) + 1,
             "location": self.current_location,
             "available_routes": available_routes,
-            "ai_thought": ai_thought,
+            "ai_thought": None,  # Preenchido pela explicação, se pedida
             "strategy": strategy,
-            "timestamp": time.time()
-        })
+            "timestamp": get_clock().time()
+        }
+        self.decision_tree.append(entry)
+        
+        context = (f"Localização: {self.current_location}, Rotas: {available_routes}, "
+                   f"Destino: {self.destination}, Decisão: {strategy['reason']}")
+        
+        def on_thought(thought: str):
+            entry["ai_thought"] = thought
+            self.logger.log("THINKING", f"IA explicou: {thought}")
+        
+        self.explain_in_background(context, on_thought)
         
         return strategy
     
@@ -280,7 +564,7 @@ class AdvancedThinkingMessage(ThinkingMessage):
                     "from": self.current_location,
                     "to": primary_route,
                     "success": True,
-                    "timestamp": time.time(),
+                    "timestamp": get_clock().time(),
                     "strategy_used": strategy["type"]
                 })
                 
@@ -310,12 +594,13 @@ class AdvancedThinkingMessage(ThinkingMessage):
         latency = conditions.get("latency", 100)
         
         self.logger.log("NETWORK", f"Tentando rota {route} (confiabilidade: {reliability:.2f})")
+        self.network_simulator.record_traffic(route)
         
         # Simula delay de rede
-        await asyncio.sleep(latency / 1000)
+        await get_clock().sleep(latency / 1000)
         
         # Simula sucesso/falha baseado na confiabilidade
-        success = random.random() < reliability
+        success = self.network_simulator.rng.random() < reliability
         
         if success:
             self.logger.log("SUCCESS", f"Rota {route} bem-sucedida")
@@ -345,7 +630,7 @@ class AdvancedThinkingMessage(ThinkingMessage):
             **base_report,
             "propagation_history": self.propagation_history,
             "decision_tree": self.decision_tree,
-            "log_count": len(self.logger.log_history) if self.logger else 0,
+            "log_count": self.logger.total_logged if self.logger else 0,
             "network_hops": len(self.path_taken),
             "success_rate": len([h for h in self.propagation_history if h["success"]]) / max(len(self.propagation_history), 1)
         }
@@ -378,8 +663,9 @@ async def test_advanced_messaging():
         content="Esta é uma mensagem inteligente avançada com logs reais!",
         destination="destination",
         source="origin",
-        timestamp=time.time(),
-        intelligence_level=8
+        timestamp=get_clock().time(),
+        intelligence_level=8,
+        explain_decisions=True
     )
     
     message.set_logger(logger)
@@ -389,7 +675,18 @@ async def test_advanced_messaging():
     # Executa propagação
     logger.log("INFO", "🎯 Iniciando teste de propagação inteligente")
     
-    success = await message.intelligent_propagation()
+    # Condições da rede evoluem em segundo plano durante a propagação
+    conditions_task = asyncio.create_task(network_simulator.conditions.run(interval=0.5))
+    try:
+        success = await message.intelligent_propagation()
+    finally:
+        conditions_task.cancel()
+    
+    # Explicações da IA chegam fora do caminho crítico; espera só para o relatório
+    await message.wait_explanations()
+    logger.flush()
+    print(f"🌐 Ticks de condições: {network_simulator.conditions.ticks}, "
+          f"deltas publicados: {network_simulator.conditions.deltas_published}")
     
     # Relatório final
     print("\n" + "=" * 60)
@@ -409,4 +706,10 @@ async def test_advanced_messaging():
 
 
 if __name__ == "__main__":
-    asyncio.run(test_advanced_messaging())
+    import sys
+    
+    if "--virtual" in sys.argv:
+        # Tempo virtual: esperas simuladas não consomem tempo real
+        run_virtual(test_advanced_messaging())
+    else:
+        asyncio.run(test_advanced_messaging())
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Benchmarks do motor de mensagens adaptativo
+"""
+
+import asyncio
+import io
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List, Set
+
+from adaptive_messenger import AdaptiveMessenger, Message, NetworkRoute, NetworkType
+from event_log import INFO, EventLog
+from message_scheduler import MessageScheduler
+
+
+@dataclass
+class LegacyMessage:
+    """Representação original de Message (dataclass com dicts/listas/sets) - referência"""
+    id: str
+    source: str
+    destination: str
+    content: str
+    timestamp: float
+    ttl: int = 100
+    path: List[str] = None
+    priority: int = 1
+    cognizant: bool = True
+    deliveries: Set[str] = None
+    clone_count: int = 0
+    learning_data: Dict = None
+
+    def __post_init__(self):
+        if self.deliveries is None:
+            self.deliveries = set()
+        if self.path is None:
+            self.path = []
+        if self.learning_data is None:
+            self.learning_data = {
+                'successful_routes': [],
+                'failed_routes': [],
+                'network_preferences': {},
+                'destination_hints': []
+            }
+
+
+def _queue_messages(message_class, count: int, hops: int) -> MessageScheduler:
+    """Enfileira mensagens com alguns saltos no caminho"""
+    queue = MessageScheduler()
+    content = "Mensagem de benchmark"
+    for i in range(count):
+        message = message_class(
+            id=str(uuid.uuid4()),
+            source="DEVICE_A",
+            destination=f"DEVICE_{i % 100}",
+            content=content,
+            timestamp=time.time(),
+            path=["DEVICE_A"]
+        )
+        for hop in range(hops):
+            message.path.append(f"relay_{hop}")
+        queue.push(message)
+    return queue
+
+
+def bench_message_memory(count: int = 100_000, hops: int = 5) -> Dict[str, float]:
+    """Bytes por mensagem enfileirada: representação antiga vs compacta"""
+    results = {}
+
+    for label, message_class in (("antes", LegacyMessage), ("depois", Message)):
+        # Aquece o registro de ids internados para não contar nomes de nós
+        _queue_messages(message_class, 100, hops)
+
+        tracemalloc.start()
+        queue = _queue_messages(message_class, count, hops)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results[label] = current / count
+        del queue
+
+    print(f"📦 Memória por mensagem enfileirada ({count} mensagens, {hops + 1} nós no caminho)")
+    print(f"   Antes:  {results['antes']:.0f} bytes")
+    print(f"   Depois: {results['depois']:.0f} bytes")
+    print(f"   Redução: {(1 - results['depois'] / results['antes']) * 100:.1f}%")
+    return results
+
+
+def _legacy_clone(message: LegacyMessage, device_id: str) -> LegacyMessage:
+    """Clonagem original: copia caminho, entregas e aprendizado a cada clone"""
+    clone = LegacyMessage(
+        id=message.id,
+        source=message.source,
+        destination=message.destination,
+        content=message.content,
+        timestamp=message.timestamp,
+        ttl=max(message.ttl - 10, 20),
+        path=message.path.copy(),
+        priority=message.priority,
+        cognizant=message.cognizant,
+        deliveries=message.deliveries.copy(),
+        clone_count=message.clone_count + 1,
+        learning_data=message.learning_data.copy()
+    )
+    clone.learning_data['destination_hints'].append(device_id)
+    return clone
+
+
+def _fork_clone(message: Message, device_id: str) -> Message:
+    """Clonagem copy-on-write"""
+    clone = message.fork(ttl=max(message.ttl - 10, 20))
+    clone.learning_data.add_hint(device_id)
+    return clone
+
+
+def _with_history(message_class, hops: int, attempts: int):
+    """Mensagem com caminho longo e histórico de aprendizado"""
+    message = message_class(
+        id=str(uuid.uuid4()),
+        source="DEVICE_A",
+        destination="DEVICE_Z",
+        content="Mensagem de benchmark " * 20,
+        timestamp=time.time(),
+        path=[f"relay_{hop}" for hop in range(hops)]
+    )
+    route_info = {'network_type': 'wifi', 'next_hop': 'relay_1', 'signal_strength': 0.9,
+                  'latency': 20.0, 'timestamp': time.time()}
+    for _ in range(attempts):
+        if message_class is Message:
+            message.learning_data.record_attempt('wifi', 'relay_1', True)
+        else:
+            message.learning_data['successful_routes'].append(dict(route_info))
+    return message
+
+
+def bench_clone_fanout(fanout: int = 50_000, hops: int = 30, attempts: int = 20) -> Dict[str, Dict[str, float]]:
+    """
+    Custo de clonar uma mensagem em leque.
+
+    Tempo e memória são medidos em execuções separadas (o tracemalloc
+    pesa em cada alocação e distorceria o tempo). "clone" descarta cada
+    clone logo após criá-lo; "leque" mantém todos vivos numa lista. O
+    copy-on-write reduz a memória por clone; o tempo de um clone isolado
+    fica no ruído da cópia antiga.
+    """
+    results = {}
+
+    for label, message_class, clone in (("antes", LegacyMessage, _legacy_clone),
+                                        ("depois", Message, _fork_clone)):
+        message = _with_history(message_class, hops, attempts)
+
+        start = time.perf_counter()
+        for i in range(fanout):
+            clone(message, f"relay_{i % hops}")
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        clones = [clone(message, f"relay_{i % hops}") for i in range(fanout)]
+        fanned = time.perf_counter() - start
+        del clones
+
+        tracemalloc.start()
+        clones = [clone(message, f"relay_{i % hops}") for i in range(fanout)]
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del clones
+
+        results[label] = {"us_per_clone": single / fanout * 1e6, "us_per_fanout_clone": fanned / fanout * 1e6,
+                          "bytes_per_clone": current / fanout}
+
+    print(f"🔀 Clonagem em leque ({fanout} clones, {hops} saltos, {attempts} tentativas aprendidas)")
+    for label in ("antes", "depois"):
+        print(f"   {label.capitalize():7} {results[label]['us_per_clone']:.2f} µs/clone, "
+              f"{results[label]['us_per_fanout_clone']:.2f} µs/clone no leque, "
+              f"{results[label]['bytes_per_clone']:.0f} bytes/clone")
+    return results
+
+
+async def _drain_all(messenger: AdaptiveMessenger, route: NetworkRoute, count: int) -> float:
+    """Enfileira count mensagens e deixa o consumidor da fila encaminhá-las; retorna segundos"""
+    messenger.routing_table.upsert(route)
+    for _ in range(count):
+        messenger.message_queue.push(Message(
+            id=str(uuid.uuid4()), source="DEVICE_A", destination="DEVICE_B",
+            content="Leitura de sensor", timestamp=time.time(), path=["DEVICE_A"]
+        ))
+
+    start = time.perf_counter()
+    consumer = asyncio.create_task(messenger.process_message_queue())
+    while messenger.forwarded < count:
+        await asyncio.sleep(0.005)
+    elapsed = time.perf_counter() - start
+
+    consumer.cancel()
+    await asyncio.gather(consumer, return_exceptions=True)
+    return elapsed
+
+
+def bench_batching(count: int = 512, max_concurrency: int = 8, latency_ms: float = 100.0) -> Dict[str, float]:
+    """
+    Enlace LoRa de alta latência: envio individual vs pacotes agrupados.
+
+    As mensagens passam pelo consumidor da fila com max_concurrency vagas.
+    Sem agrupamento cada vaga fica presa durante a latência do enlace; com
+    agrupamento a mensagem libera a vaga ao entrar no lote, e um pacote leva
+    todas as que chegaram na janela.
+    """
+    route = NetworkRoute(network_type=NetworkType.LORA, signal_strength=1.0,
+                         latency=latency_ms, available=True, next_hop="DEVICE_B")
+    results = {}
+
+    for label, windows in (("individual", {NetworkType.LORA: 0.0}), ("agrupado", {NetworkType.LORA: 0.05})):
+        messenger = AdaptiveMessenger("DEVICE_A", max_concurrency=max_concurrency,
+                                      batch_windows=windows, verbose=False)
+        elapsed = asyncio.run(_drain_all(messenger, route, count))
+        results[label] = count / elapsed
+        results[f"{label}_quadros"] = messenger.transmissions
+
+    print(f"📡 Enlace LoRa ({count} mensagens, latência {latency_ms:.0f}ms, {max_concurrency} vagas na fila)")
+    print(f"   Individual: {results['individual']:.1f} msg/s, {results['individual_quadros']} quadros")
+    print(f"   Agrupado:   {results['agrupado']:.1f} msg/s, {results['agrupado_quadros']} quadros")
+    return results
+
+
+class _SlowStream(io.StringIO):
+    """Stream com custo fixo por escrita, como um terminal ou pipe cheio"""
+
+    def write(self, text: str) -> int:
+        time.sleep(0.00005)
+        return super().write(text)
+
+
+def bench_logging(count: int = 20_000) -> Dict[str, float]:
+    """Custo por evento no caminho de roteamento: print síncrono vs fila estruturada vs silencioso"""
+    sink = _SlowStream()
+    message_id = str(uuid.uuid4())
+    results = {}
+
+    start = time.perf_counter()
+    for _ in range(count):
+        print(f"[DEVICE_A] Roteando mensagem {message_id[:8]} para DEVICE_B", file=sink)
+    results["print"] = (time.perf_counter() - start) / count * 1e6
+
+    events = EventLog(stream=sink)
+    messenger = AdaptiveMessenger("DEVICE_A", event_log=events)
+    start = time.perf_counter()
+    for _ in range(count):
+        messenger._log("routing", INFO, "routing", message_id, "DEVICE_B")
+    results["fila"] = (time.perf_counter() - start) / count * 1e6
+    events.flush()
+    events.close()
+
+    messenger = AdaptiveMessenger("DEVICE_A", verbose=False)
+    start = time.perf_counter()
+    for _ in range(count):
+        messenger._log("routing", INFO, "routing", message_id, "DEVICE_B")
+    results["silencioso"] = (time.perf_counter() - start) / count * 1e6
+
+    print(f"📝 Custo de log no caminho de roteamento ({count} eventos)")
+    print(f"   print síncrono: {results['print']:.3f} µs/evento")
+    print(f"   Fila estruturada: {results['fila']:.3f} µs/evento")
+    print(f"   Silencioso: {results['silencioso']:.3f} µs/evento")
+    return results
+
+
+if __name__ == "__main__":
+    print("🚀 Benchmarks do Sistema de Mensagens Adaptativo")
+    print("=" * 60)
+    bench_message_memory()
+    bench_clone_fanout()
+    bench_batching()
+    bench_logging()
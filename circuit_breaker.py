@@ -0,0 +1,116 @@
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from clock import get_clock
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Disjuntor sobre uma janela deslizante de chamadas.
+
+    Chamadas com erro, ou mais lentas que latency_threshold, contam como
+    falha. Com pelo menos min_calls na janela e taxa de falhas acima de
+    failure_rate o disjuntor abre: allow() passa a negar, e quem chama usa o
+    fallback local na hora. Depois de reset_timeout ele fica meio aberto e
+    deixa passar uma chamada de teste, que fecha o disjuntor se der certo ou
+    o reabre se falhar.
+    """
+
+    def __init__(self, failure_rate: float = 0.5, min_calls: int = 5, window: int = 20,
+                 latency_threshold: float = 3.0, reset_timeout: float = 30.0,
+                 on_state_change: Optional[Callable[[str, str], None]] = None):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.latency_threshold = latency_threshold
+        self.reset_timeout = reset_timeout
+        self.on_state_change = on_state_change
+        self._outcomes: deque = deque(maxlen=window)  # True = falha
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+        self.trips = 0
+        self.short_circuits = 0
+        self.successes = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.transitions: List[Dict[str, Any]] = []
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and get_clock().time() - self._opened_at >= self.reset_timeout:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def allow(self) -> bool:
+        """Pode chamar o serviço agora? (no estado meio aberto só uma chamada de teste)"""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        self.short_circuits += 1
+        return False
+
+    def release_probe(self):
+        """Chamada de teste abandonada sem resultado (ex.: cancelada): libera a vaga"""
+        if self._state == HALF_OPEN:
+            self._probe_in_flight = False
+
+    def record_success(self, latency: float):
+        if latency > self.latency_threshold:
+            self.slow_calls += 1
+            self.record_failure()
+            return
+        self.successes += 1
+        self._probe_in_flight = False
+        if self._state == OPEN:
+            return
+        if self._state == HALF_OPEN:
+            self._outcomes.clear()
+            self._transition(CLOSED)
+        self._outcomes.append(False)
+
+    def record_failure(self):
+        self.failures += 1
+        self._probe_in_flight = False
+        if self._state == OPEN:  # Chamada que já estava em voo quando abriu
+            return
+        if self._state == HALF_OPEN:
+            self._open()
+            return
+        self._outcomes.append(True)
+        if len(self._outcomes) >= self.min_calls and \
+                sum(self._outcomes) / len(self._outcomes) >= self.failure_rate:
+            self._open()
+
+    def _open(self):
+        self._opened_at = get_clock().time()
+        self.trips += 1
+        self._transition(OPEN)
+
+    def _transition(self, state: str):
+        previous = self._state
+        if previous == state:
+            return
+        self._state = state
+        self.transitions.append({"from": previous, "to": state, "timestamp": get_clock().time()})
+        if self.on_state_change is not None:
+            self.on_state_change(previous, state)
+
+    def stats(self) -> Dict[str, Any]:
+        window = len(self._outcomes)
+        return {
+            "state": self.state,
+            "trips": self.trips,
+            "short_circuits": self.short_circuits,
+            "successes": self.successes,
+            "failures": self.failures,
+            "slow_calls": self.slow_calls,
+            "window_failure_rate": sum(self._outcomes) / window if window else 0.0
+        }
@@ -0,0 +1,129 @@
+import asyncio
+import selectors
+import time
+from typing import Awaitable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class SystemClock:
+    """Relógio real: time.time() e asyncio.sleep"""
+
+    def time(self) -> float:
+        return time.time()
+
+    async def sleep(self, delay: float):
+        await asyncio.sleep(delay)
+
+
+class LoopClock(SystemClock):
+    """
+    Relógio lido do event loop em execução.
+
+    Em um VirtualTimeEventLoop o tempo é virtual e asyncio.sleep avança
+    instantaneamente; em um loop comum equivale ao relógio real.
+    """
+
+    def __init__(self, epoch: float = 0.0):
+        self.epoch = epoch
+
+    def time(self) -> float:
+        try:
+            return self.epoch + asyncio.get_running_loop().time()
+        except RuntimeError:
+            return time.time()
+
+
+SYSTEM_CLOCK = SystemClock()
+_current_clock = SYSTEM_CLOCK
+
+
+def get_clock():
+    """Relógio global usado pelos módulos de simulação"""
+    return _current_clock
+
+
+def set_clock(clock) -> SystemClock:
+    """Troca o relógio global; retorna o anterior"""
+    global _current_clock
+    previous = _current_clock
+    _current_clock = clock or SYSTEM_CLOCK
+    return previous
+
+
+class _VirtualSelector(selectors.BaseSelector):
+    """Seletor que, em vez de bloquear até o próximo timer, avança o tempo virtual"""
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self.loop = None
+
+    def select(self, timeout=None):
+        if timeout is None:
+            # Nada agendado: só resta esperar E/S real (ex.: call_soon_threadsafe)
+            return self._selector.select(None)
+
+        if len(self._selector.get_map()) > 1:
+            # Há sockets reais além do self-pipe do loop (ex.: chamada HTTP):
+            # espera de verdade para que seus timeouts não disparem antes da resposta
+            events = self._selector.select(timeout)
+        else:
+            events = self._selector.select(0)
+        if not events and timeout > 0:
+            self.loop.advance(timeout)
+        return events
+
+    def register(self, fileobj, events, data=None):
+        return self._selector.register(fileobj, events, data)
+
+    def unregister(self, fileobj):
+        return self._selector.unregister(fileobj)
+
+    def modify(self, fileobj, events, data=None):
+        return self._selector.modify(fileobj, events, data)
+
+    def get_map(self):
+        return self._selector.get_map()
+
+    def close(self):
+        self._selector.close()
+
+
+class VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+    """
+    Event loop com tempo virtual.
+
+    loop.time() começa em zero e só avança quando não há nada pronto para
+    executar, saltando direto para o próximo timer. asyncio.sleep, call_later
+    e wait_for passam a custar praticamente nada em tempo de parede.
+    """
+
+    def __init__(self):
+        selector = _VirtualSelector()
+        super().__init__(selector)
+        selector.loop = self
+        self._virtual_time = 0.0
+
+    def time(self) -> float:
+        return self._virtual_time
+
+    def advance(self, seconds: float):
+        self._virtual_time += seconds
+
+
+def run_virtual(main: Awaitable[T], epoch: Optional[float] = None) -> T:
+    """
+    Executa main em um VirtualTimeEventLoop com o relógio global virtual.
+
+    O relógio começa em epoch (padrão: agora), então timestamps continuam
+    plausíveis; horas de tráfego simulado terminam em segundos.
+    """
+    loop = VirtualTimeEventLoop()
+    previous = set_clock(LoopClock(time.time() if epoch is None else epoch))
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(main)
+    finally:
+        set_clock(previous)
+        asyncio.set_event_loop(None)
+        loop.close()
@@ -98,8 +98,8 @@ class CognitiveMessageServer:
                 'created_at': msg_data['created_at'].isoformat(),
                 'attempts': msg_data['attempts'],
                 'delivery_confirmed': msg_data['delivery_confirmed'],
-                'learning_data': msg_data['message'].learning_data,
-                'path': msg_data['message'].path,
+                'learning_data': msg_data['message'].learning_view.to_dict(self.messenger.clock.time()) if msg_data['message'].learning_view else {},
+                'path': list(msg_data['message'].path),
                 'clone_count': msg_data['message'].clone_count
             }
         return None
@@ -188,11 +188,11 @@ def monitor_messages():
                 message = msg_data['message']
                 
                 # Verifica se mensagem foi entregue
-                if message.destination in message.deliveries and not msg_data['delivery_confirmed']:
+                if message.was_delivered_to(message.destination) and not msg_data['delivery_confirmed']:
                     cognitive_server.confirm_delivery(message_id)
                 
                 # Atualiza tentativas
-                msg_data['attempts'] = len(message.learning_data['successful_routes']) + len(message.learning_data['failed_routes'])
+                msg_data['attempts'] = message.learning_view.attempts if message.learning_view else 0
                 msg_data['last_attempt'] = time.time()
                 
                 # Emite atualização via WebSocket
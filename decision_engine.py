@@ -0,0 +1,125 @@
+import itertools
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from thought_cache import failure_bucket
+
+# Faixas de cada característica (o produto define o tamanho da tabela)
+FAILURE_BUCKETS = 5     # 0, 1, 2-3, 4-7, 8+ falhas
+ROUTE_BUCKETS = 4       # 0, 1, 2, 3+ rotas
+PHYSICAL_STATES = 4     # sem análise, single_medium, multi_medium, impossible
+MARGIN_STATES = 3       # rota clara, empate técnico, melhor rota fraca
+PHYSICAL_CODES = {"single_medium": 1, "multi_medium": 2, "impossible": 3}
+
+CLEAR, CLOSE, WEAK = range(MARGIN_STATES)
+
+
+def _rule(failures: int, routes: int, physical: int, margin: int, anchored: int, smart: int) -> Tuple[bool, bool, str]:
+    """Regras de decisão: (clonar, ancorar, motivo)"""
+    many_failures = failures >= 3  # 4+ falhas, como em _basic_thinking
+    impossible = physical == 3
+
+    should_anchor = not anchored and (many_failures or impossible)
+    should_clone = routes >= 3 and (many_failures or physical == 2 or margin == WEAK
+                                    or (margin == CLOSE and bool(smart)))
+
+    if many_failures:
+        reason = "muitas falhas: ancorar e explorar rotas paralelas"
+    elif impossible:
+        reason = "transmissão fisicamente inviável: ancorar para economizar energia"
+    elif should_clone and physical == 2:
+        reason = "estratégia multi-meio: dividir a mensagem entre rotas"
+    elif should_clone and margin == WEAK:
+        reason = "melhor rota fraca: clonar pelas alternativas"
+    elif should_clone:
+        reason = "rotas equilibradas: clonar pelas melhores"
+    elif routes == 0:
+        reason = "sem rotas disponíveis"
+    else:
+        reason = "rota clara: seguir pela melhor"
+    return should_clone, should_anchor, reason
+
+
+class DecisionEngine:
+    """
+    Decisão local de estratégia (clonar/ancorar) sem chamar o LLM.
+
+    As regras são avaliadas uma única vez para todas as combinações de
+    características discretizadas (faixa de falhas, número de rotas,
+    estratégia física, margem entre as melhores rotas, ancoragem e nível de
+    inteligência) e guardadas numa tabela; decidir é só calcular o índice e
+    ler a tabela, em microssegundos.
+    """
+
+    def __init__(self, close_margin: float = 0.1, weak_score: float = 50.0, smart_level: int = 7):
+        self.close_margin = close_margin  # Diferença relativa abaixo da qual as rotas empatam
+        self.weak_score = weak_score      # Pontuação abaixo da qual a melhor rota é fraca
+        self.smart_level = smart_level    # intelligence_level a partir do qual explora empates
+        self._table: List[Tuple[bool, bool, str]] = [
+            _rule(*features) for features in itertools.product(
+                range(FAILURE_BUCKETS), range(ROUTE_BUCKETS), range(PHYSICAL_STATES),
+                range(MARGIN_STATES), range(2), range(2)
+            )
+        ]
+        self.decisions = 0
+
+    def _margin(self, scores: Sequence[float]) -> int:
+        if not scores:
+            return CLEAR
+        best = scores[0]
+        if best < self.weak_score:
+            return WEAK
+        if len(scores) > 1 and best - scores[1] <= self.close_margin * best:
+            return CLOSE
+        return CLEAR
+
+    def features(self, message, route_count: int, sorted_scores: Sequence[float] = ()) -> Tuple[int, ...]:
+        strategy = (message.physical_analysis or {}).get("recommended_strategy") or {}
+        return (
+            failure_bucket(len(message.memory['failed_attempts'])),
+            min(route_count, ROUTE_BUCKETS - 1),
+            PHYSICAL_CODES.get(strategy.get("strategy"), 0),
+            self._margin(sorted_scores),
+            int(message.current_location in message.anchored_locations),
+            int(message.intelligence_level >= self.smart_level)
+        )
+
+    def lookup(self, features: Tuple[int, ...]) -> Tuple[bool, bool, str]:
+        failures, routes, physical, margin, anchored, smart = features
+        index = (((((failures * ROUTE_BUCKETS + routes) * PHYSICAL_STATES + physical)
+                   * MARGIN_STATES + margin) * 2 + anchored) * 2 + smart)
+        return self._table[index]
+
+    def decide(self, message, routes: List[str], scores: Optional[List[float]] = None) -> Dict[str, Any]:
+        """Estratégia no formato de _analyze_and_decide; com pontuações as rotas são ordenadas"""
+        if scores is not None:
+            ranked = sorted(zip(routes, scores), key=lambda item: item[1], reverse=True)
+            routes = [route for route, _ in ranked]
+            sorted_scores = [score for _, score in ranked]
+        else:
+            sorted_scores = ()
+
+        should_clone, should_anchor, reason = self.lookup(self.features(message, len(routes), sorted_scores))
+        self.decisions += 1
+        return {
+            "type": "multi_route" if should_clone else "single_route",
+            "primary_route": routes[0] if routes else None,
+            "backup_routes": routes[1:3],
+            "should_clone": should_clone,
+            "should_anchor": should_anchor,
+            "reason": reason
+        }
+
+
+_decision_engine = DecisionEngine()
+
+
+def get_decision_engine() -> DecisionEngine:
+    return _decision_engine
+
+
+def set_decision_engine(engine: DecisionEngine) -> DecisionEngine:
+    """Troca o motor global; retorna o anterior"""
+    global _decision_engine
+    previous = _decision_engine
+    _decision_engine = engine
+    return previous
@@ -0,0 +1,127 @@
+import hashlib
+import math
+import time
+from collections import deque
+from typing import Callable, Hashable
+
+
+class BloomFilter:
+    """Filtro de Bloom simples sobre bytearray (hash duplo com blake2b)"""
+
+    def __init__(self, capacity: int, false_positive_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size_bits = max(8, int(-capacity * math.log(false_positive_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.size_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: Hashable):
+        digest = hashlib.blake2b(str(key).encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size_bits
+
+    def add(self, key: Hashable):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: Hashable) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class DedupCache:
+    """
+    Cache de deduplicação com expiração por tempo e limite de memória.
+
+    As entradas ficam em um anel de baldes de tempo: cada balde cobre
+    ttl / buckets segundos e é descartado inteiro quando expira ou quando o
+    total ultrapassa max_entries. A expiração acontece aos poucos durante
+    add/consulta, sem limpezas em massa. No modo "bloom" cada balde é um
+    filtro de Bloom (memória fixa, com pequena taxa de falsos positivos).
+    """
+
+    MODES = ("exact", "bloom")
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 100_000, buckets: int = 10,
+                 mode: str = "exact", false_positive_rate: float = 0.001,
+                 clock: Callable[[], float] = time.time):
+        if mode not in self.MODES:
+            raise ValueError(f"Modo de deduplicação inválido: {mode}")
+
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.mode = mode
+        self.false_positive_rate = false_positive_rate
+        self.buckets = buckets
+        self.bucket_span = ttl / buckets
+        self.bucket_capacity = max(1, max_entries // buckets)
+        self._clock = clock
+        self._buckets = deque()  # (início, conjunto/filtro)
+        self._size = 0
+
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key: Hashable) -> bool:
+        self._expire(self._clock())
+        return any(key in entries for _, entries in self._buckets)
+
+    def add(self, key: Hashable):
+        """Registra uma chave no balde corrente"""
+        now = self._clock()
+        self._expire(now)
+
+        if (not self._buckets
+                or now - self._buckets[-1][0] >= self.bucket_span
+                or len(self._buckets[-1][1]) >= self.bucket_capacity):
+            self._buckets.append((now, self._new_bucket()))
+
+        entries = self._buckets[-1][1]
+        before = len(entries)
+        entries.add(key)
+        self._size += len(entries) - before
+
+        while self._size > self.max_entries and len(self._buckets) > 1:
+            self._evict_oldest()
+
+    def check_and_add(self, key: Hashable) -> bool:
+        """Retorna True se a chave já foi vista; caso contrário a registra"""
+        if key in self:
+            return True
+        self.add(key)
+        return False
+
+    def clear(self):
+        self._buckets.clear()
+        self._size = 0
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "entries": self._size,
+            "buckets": len(self._buckets),
+            "evicted": self.evicted
+        }
+
+    def _new_bucket(self):
+        if self.mode == "bloom":
+            # A consulta passa por todos os baldes: divide a taxa de erro entre eles
+            return BloomFilter(self.bucket_capacity, self.false_positive_rate / self.buckets)
+        return set()
+
+    def _expire(self, now: float):
+        """Descarta baldes mais antigos que o TTL"""
+        while self._buckets and now - self._buckets[0][0] >= self.ttl + self.bucket_span:
+            self._evict_oldest()
+
+    def _evict_oldest(self):
+        _, entries = self._buckets.popleft()
+        self._size -= len(entries)
+        self.evicted += len(entries)
@@ -8,6 +8,9 @@ from enum import Enum
 import logging
 import random
 
+from clock import get_clock, run_virtual
+from sim_random import get_rng
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -67,7 +70,8 @@ class ElectricalCognitionEngine:
     Mantém a consciência distribuída através de ancoragem física
     """
     
-    def __init__(self, total_power_watts: float = 100.0):
+    def __init__(self, total_power_watts: float = 100.0, rng: Optional[random.Random] = None):
+        self.rng = rng or get_rng("electrical_cognition")
         self.total_power_watts = total_power_watts
         self.available_power = total_power_watts
         self.electrical_network: Dict[str, ElectricalNode] = {}
@@ -310,11 +314,11 @@ class ElectricalCognitionEngine:
         """Ancora o nó fisicamente no ambiente elétrico"""
         
         # Simula processo de ancoragem física
-        anchoring_time = random.uniform(0.1, 0.5)  # 100-500ms
-        await asyncio.sleep(anchoring_time)
+        anchoring_time = self.rng.uniform(0.1, 0.5)  # 100-500ms
+        await get_clock().sleep(anchoring_time)
         
         # Estabelece propriedades elétricas baseadas no ambiente
-        environmental_factor = random.uniform(0.8, 1.2)
+        environmental_factor = self.rng.uniform(0.8, 1.2)
         node.resistance *= environmental_factor
         node.capacitance *= environmental_factor
         
@@ -383,7 +387,7 @@ class ElectricalCognitionEngine:
                 logger.warning(f"⚠️ {action}")
             
             # Simula sincronização neural
-            if random.random() < 0.1:  # 10% chance de dessincronização
+            if self.rng.random() < 0.1:  # 10% chance de dessincronização
                 cognitive_maintenance["synchronization_status"] = "resyncing"
                 cognitive_maintenance["cognitive_coherence"] *= 0.95
         
@@ -414,7 +418,7 @@ class ElectricalCognitionEngine:
         for i in range(len(nodes) - 1):
             await self._establish_electrical_connection(nodes[i].id, nodes[i + 1].id)
         
-        await asyncio.sleep(0.2)  # Tempo de sincronização
+        await get_clock().sleep(0.2)  # Tempo de sincronização
         logger.info("✅ Coerência cognitiva restaurada")
     
     def _calculate_distance(self, pos1: Tuple[float, float, float],
@@ -519,4 +523,10 @@ async def test_electrical_cognition():
     print(f"\n✅ Teste concluído!")
 
 if __name__ == "__main__":
-    asyncio.run(test_electrical_cognition())
+    import sys
+    
+    if "--virtual" in sys.argv:
+        # Tempo virtual: esperas simuladas não consomem tempo real
+        run_virtual(test_electrical_cognition())
+    else:
+        asyncio.run(test_electrical_cognition())
@@ -0,0 +1,185 @@
+import atexit
+import queue
+import sys
+import threading
+import time
+from typing import Dict, Optional, TextIO, Tuple
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+SILENT = 100
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR", SILENT: "SILENT"}
+
+
+class EventLog:
+    """
+    Log estruturado com escrita em thread de fundo.
+
+    emit() só filtra por nível/amostragem e enfileira uma tupla
+    (momento, origem, componente, nível, evento, campos); a formatação pelo
+    modelo registrado do evento e a escrita no stream acontecem em lotes na
+    thread escritora, sem bloquear o event loop. Níveis podem ser trocados
+    por componente em tempo de execução.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, level: int = INFO, batch_size: int = 256):
+        self.stream = stream      # None = sys.stdout no momento da escrita
+        self.level = level
+        self.batch_size = batch_size
+        self._component_levels: Dict[str, int] = {}
+        self._sampling: Dict[str, int] = {}         # evento -> registra 1 a cada N
+        self._sample_counts: Dict[str, int] = {}
+        self._formats: Dict[str, str] = {}          # evento -> modelo str.format
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._count_lock = threading.Lock()  # emit() é chamado de várias threads
+
+        self.emitted = 0
+        self.sampled_out = 0
+        self.written = 0
+
+    def register(self, formats: Dict[str, str]):
+        """Registra modelos de formatação por nome de evento"""
+        self._formats.update(formats)
+
+    def set_level(self, level: int, component: Optional[str] = None):
+        """Nível global, ou de um componente (ex.: "transmit") em tempo de execução"""
+        if component is None:
+            self.level = level
+        else:
+            self._component_levels[component] = level
+
+    def sample(self, event: str, every: int):
+        """Registra só 1 a cada `every` ocorrências do evento (1 desliga a amostragem)"""
+        if every <= 1:
+            self._sampling.pop(event, None)
+        else:
+            self._sampling[event] = every
+
+    def enabled(self, component: str, level: int) -> bool:
+        return level >= self._component_levels.get(component, self.level)
+
+    def emit(self, source: str, component: str, level: int, event: str, *fields):
+        if level < self._component_levels.get(component, self.level):
+            return
+
+        every = self._sampling.get(event)
+        with self._count_lock:
+            if every:
+                count = self._sample_counts.get(event, 0)
+                self._sample_counts[event] = count + 1
+                if count % every:
+                    self.sampled_out += 1
+                    return
+            self.emitted += 1
+
+        self._queue.put((time.time(), source, component, level, event, fields))
+        if self._thread is None:
+            self._start()
+
+    def format(self, entry: Tuple) -> str:
+        _, source, _, _, event, fields = entry
+        template = self._formats.get(event)
+        if template is None:
+            text = f"{event} {' '.join(map(str, fields))}".rstrip()
+        else:
+            text = template.format(*fields)
+        return f"[{source}] {text}\n"
+
+    def flush(self, timeout: Optional[float] = 5.0):
+        """Espera a thread escritora drenar o que já foi enfileirado"""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self):
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(5.0)
+        self._thread = None
+
+    def stats(self) -> Dict[str, int]:
+        return {"emitted": self.emitted, "sampled_out": self.sampled_out, "written": self.written}
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._write_loop, name="event-log-writer", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            batch = []
+            waiters = []
+            stop = False
+
+            # Agrupa o que já estiver na fila em uma única escrita
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    try:
+                        batch.append(self.format(item))
+                    except Exception as e:
+                        batch.append(f"[event_log] Falha ao formatar {item[4]}: {e}\n")
+                if stop or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                stream = self.stream or sys.stdout
+                try:
+                    stream.write("".join(batch))
+                    stream.flush()
+                except (OSError, ValueError):
+                    pass
+                self.written += len(batch)
+
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                return
+
+
+class NullEventLog(EventLog):
+    """Modo silencioso: emit() não faz nada (nem filtra, nem enfileira)"""
+
+    def __init__(self):
+        super().__init__(level=SILENT)
+
+    def emit(self, source: str, component: str, level: int, event: str, *fields):
+        pass
+
+    def enabled(self, component: str, level: int) -> bool:
+        return False
+
+
+NULL_LOG = NullEventLog()
+_event_log = EventLog()
+
+
+def get_event_log() -> EventLog:
+    return _event_log
+
+
+def set_event_log(event_log: EventLog) -> EventLog:
+    """Troca o log global; retorna o anterior"""
+    global _event_log
+    previous = _event_log
+    _event_log = event_log
+    return previous
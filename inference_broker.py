@@ -0,0 +1,238 @@
+import asyncio
+import heapq
+import itertools
+import time
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from clock import get_clock
+from llm_client import LLMClient, get_llm_client
+
+
+def estimate_tokens(prompt: str, response_tokens: int = 128) -> int:
+    """Estimativa grosseira: ~4 caracteres por token no prompt + resposta esperada"""
+    return len(prompt) // 4 + response_tokens
+
+
+class _Lane:
+    """Fila e trabalhador do broker em um event loop"""
+
+    def __init__(self, max_pending: int, max_concurrency: int):
+        self.heap: List[Tuple[int, int, str, asyncio.Future, int]] = []
+        self.wakeup = asyncio.Event()
+        self.slots = asyncio.Semaphore(max_pending)         # Backpressure de quem envia
+        self.in_flight = asyncio.Semaphore(max_concurrency)  # Rajada paralela limitada
+        self.worker: Optional[asyncio.Task] = None
+        self.tasks = set()
+
+
+class InferenceBroker:
+    """
+    Agrupa pedidos de inferência concorrentes em micro-lotes.
+
+    generate() enfileira o prompt por prioridade (intelligence_level maior
+    sai primeiro) e espera a resposta. Um trabalhador por event loop junta o
+    que chegar durante `window` segundos e despacha até `max_batch` pedidos
+    como uma rajada paralela limitada a `max_concurrency` no cliente LLM
+    compartilhado (a API generateContent não aceita vários prompts por
+    requisição). Com `max_pending` pedidos em espera novos envios aguardam
+    vaga; um balde de tokens limita o consumo a `tokens_per_minute`.
+    """
+
+    def __init__(self, client: Optional[LLMClient] = None, window: float = 0.02, max_batch: int = 16,
+                 max_concurrency: int = 8, max_pending: int = 256, tokens_per_minute: int = 60_000):
+        self.client = client
+        self.window = window
+        self.max_batch = max_batch
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self.tokens_per_minute = tokens_per_minute
+        self._tokens = float(tokens_per_minute)
+        self._refilled_at: Optional[float] = None
+        self._sequence = itertools.count()
+        self._lanes: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _Lane]' = weakref.WeakKeyDictionary()
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self.budget_waits = 0
+        self.total_wait = 0.0
+
+    def _lane(self) -> _Lane:
+        loop = asyncio.get_running_loop()
+        lane = self._lanes.get(loop)
+        if lane is None:
+            lane = self._lanes[loop] = _Lane(self.max_pending, self.max_concurrency)
+        if lane.worker is None or lane.worker.done():
+            lane.worker = loop.create_task(self._work(lane))
+        return lane
+
+    async def generate(self, prompt: str, priority: int = 5) -> Optional[str]:
+        """Texto gerado (ou None), passando pela fila do broker"""
+        lane = self._lane()
+        await lane.slots.acquire()
+        try:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(lane.heap, (-priority, next(self._sequence), prompt, future, estimate_tokens(prompt)))
+            lane.wakeup.set()
+            self.submitted += 1
+            return await future
+        finally:
+            lane.slots.release()
+
+    # Orçamento de tokens
+
+    def _refill(self, now: float):
+        if self._refilled_at is not None:
+            rate = self.tokens_per_minute / 60.0
+            self._tokens = min(float(self.tokens_per_minute), self._tokens + (now - self._refilled_at) * rate)
+        self._refilled_at = now
+
+    def _reserve(self, tokens: int) -> float:
+        """Consome tokens do balde; se faltar, retorna quantos segundos esperar"""
+        self._refill(get_clock().time())
+        tokens = min(tokens, self.tokens_per_minute)
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return 0.0
+        return (tokens - self._tokens) / (self.tokens_per_minute / 60.0)
+
+    # Trabalhador
+
+    async def _work(self, lane: _Lane):
+        clock = get_clock()
+        while True:
+            if not lane.heap:
+                lane.wakeup.clear()
+                await lane.wakeup.wait()
+            if len(lane.heap) < self.max_batch and self.window > 0:
+                await clock.sleep(self.window)  # Janela para juntar pedidos concorrentes
+
+            batch = []
+            wait = 0.0
+            while lane.heap and len(batch) < self.max_batch:
+                # Só retira da fila com vaga livre: a prioridade vale até o despacho
+                if lane.in_flight.locked() and batch:
+                    break
+                await lane.in_flight.acquire()
+                while lane.heap and lane.heap[0][3].done():  # Quem pediu desistiu
+                    heapq.heappop(lane.heap)
+                if not lane.heap:
+                    lane.in_flight.release()
+                    break
+                _, _, prompt, future, tokens = lane.heap[0]
+                wait = self._reserve(tokens)
+                if wait > 0:
+                    lane.in_flight.release()
+                    break
+                heapq.heappop(lane.heap)
+                batch.append((prompt, future))
+
+            if batch:
+                self.batches += 1
+                self.largest_batch = max(self.largest_batch, len(batch))
+                for prompt, future in batch:
+                    task = asyncio.get_running_loop().create_task(self._dispatch(lane, prompt, future))
+                    lane.tasks.add(task)
+                    task.add_done_callback(lane.tasks.discard)
+            if wait > 0:
+                self.budget_waits += 1
+                self.total_wait += wait
+                await clock.sleep(wait)
+
+    async def _dispatch(self, lane: _Lane, prompt: str, future: asyncio.Future):
+        try:
+            if future.done():
+                return
+            result = await (self.client or get_llm_client()).generate(prompt)
+        except asyncio.CancelledError:
+            # Broker fechado (ou loop encerrando): quem pediu não fica esperando para sempre
+            if not future.done():
+                future.cancel()
+            raise
+        except Exception as e:
+            self.failed += 1
+            if not future.done():
+                future.set_exception(e)
+            return
+        finally:
+            lane.in_flight.release()
+        self.completed += 1
+        if not future.done():
+            future.set_result(result)
+
+    async def close(self):
+        """Encerra a fila do loop atual: cancela o trabalhador, os despachos e os pedidos em espera"""
+        lane = self._lanes.pop(asyncio.get_running_loop(), None)
+        if lane is None:
+            return
+        tasks = list(lane.tasks)
+        if lane.worker is not None:
+            tasks.append(lane.worker)
+        for task in tasks:
+            task.cancel()
+        while lane.heap:
+            future = heapq.heappop(lane.heap)[3]
+            if not future.done():
+                future.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "batches": self.batches,
+            "avg_batch": self.completed / self.batches if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "pending": sum(len(lane.heap) for lane in list(self._lanes.values())),
+            "budget_waits": self.budget_waits,
+            "budget_wait_seconds": self.total_wait,
+            "tokens_available": int(self._tokens)
+        }
+
+
+_inference_broker: Optional[InferenceBroker] = None
+
+
+def get_inference_broker() -> Optional[InferenceBroker]:
+    return _inference_broker
+
+
+def set_inference_broker(broker: Optional[InferenceBroker]) -> Optional[InferenceBroker]:
+    """Liga (ou desliga, com None) o broker global; retorna o anterior"""
+    global _inference_broker
+    previous = _inference_broker
+    _inference_broker = broker
+    return previous
+
+
+async def demo(messages: int = 200, latency: float = 0.05):
+    """Muitas mensagens pensando ao mesmo tempo contra o stub local"""
+    from llm_client import StubLLMServer
+
+    async with StubLLMServer(latency=latency) as server:
+        client = LLMClient(api_url=server.url, api_key="")
+        broker = InferenceBroker(client, max_concurrency=16, tokens_per_minute=600_000)
+        order = []
+
+        async def think(index: int, level: int):
+            await broker.generate(f"Mensagem {index} pensando", priority=level)
+            order.append(level)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(think(i, i % 10 + 1) for i in range(messages)))
+        elapsed = time.perf_counter() - started
+
+        print(f"⏱️ {messages} pensamentos em {elapsed * 1000:.1f} ms "
+              f"(pico de {server.connections} conexões no stub)")
+        print(f"🥇 Níveis atendidos primeiro: {order[:10]}")
+        print(f"📊 Broker: {broker.stats()}")
+        await broker.close()
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(demo())
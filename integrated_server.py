@@ -6,6 +6,9 @@ import time
 import json
 import uuid
 from datetime import datetime
+from inference_broker import InferenceBroker, get_inference_broker, set_inference_broker
+from llm_client import get_llm_client
+from thought_cache import get_thought_cache
 from intelligent_message import ThinkingMessage
 from delivery_channels import DeliveryManager, EmailChannel, SMSChannel
 import os
@@ -55,7 +58,8 @@ class IntelligentMessageServer:
             destination=destination,
             source="WEB_SERVER",
             timestamp=time.time(),
-            intelligence_level=ai_level
+            intelligence_level=ai_level,
+            explain_decisions=True
         )
         
         # Armazena no servidor
@@ -83,22 +87,21 @@ class IntelligentMessageServer:
         msg_data = self.active_messages[message_id]
         ai_message = msg_data['ai_message']
         
-        # ===== FASE 1: IA PENSA SOBRE A ENTREGA =====
-        self.emit_log(f"🤔 IA está pensando sobre como entregar a mensagem...")
-        
-        context = f"Preciso entregar para: {ai_message.destination}. Canal detectado: {self.delivery_manager.detect_channel(ai_message.destination)}"
-        thought = await ai_message.think(context)
-        
-        self.emit_log(f"💭 Pensamento da IA: {thought}")
-        
-        # ===== FASE 2: IA DECIDE ESTRATÉGIA =====
+        # ===== FASE 1: DECISÃO LOCAL SOBRE A ENTREGA =====
         detected_channel = self.delivery_manager.detect_channel(ai_message.destination)
+        decision = ai_message.decision_engine.decide(ai_message, [detected_channel] if detected_channel else [])
+        self.emit_log(f"🧭 Decisão: {decision['reason']}")
         
+        # O pensamento da IA explica a decisão em segundo plano, sem atrasar a entrega
+        context = f"Preciso entregar para: {ai_message.destination}. Canal detectado: {detected_channel}"
+        ai_message.explain_in_background(context, lambda thought: self.emit_log(f"💭 Pensamento da IA: {thought}"))
+        
+        # ===== FASE 2: ESTRATÉGIA =====
         if detected_channel:
             self.emit_log(f"✅ Canal detectado: {detected_channel}")
             
-            # IA decide se deve se ancorar antes de enviar
-            if "ancorar" in thought.lower() or "segur" in thought.lower():
+            # Ancora antes de enviar se a decisão pedir
+            if decision["should_anchor"]:
                 ai_message.anchor("pre_delivery", "safety_measure")
                 self.emit_log(f"🔗 IA decidiu se ancorar antes da entrega")
             
@@ -192,6 +195,18 @@ class IntelligentMessageServer:
 # Instância global do servidor
 intelligent_server = IntelligentMessageServer()
 
+# Event loop único em thread de fundo: todas as mensagens compartilham a sessão
+# (e o pool de conexões) do cliente LLM em vez de abrir um loop por requisição
+_ai_loop = asyncio.new_event_loop()
+threading.Thread(target=_ai_loop.run_forever, name="ai-loop", daemon=True).start()
+
+# Muitas mensagens simultâneas: pensamentos passam pelo broker (prioridade por nível de IA)
+set_inference_broker(InferenceBroker())
+
+def run_on_ai_loop(coro):
+    """Agenda a corrotina no loop de IA e retorna o Future concorrente"""
+    return asyncio.run_coroutine_threadsafe(coro, _ai_loop)
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -209,22 +224,14 @@ def send_message():
     if not destination or not content:
         return jsonify({'error': 'Destination e content são obrigatórios'}), 400
     
-    # Cria mensagem inteligente
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    
     try:
-        message_id, ai_message = loop.run_until_complete(
+        # Cria mensagem inteligente
+        message_id, ai_message = run_on_ai_loop(
             intelligent_server.create_intelligent_message(destination, content, priority, ai_level)
-        )
+        ).result()
         
-        # Inicia processamento em thread separada
-        def process_async():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(intelligent_server.process_intelligent_message(message_id))
-            
-        threading.Thread(target=process_async, daemon=True).start()
+        # Processamento segue em segundo plano no mesmo loop
+        run_on_ai_loop(intelligent_server.process_intelligent_message(message_id))
         
         return jsonify({
             'message_id': message_id,
@@ -254,6 +261,17 @@ def active_messages():
             messages[msg_id] = status
     return jsonify(messages)
 
+@app.route('/llm_metrics')
+def llm_metrics():
+    """Métricas do cliente LLM (disjuntor, prazos, hedging), do broker e do cache de pensamentos"""
+    broker = get_inference_broker()
+    cache = get_thought_cache()
+    return jsonify({
+        'client': get_llm_client().stats(),
+        'broker': broker.stats() if broker is not None else None,
+        'thought_cache': cache.stats() if cache is not None else None
+    })
+
 @socketio.on('connect')
 def handle_connect():
     print('🔌 Cliente conectado ao WebSocket')
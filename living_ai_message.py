@@ -580,6 +580,7 @@ async def test_living_ai_system():
     
     # IA vive e explora
     exploration_report = await ai_persona.live_and_explore()
+    logger.flush()
     
     # Relatório final
     print("\n" + "=" * 50)
@@ -0,0 +1,333 @@
+import asyncio
+import os
+import time
+import weakref
+from collections import deque
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+from circuit_breaker import OPEN, CircuitBreaker
+from event_log import INFO, WARNING, get_event_log
+
+try:
+    import httpx
+except ImportError:  # httpx é opcional: só é usado para HTTP/2
+    httpx = None
+
+# Configuração da API Gemini (GEMINI_API_URL permite apontar para um stub local)
+DEFAULT_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash-latest:generateContent"
+API_URL = os.environ.get('GEMINI_API_URL', DEFAULT_API_URL)
+API_KEY = os.environ.get('GEMINI_API_KEY', '')  # Só do ambiente: sem chave a API real não é chamada
+
+
+class LLMClient:
+    """
+    Cliente Gemini compartilhado pelo processo.
+
+    Mantém uma sessão por event loop (sessões aiohttp não atravessam loops)
+    com pool de conexões keep-alive, limite de conexões simultâneas por host
+    e timeout configurável; DNS fica em cache no conector. Com http2=True e
+    httpx[http2] instalado usa HTTP/2, multiplexando os pedidos numa conexão.
+
+    Cada pensamento tem um prazo (deadline): se a primeira tentativa não
+    respondeu em hedge_after segundos (padrão: p90 das latências recentes)
+    uma segunda é disparada e vale a que chegar primeiro; estourado o prazo,
+    generate() devolve None e a mensagem usa o pensamento local. Um disjuntor
+    corta as chamadas enquanto a API estiver falhando ou lenta.
+    """
+
+    EVENT_FORMATS = {"breaker_state": "⚡ Disjuntor do LLM: {0} -> {1}"}
+
+    def __init__(self, api_url: Optional[str] = None, api_key: Optional[str] = None,
+                 timeout: float = 10.0, connect_timeout: float = 3.0, limit: int = 100,
+                 limit_per_host: int = 16, keepalive_timeout: float = 30.0, http2: bool = False,
+                 deadline: Optional[float] = 4.0, hedge_after: Optional[float] = None, hedging: bool = True,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.api_url = api_url or API_URL
+        self.api_key = api_key if api_key is not None else API_KEY
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.http2 = http2 and httpx is not None
+        self._sessions: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]' = weakref.WeakKeyDictionary()
+        self.deadline = deadline        # Orçamento total por pensamento (None = só o timeout)
+        self.hedge_after = hedge_after  # Atraso da tentativa extra (None = adaptativo)
+        self.hedging = hedging
+        self.breaker = breaker or CircuitBreaker(on_state_change=self._on_breaker_change)
+        self._latencies: deque = deque(maxlen=64)
+
+        self.calls = 0        # Pensamentos pedidos (cada um pode gerar 2 requisições)
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.sessions_created = 0
+        self.total_latency = 0.0
+
+    @property
+    def url(self) -> str:
+        return f"{self.api_url}?key={self.api_key}" if self.api_key else self.api_url
+
+    def _session(self):
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or (session.is_closed if self.http2 else session.closed):
+            session = self._sessions[loop] = self._create_session()
+            self.sessions_created += 1
+        return session
+
+    def _create_session(self):
+        if self.http2:
+            return httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_connections=self.limit, max_keepalive_connections=self.limit_per_host,
+                                    keepalive_expiry=self.keepalive_timeout),
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout)
+            )
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=300
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout, sock_connect=self.connect_timeout)
+        )
+
+    def _on_breaker_change(self, previous: str, state: str):
+        event_log = get_event_log()
+        event_log.register(self.EVENT_FORMATS)
+        event_log.emit("llm", "breaker", WARNING if state == OPEN else INFO, "breaker_state", previous, state)
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.hedging or self.deadline is None:
+            return None
+        if self.hedge_after is not None:
+            return self.hedge_after
+        if len(self._latencies) < 8:
+            return self.deadline / 2
+        ordered = sorted(self._latencies)
+        return ordered[int(0.9 * (len(ordered) - 1))]
+
+    async def _post_once(self, payload: Dict) -> Optional[Dict]:
+        session = self._session()
+        self.requests += 1
+        if self.http2:
+            response = await session.post(self.url, json=payload)
+            return response.json() if response.status_code == 200 else None
+        async with session.post(self.url, json=payload) as response:
+            return await response.json() if response.status == 200 else None
+
+    async def _hedged(self, payload: Dict) -> Optional[Dict]:
+        """Primeira resposta válida entre a tentativa original e a extra, dentro do prazo"""
+        loop = asyncio.get_running_loop()
+        deadline = None if self.deadline is None else loop.time() + self.deadline
+        first = loop.create_task(self._post_once(payload))
+        pending = {first}
+        hedge_delay = self._hedge_delay()
+        hedged = False
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                remaining = None if deadline is None else deadline - loop.time()
+                if remaining is not None and remaining <= 0:
+                    break
+                timeout = remaining
+                if not hedged and hedge_delay is not None:
+                    timeout = min(hedge_delay, remaining)
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                    elif task.result() is not None:
+                        if task is not first:
+                            self.hedge_wins += 1
+                        return task.result()
+                
+                if not done and not hedged and hedge_delay is not None:
+                    # Tentativa original atrasada: dispara a extra
+                    hedged = True
+                    self.hedges += 1
+                    pending.add(loop.create_task(self._post_once(payload)))
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        if error is not None and not pending:
+            raise error
+        if deadline is not None and loop.time() >= deadline:
+            raise asyncio.TimeoutError()
+        return None
+
+    async def post(self, payload: Dict) -> Optional[Dict]:
+        """POST JSON na API; None se o disjuntor estiver aberto, o prazo estourar ou o status não for 200"""
+        if not self.api_key and self.api_url == DEFAULT_API_URL:
+            raise RuntimeError("GEMINI_API_KEY não definida: exporte a variável ou passe api_key ao LLMClient")
+        if not self.breaker.allow():
+            return None
+        self.calls += 1
+        started = time.perf_counter()
+        try:
+            data = await self._hedged(payload)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self.breaker.record_failure()
+            return None
+        except asyncio.CancelledError:
+            # Sem resultado não conta como sucesso nem falha, mas não pode prender a chamada de teste
+            self.breaker.release_probe()
+            raise
+        except Exception:
+            self.errors += 1
+            self.breaker.record_failure()
+            raise
+        finally:
+            self.total_latency += time.perf_counter() - started
+        
+        latency = time.perf_counter() - started
+        if data is None:
+            self.errors += 1
+            self.breaker.record_failure()
+        else:
+            self._latencies.append(latency)
+            self.breaker.record_success(latency)
+        return data
+
+    async def generate(self, prompt: str) -> Optional[str]:
+        """Texto gerado para o prompt, ou None se a API não respondeu com sucesso"""
+        data = await self.post({"contents": [{"parts": [{"text": prompt}]}]})
+        if data is None:
+            return None
+        return data['candidates'][0]['content']['parts'][0]['text']
+
+    async def close(self):
+        """Fecha a sessão do loop atual (as demais morrem com seus loops)"""
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await (session.aclose() if self.http2 else session.close())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "requests": self.requests,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "sessions_created": self.sessions_created,
+            "avg_latency_ms": self.total_latency / self.calls * 1000 if self.calls else 0.0,
+            "http2": self.http2,
+            "breaker": self.breaker.stats()
+        }
+
+
+_llm_client = LLMClient()
+
+
+def get_llm_client() -> LLMClient:
+    return _llm_client
+
+
+def set_llm_client(client: LLMClient) -> LLMClient:
+    """Troca o cliente global; retorna o anterior"""
+    global _llm_client
+    previous = _llm_client
+    _llm_client = client
+    return previous
+
+
+class StubLLMServer:
+    """Endpoint local no formato da API Gemini para testes e benchmarks sem rede"""
+
+    def __init__(self, latency: float = 0.0, reply: str = "Rota estável. Seguindo pelo melhor vizinho.",
+                 host: str = "127.0.0.1", port: int = 0):
+        self.latency = latency
+        self.reply = reply
+        self.host = host
+        self.port = port
+        self._runner = None
+        self._connections = set()
+        self.requests = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1beta/models/stub:generateContent"
+
+    @property
+    def connections(self) -> int:
+        """Conexões TCP distintas vistas pelo servidor (mede o reaproveitamento)"""
+        return len(self._connections)
+
+    async def _handle(self, request):
+        from aiohttp import web
+
+        self.requests += 1
+        self._connections.add(id(request.transport))
+        await request.read()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return web.json_response({"candidates": [{"content": {"parts": [{"text": self.reply}]}}]})
+
+    async def start(self) -> 'StubLLMServer':
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_post("/{tail:.*}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> 'StubLLMServer':
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+
+async def benchmark(calls: int = 200, concurrency: int = 20, latency: float = 0.005):
+    """Compara sessão nova por pensamento com o cliente compartilhado contra o stub"""
+    async with StubLLMServer(latency=latency) as server:
+        semaphore = asyncio.Semaphore(concurrency)
+        payload = {"contents": [{"parts": [{"text": "ping"}]}]}
+
+        async def fresh_session():
+            async with semaphore:
+                async with aiohttp.ClientSession() as session:
+                    async with session.post(server.url, json=payload) as response:
+                        await response.json()
+
+        client = LLMClient(api_url=server.url, api_key="")
+
+        async def shared_client():
+            async with semaphore:
+                await client.generate("ping")
+
+        for label, call in (("Sessão por pensamento", fresh_session), ("Cliente compartilhado", shared_client)):
+            before = server.connections
+            started = time.perf_counter()
+            await asyncio.gather(*(call() for _ in range(calls)))
+            elapsed = time.perf_counter() - started
+            print(f"  {label:<24} {elapsed * 1000:8.1f} ms  "
+                  f"{elapsed / calls * 1e6:8.1f} µs/pensamento  conexões: {server.connections - before}")
+
+        await client.close()
+        print(f"📊 Cliente: {client.stats()}")
+
+
+if __name__ == "__main__":
+    print("🧪 Benchmark do cliente LLM contra stub local")
+    asyncio.run(benchmark())
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Simulador de malha: milhares de AdaptiveMessenger em um único event loop
+com tempo virtual, topologias e modelos de enlace configuráveis
+"""
+
+import asyncio
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from adaptive_messenger import AdaptiveMessenger, Message, NetworkRoute, NetworkType
+from clock import LoopClock, VirtualTimeEventLoop
+from sim_random import BatchedRandom, SimRandom
+
+
+@dataclass
+class LinkModel:
+    """Características de um enlace simulado"""
+    network_type: NetworkType = NetworkType.MESH
+    latency_ms: float = 20.0
+    jitter_ms: float = 5.0
+    loss_rate: float = 0.01
+    signal_strength: float = 0.9
+    cost: float = 1.0
+
+
+class MeshNetwork:
+    """
+    Camada de enlace simulada entre nós do mesmo processo.
+
+    transmit() espera a latência (com jitter) do enlace, sorteia a perda de
+    cada quadro e entrega os que chegaram ao receive_message do vizinho.
+    Todo sorteio usa o mesmo random.Random semeado: a execução é reprodutível.
+    """
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.nodes: Dict[str, AdaptiveMessenger] = {}
+        self.links: Dict[Tuple[str, str], LinkModel] = {}
+
+        self.frames_sent = 0
+        self.frames_lost = 0
+
+    def attach(self, node: AdaptiveMessenger):
+        node.network = self
+        self.nodes[node.device_id] = node
+
+    def connect(self, a: str, b: str, model: LinkModel):
+        """Cria um enlace bidirecional e registra a rota direta nos dois lados"""
+        self.links[(a, b)] = self.links[(b, a)] = model
+        for local, remote in ((a, b), (b, a)):
+            node = self.nodes[local]
+            node.connect_peer(self.nodes[remote])
+            node.routing_table.upsert(NetworkRoute(
+                network_type=model.network_type,
+                signal_strength=model.signal_strength,
+                latency=model.latency_ms,
+                available=True,
+                next_hop=remote,
+                cost=model.cost
+            ), node.clock.time())
+
+    def neighbors(self, node_id: str) -> List[str]:
+        return list(self.nodes[node_id].peers)
+
+    async def transmit(self, sender: AdaptiveMessenger, route: NetworkRoute, messages: List[Message]) -> List[bool]:
+        model = self.links.get((sender.device_id, route.next_hop))
+        if model is None:
+            return [False] * len(messages)
+
+        delay = max(0.0, model.latency_ms + self.rng.gauss(0.0, model.jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+
+        loop = asyncio.get_running_loop()
+        receiver = self.nodes[route.next_hop]
+        results = []
+        for message in messages:
+            arrived = self.rng.random() >= model.loss_rate
+            if arrived:
+                # Entrega depois que o remetente termina de processar o resultado
+                loop.call_soon(receiver.receive_message, message)
+            else:
+                self.frames_lost += 1
+            results.append(arrived)
+
+        self.frames_sent += len(messages)
+        return results
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class MeshSimulator:
+    """
+    Executa uma malha de AdaptiveMessenger em tempo virtual e mede a entrega.
+
+    Topologias: "ring" (cada nó ligado a degree vizinhos mais próximos no
+    anel), "line", "grid" e "random" (anel + cordas aleatórias). Por padrão
+    só alguns sorvedouros se anunciam no distance-vector, mantendo o estado
+    de cada nó proporcional ao número de destinos e não ao tamanho da malha.
+    """
+
+    TOPOLOGIES = ("ring", "line", "grid", "random")
+
+    def __init__(self, node_count: int = 100, topology: str = "ring", degree: int = 4,
+                 link_models: Optional[List[LinkModel]] = None, seed: Optional[int] = 0,
+                 sinks: Optional[int] = 8, message_rate: float = 100.0, duration: float = 60.0,
+                 drain_time: float = 30.0, ttl: int = 100, routing_mode: str = "distance_vector",
+                 node_options: Optional[Dict] = None, batched_random: bool = False):
+        if topology not in self.TOPOLOGIES:
+            raise ValueError(f"Topologia inválida: {topology}")
+
+        self.node_count = node_count
+        self.topology = topology
+        self.degree = degree
+        self.link_models = link_models or [LinkModel()]
+        # seed=None sorteia uma semente, que fica registrada no relatório
+        self.rng = (BatchedRandom if batched_random else SimRandom)(seed)
+        self.seed = self.rng.initial_seed
+        self.sink_count = node_count if sinks is None else min(sinks, node_count)
+        self.message_rate = message_rate    # Mensagens por segundo virtual
+        self.duration = duration            # Segundos virtuais de tráfego
+        self.drain_time = drain_time        # Tempo extra para mensagens em trânsito
+        self.ttl = ttl
+        self.routing_mode = routing_mode
+        self.node_options = node_options or {}
+
+        self.network = MeshNetwork(self.rng)
+        self.node_ids: List[str] = []
+        self.sinks: List[str] = []
+
+        self.sent: Dict[str, float] = {}                   # id -> momento de envio
+        self.delivered: Dict[str, Tuple[float, int]] = {}  # id -> (latência, saltos)
+
+    def build(self):
+        """Cria os nós e enlaces da topologia"""
+        self.node_ids = [f"node_{i}" for i in range(self.node_count)]
+        self.sinks = self.rng.sample(self.node_ids, self.sink_count)
+        sink_set = set(self.sinks)
+        full_vector = self.sink_count == self.node_count
+
+        for node_id in self.node_ids:
+            node = AdaptiveMessenger(
+                node_id,
+                routing_mode=self.routing_mode,
+                clock=LoopClock(),
+                verbose=False,
+                route_max_age=math.inf,  # Enlaces estáticos: não há varredura para renová-los
+                announce_self=node_id in sink_set,
+                export_links=full_vector,
+                rng=self.rng.spawn(node_id),
+                **self.node_options
+            )
+            node.on_delivery = self._on_delivery
+            self.network.attach(node)
+
+        for a, b in self._edges():
+            self.network.connect(self.node_ids[a], self.node_ids[b], self.rng.choice(self.link_models))
+
+    def _edges(self) -> List[Tuple[int, int]]:
+        n = self.node_count
+        edges = set()
+
+        if self.topology == "line":
+            edges.update((i, i + 1) for i in range(n - 1))
+        elif self.topology == "grid":
+            width = max(1, int(math.ceil(math.sqrt(n))))
+            for i in range(n):
+                if (i + 1) % width and i + 1 < n:
+                    edges.add((i, i + 1))
+                if i + width < n:
+                    edges.add((i, i + width))
+        else:
+            for i in range(n):
+                for k in range(1, max(1, self.degree // 2) + 1):
+                    j = (i + k) % n
+                    if i != j:
+                        edges.add((min(i, j), max(i, j)))
+            if self.topology == "random":
+                # Cordas aleatórias encurtam o diâmetro (mundo pequeno)
+                for i in range(n):
+                    j = self.rng.randrange(n)
+                    if i != j:
+                        edges.add((min(i, j), max(i, j)))
+
+        return sorted(edges)
+
+    async def converge(self, max_rounds: int = 1000) -> int:
+        """Troca anúncios distance-vector em rodadas até estabilizar"""
+        nodes = list(self.network.nodes.values())
+        for node in nodes:
+            await node.send_advertisements(full=True)
+
+        for rounds in range(1, max_rounds + 1):
+            sent = 0
+            for node in nodes:
+                sent += await node.send_advertisements()
+            if not sent:
+                return rounds
+        return max_rounds
+
+    def _on_delivery(self, node: AdaptiveMessenger, message: Message):
+        if message.id in self.delivered or message.id not in self.sent:
+            return
+        latency = node.clock.time() - self.sent[message.id]
+        self.delivered[message.id] = (latency, len(message.path))
+
+    async def _inject_traffic(self):
+        """Gera tráfego com chegadas de Poisson de nós aleatórios para sorvedouros"""
+        loop = asyncio.get_running_loop()
+        end = loop.time() + self.duration
+        while True:
+            await asyncio.sleep(self.rng.expovariate(self.message_rate))
+            if loop.time() >= end:
+                return
+            source = self.network.nodes[self.rng.choice(self.node_ids)]
+            destination = self.rng.choice(self.sinks)
+            message = source.send_message(destination, "Leitura de sensor", priority=self.rng.randint(1, 5))
+            message.ttl = self.ttl
+            self.sent[message.id] = source.clock.time()
+
+    async def _run(self) -> Dict:
+        self.build()
+        rounds = await self.converge() if self.routing_mode == "distance_vector" else 0
+
+        tasks = []
+        for node in self.network.nodes.values():
+            tasks.append(asyncio.create_task(node.process_message_queue()))
+            tasks.append(asyncio.create_task(node.age_routes()))
+            if self.routing_mode == "distance_vector":
+                tasks.append(asyncio.create_task(node.advertise_routes()))
+
+        start = time.perf_counter()
+        await self._inject_traffic()
+        await asyncio.sleep(self.drain_time)
+        wall_time = time.perf_counter() - start
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        return self.report(rounds, wall_time)
+
+    def run(self) -> Dict:
+        """Executa a simulação inteira em um VirtualTimeEventLoop"""
+        loop = VirtualTimeEventLoop()
+        try:
+            return loop.run_until_complete(self._run())
+        finally:
+            loop.close()
+
+    def report(self, convergence_rounds: int, wall_time: float) -> Dict:
+        latencies = [latency for latency, _ in self.delivered.values()]
+        hops = [hop_count for _, hop_count in self.delivered.values()]
+        sent = len(self.sent)
+        delivered = len(self.delivered)
+
+        return {
+            "nodes": self.node_count,
+            "links": len(self.network.links) // 2,
+            "topology": self.topology,
+            "seed": self.seed,
+            "batched_random": isinstance(self.rng, BatchedRandom),
+            "convergence_rounds": convergence_rounds,
+            "sent": sent,
+            "delivered": delivered,
+            "delivery_ratio": delivered / sent if sent else 0.0,
+            "hops_mean": sum(hops) / len(hops) if hops else 0.0,
+            "hops_p50": _percentile(hops, 50),
+            "hops_p99": _percentile(hops, 99),
+            "latency_p50": _percentile(latencies, 50),
+            "latency_p99": _percentile(latencies, 99),
+            "messages_per_second": delivered / self.duration if self.duration else 0.0,
+            "frames_sent": self.network.frames_sent,
+            "frames_lost": self.network.frames_lost,
+            "virtual_time": self.duration + self.drain_time,
+            "wall_time": wall_time
+        }
+
+
+def print_report(report: Dict):
+    print(f"🕸️  Malha {report['topology']}: {report['nodes']} nós, {report['links']} enlaces (seed {report['seed']})")
+    print(f"   Convergência DV: {report['convergence_rounds']} rodadas")
+    print(f"   Entrega: {report['delivered']}/{report['sent']} ({report['delivery_ratio'] * 100:.1f}%)")
+    print(f"   Saltos: média {report['hops_mean']:.1f}, p50 {report['hops_p50']}, p99 {report['hops_p99']}")
+    print(f"   Latência: p50 {report['latency_p50'] * 1000:.0f}ms, p99 {report['latency_p99'] * 1000:.0f}ms")
+    print(f"   Vazão: {report['messages_per_second']:.1f} msg/s (virtual)")
+    print(f"   Quadros: {report['frames_sent']} enviados, {report['frames_lost']} perdidos")
+    print(f"   Tempo: {report['virtual_time']:.0f}s virtuais em {report['wall_time']:.1f}s reais")
+
+
+if __name__ == "__main__":
+    print("🚀 Simulador de Malha Adaptativa")
+    print("=" * 60)
+    simulator = MeshSimulator(
+        node_count=1000,
+        topology="random",
+        link_models=[
+            LinkModel(NetworkType.MESH, latency_ms=20, jitter_ms=5, loss_rate=0.01),
+            LinkModel(NetworkType.WIFI, latency_ms=10, jitter_ms=2, loss_rate=0.02),
+            LinkModel(NetworkType.LORA, latency_ms=300, jitter_ms=50, loss_rate=0.05, signal_strength=0.6)
+        ],
+        seed=42,
+        message_rate=200.0,
+        duration=30.0,
+        # Perdas isoladas não devem derrubar o enlace por muito tempo
+        node_options={"route_failure_cooldown": 1.0}
+    )
+    print_report(simulator.run())
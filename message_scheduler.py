@@ -0,0 +1,184 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class MessageScheduler:
+    """
+    Fila de prioridade baseada em heap para mensagens pendentes.
+
+    As entradas são ordenadas por (prioridade, momento de entrada): prioridades
+    maiores saem primeiro e, dentro do mesmo nível, a ordem é FIFO. Enfileirar
+    e desenfileirar custam O(log n); remoções e repriorizações marcam a entrada
+    antiga como removida e são descartadas preguiçosamente.
+
+    Todas as operações tomam um lock: threads do servidor (Flask) enfileiram
+    enquanto o event loop consome.
+    """
+
+    # Remoções pendentes acima desta fração do heap disparam compactação
+    COMPACT_RATIO = 0.5
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self._heap: List[list] = []
+        self._entries: Dict[str, List[list]] = {}  # message.id -> entradas vivas
+        self._counter = itertools.count()
+        self._size = 0
+        self._removed = 0
+        self._lock = threading.Lock()
+
+        # Chamado a cada enfileiramento (usado para acordar o consumidor)
+        self.on_push: Optional[Callable[[], None]] = None
+
+        # Estatísticas
+        self.total_enqueued = 0
+        self.total_dequeued = 0
+        self.total_dropped = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+    def __iter__(self):
+        """Itera sobre as mensagens na fila (sem ordem garantida)"""
+        with self._lock:
+            messages = [entry[-1] for entry in self._heap if entry[-1] is not None]
+        return iter(messages)
+
+    def push(self, message: Any, priority: Optional[int] = None,
+             enqueued_at: Optional[float] = None):
+        """Enfileira uma mensagem - O(log n)"""
+        if priority is None:
+            priority = message.priority
+        if enqueued_at is None:
+            enqueued_at = self._clock()
+
+        with self._lock:
+            entry = [-priority, enqueued_at, next(self._counter), message]
+            heapq.heappush(self._heap, entry)
+            self._entries.setdefault(message.id, []).append(entry)
+            self._size += 1
+            self.total_enqueued += 1
+
+        if self.on_push is not None:
+            self.on_push()
+
+    # Compatibilidade com o uso antigo de message_queue como lista
+    append = push
+
+    def pop(self) -> Optional[Any]:
+        """Remove e retorna a mensagem de maior prioridade - O(log n)"""
+        with self._lock:
+            while self._heap:
+                entry = heapq.heappop(self._heap)
+                message = entry[-1]
+                if message is None:
+                    self._removed -= 1
+                    continue
+
+                self._forget(message.id, entry)
+                self._size -= 1
+                self.total_dequeued += 1
+
+                wait = self._clock() - entry[1]
+                self._total_wait += wait
+                if wait > self._max_wait:
+                    self._max_wait = wait
+
+                return message
+
+            return None
+
+    def peek(self) -> Optional[Any]:
+        """Retorna a próxima mensagem sem removê-la"""
+        with self._lock:
+            while self._heap and self._heap[0][-1] is None:
+                heapq.heappop(self._heap)
+                self._removed -= 1
+            return self._heap[0][-1] if self._heap else None
+
+    def drop(self, message_id: str) -> int:
+        """Remove da fila todas as cópias (e clones) de uma mensagem"""
+        with self._lock:
+            entries = self._entries.pop(message_id, [])
+            for entry in entries:
+                entry[-1] = None
+
+            self._size -= len(entries)
+            self._removed += len(entries)
+            self.total_dropped += len(entries)
+            self._maybe_compact()
+            return len(entries)
+
+    def reprioritize(self, message_id: str, priority: int) -> int:
+        """Altera a prioridade das mensagens enfileiradas mantendo o tempo de entrada"""
+        with self._lock:
+            entries = self._entries.pop(message_id, [])
+            if not entries:
+                return 0
+
+            for entry in entries:
+                message = entry[-1]
+                entry[-1] = None
+                message.priority = priority
+
+                new_entry = [-priority, entry[1], next(self._counter), message]
+                heapq.heappush(self._heap, new_entry)
+                self._entries.setdefault(message_id, []).append(new_entry)
+
+            self._removed += len(entries)
+            self._maybe_compact()
+            return len(entries)
+
+    def clear(self):
+        """Esvazia a fila"""
+        with self._lock:
+            self._heap.clear()
+            self._entries.clear()
+            self._size = 0
+            self._removed = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Profundidade da fila e estatísticas de tempo de espera"""
+        now = self._clock()
+        oldest_wait = 0.0
+        with self._lock:
+            for entry in self._heap:
+                if entry[-1] is not None:
+                    oldest_wait = max(oldest_wait, now - entry[1])
+
+        return {
+            "depth": self._size,
+            "enqueued": self.total_enqueued,
+            "dequeued": self.total_dequeued,
+            "dropped": self.total_dropped,
+            "avg_wait": self._total_wait / self.total_dequeued if self.total_dequeued else 0.0,
+            "max_wait": self._max_wait,
+            "oldest_wait": oldest_wait
+        }
+
+    def _forget(self, message_id: str, entry: list):
+        """Remove a entrada do índice por id"""
+        entries = self._entries.get(message_id)
+        if entries is None:
+            return
+        for i, candidate in enumerate(entries):
+            if candidate is entry:
+                entries.pop(i)
+                break
+        if not entries:
+            del self._entries[message_id]
+
+    def _maybe_compact(self):
+        """Reconstrói o heap quando há muitas entradas removidas"""
+        if self._removed > len(self._heap) * self.COMPACT_RATIO:
+            self._heap = [entry for entry in self._heap if entry[-1] is not None]
+            heapq.heapify(self._heap)
+            self._removed = 0
@@ -0,0 +1,274 @@
+import math
+import random
+from array import array
+from collections.abc import Mapping
+from typing import Callable, Dict, Iterator, List, Optional
+
+from clock import get_clock
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: sem ele o tick percorre as colunas nó a nó
+    np = None
+
+ACTIVE = 1
+DEGRADED = 0
+
+
+class ConditionsEngine:
+    """
+    Condições de rede por nó em colunas que evoluem no tempo.
+
+    Latência, confiabilidade e banda seguem processos de Ornstein-Uhlenbeck
+    em torno do valor base de cada nó; o congestionamento vem da carga de
+    mensagens (record_load), que decai exponencialmente; o status alterna
+    entre ativo e degradado como uma cadeia de Markov. tick(dt) atualiza
+    todas as colunas de uma vez (vetorizado com NumPy) e publica aos
+    assinantes só os índices cuja mudança passou de delta_threshold desde a
+    última publicação - caches e planejadores invalidam apenas esses nós.
+
+    Sem delta_threshold explícito o limiar acompanha a volatilidade:
+    DELTA_SPREADS vezes o desvio estacionário do processo, de modo que o
+    ruído normal não publica delta a cada tick. O congestionamento (fração
+    de 0 a 1) compara a mudança absoluta - relativa, a queda exponencial da
+    carga geraria deltas para sempre.
+    """
+
+    COLUMNS = ("latency", "reliability", "bandwidth", "congestion")
+    DELTA_SPREADS = 2.5
+    # Piso do denominador da mudança relativa (1.0 torna a comparação absoluta)
+    DELTA_FLOOR = {"latency": 1e-3, "reliability": 1e-3, "bandwidth": 1e-3, "congestion": 1.0}
+
+    def __init__(self, node_count: int, name: Callable[[int], str], index: Callable[[str], Optional[int]],
+                 rng: Optional[random.Random] = None, reversion: float = 0.1, volatility: float = 0.05,
+                 load_capacity: float = 10.0, load_decay: float = 30.0, degrade_rate: float = 0.002,
+                 recover_rate: float = 0.05, delta_threshold: Optional[float] = None):
+        self.node_count = node_count
+        self.name = name          # índice -> nome do nó
+        self.index = index        # nome do nó -> índice
+        self.rng = rng or random.Random()
+        self.reversion = reversion            # Velocidade de retorno ao valor base (1/s)
+        self.volatility = volatility          # Desvio relativo por √s
+        self.load_capacity = load_capacity    # Carga com 50% de congestionamento
+        self.load_decay = load_decay          # Constante de tempo da carga (s)
+        self.degrade_rate = degrade_rate      # Probabilidade/s de degradar
+        self.recover_rate = recover_rate      # Probabilidade/s de se recuperar
+        if delta_threshold is None:
+            delta_threshold = self.DELTA_SPREADS * self.spread
+        self.delta_threshold = delta_threshold  # Mudança relativa que gera delta
+        self._subscribers: List[Callable[[List[int]], None]] = []
+        self._generator = np.random.Generator(np.random.PCG64(self.rng.getrandbits(64))) if np is not None else None
+
+        self._init_columns()
+        self.ticks = 0
+        self.deltas_published = 0
+
+    def _init_columns(self):
+        rng = self.rng
+        n = self.node_count
+        base = {
+            "latency": [rng.uniform(10, 500) for _ in range(n)],
+            "reliability": [rng.uniform(0.5, 0.95) for _ in range(n)],
+            "bandwidth": [rng.uniform(1, 100) for _ in range(n)],
+        }
+        congestion = [rng.uniform(0, 0.8) for _ in range(n)]
+        status = [ACTIVE if rng.random() > 0.1 else DEGRADED for _ in range(n)]
+        # Carga inicial coerente com o congestionamento sorteado
+        load = [c * self.load_capacity / (1.0 - c) for c in congestion]
+
+        self.base = {key: self._column(values) for key, values in base.items()}
+        self.columns = {key: self._column(values) for key, values in base.items()}
+        self.columns["congestion"] = self._column(congestion)
+        self.load = self._column(load)
+        self.status = np.array(status, dtype=np.int8) if np is not None else array('b', status)
+        self._published = {key: self._column(column) for key, column in self.columns.items()}
+        self._published_status = self.status.copy() if np is not None else array('b', status)
+
+    @property
+    def spread(self) -> float:
+        """Desvio relativo estacionário do processo de Ornstein-Uhlenbeck (σ/√(2θ))"""
+        return self.volatility / math.sqrt(2.0 * self.reversion) if self.reversion > 0 else self.volatility
+
+    def _column(self, values):
+        return np.array(values, dtype=float) if np is not None else array('d', values)
+
+    # Assinaturas
+
+    def subscribe(self, callback: Callable[[List[int]], None]):
+        """callback(índices alterados) a cada publicação de deltas"""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[List[int]], None]):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def _publish(self, changed: List[int]):
+        if not changed:
+            return
+        self.deltas_published += len(changed)
+        for callback in self._subscribers:
+            callback(changed)
+
+    # Leitura e escrita pontuais
+
+    def get(self, index: int) -> Dict:
+        columns = self.columns
+        return {
+            "latency": float(columns["latency"][index]),
+            "reliability": float(columns["reliability"][index]),
+            "bandwidth": float(columns["bandwidth"][index]),
+            "congestion": float(columns["congestion"][index]),
+            "status": "active" if self.status[index] == ACTIVE else "degraded"
+        }
+
+    def is_available(self, index: int) -> bool:
+        return bool(self.status[index] == ACTIVE and self.columns["reliability"][index] > 0.3)
+
+    def set(self, index: int, **changes):
+        """Altera condições de um nó (novo valor base) e publica o delta na hora"""
+        for key, value in changes.items():
+            if key == "status":
+                self.status[index] = ACTIVE if value == "active" else DEGRADED
+                self._published_status[index] = self.status[index]
+            elif key == "congestion":
+                value = min(max(value, 0.0), 0.99)
+                self.columns[key][index] = value
+                self.load[index] = value * self.load_capacity / (1.0 - value)
+                self._published[key][index] = value
+            elif key in self.base:
+                self.base[key][index] = value
+                self.columns[key][index] = value
+                self._published[key][index] = value
+        self._publish([index])
+
+    def record_load(self, index: int, amount: float = 1.0):
+        """Contabiliza tráfego no nó; o congestionamento reage no próximo tick"""
+        self.load[index] += amount
+
+    # Evolução
+
+    def tick(self, dt: float) -> List[int]:
+        """Avança dt segundos em todos os nós e publica os índices que mudaram"""
+        if dt <= 0:
+            return []
+        changed = self._tick_numpy(dt) if np is not None else self._tick_python(dt)
+        self.ticks += 1
+        self._publish(changed)
+        return changed
+
+    def _tick_numpy(self, dt: float) -> List[int]:
+        n = self.node_count
+        generator = self._generator
+        pull = min(self.reversion * dt, 1.0)
+        noise = self.volatility * math.sqrt(dt)
+        columns = self.columns
+
+        for key in ("latency", "reliability", "bandwidth"):
+            base = self.base[key]
+            column = columns[key]
+            column += pull * (base - column) + noise * base * generator.standard_normal(n)
+        np.clip(columns["latency"], 1.0, None, out=columns["latency"])
+        np.clip(columns["reliability"], 0.0, 0.999, out=columns["reliability"])
+        np.clip(columns["bandwidth"], 0.1, None, out=columns["bandwidth"])
+
+        self.load *= math.exp(-dt / self.load_decay)
+        columns["congestion"][:] = self.load / (self.load + self.load_capacity)
+
+        draws = generator.random(n)
+        degrade = (self.status == ACTIVE) & (draws < self.degrade_rate * dt)
+        recover = (self.status == DEGRADED) & (draws < self.recover_rate * dt)
+        self.status[degrade] = DEGRADED
+        self.status[recover] = ACTIVE
+
+        # Delta: status mudou ou alguma coluna andou mais que o limiar relativo
+        mask = self.status != self._published_status
+        threshold = self.delta_threshold
+        for key, column in columns.items():
+            published = self._published[key]
+            mask |= np.abs(column - published) > threshold * np.maximum(np.abs(published), self.DELTA_FLOOR[key])
+
+        changed = np.flatnonzero(mask)
+        if changed.size:
+            for key, column in columns.items():
+                self._published[key][changed] = column[changed]
+            self._published_status[changed] = self.status[changed]
+        return changed.tolist()
+
+    def _tick_python(self, dt: float) -> List[int]:
+        rng = self.rng
+        pull = min(self.reversion * dt, 1.0)
+        noise = self.volatility * math.sqrt(dt)
+        decay = math.exp(-dt / self.load_decay)
+        columns = self.columns
+        latency, reliability, bandwidth = columns["latency"], columns["reliability"], columns["bandwidth"]
+        congestion = columns["congestion"]
+        base_latency, base_reliability, base_bandwidth = self.base["latency"], self.base["reliability"], self.base["bandwidth"]
+        load = self.load
+        status = self.status
+        threshold = self.delta_threshold
+        published = self._published
+        floor = self.DELTA_FLOOR
+        changed = []
+
+        for i in range(self.node_count):
+            latency[i] = max(1.0, latency[i] + pull * (base_latency[i] - latency[i])
+                             + noise * base_latency[i] * rng.gauss(0.0, 1.0))
+            reliability[i] = min(0.999, max(0.0, reliability[i] + pull * (base_reliability[i] - reliability[i])
+                                            + noise * base_reliability[i] * rng.gauss(0.0, 1.0)))
+            bandwidth[i] = max(0.1, bandwidth[i] + pull * (base_bandwidth[i] - bandwidth[i])
+                               + noise * base_bandwidth[i] * rng.gauss(0.0, 1.0))
+            load[i] *= decay
+            congestion[i] = load[i] / (load[i] + self.load_capacity)
+
+            draw = rng.random()
+            if status[i] == ACTIVE and draw < self.degrade_rate * dt:
+                status[i] = DEGRADED
+            elif status[i] == DEGRADED and draw < self.recover_rate * dt:
+                status[i] = ACTIVE
+
+            moved = status[i] != self._published_status[i]
+            if not moved:
+                for key, column in columns.items():
+                    previous = published[key][i]
+                    if abs(column[i] - previous) > threshold * max(abs(previous), floor[key]):
+                        moved = True
+                        break
+            if moved:
+                for key, column in columns.items():
+                    published[key][i] = column[i]
+                self._published_status[i] = status[i]
+                changed.append(i)
+
+        return changed
+
+    async def run(self, interval: float = 1.0):
+        """Avança as condições continuamente a cada interval segundos"""
+        clock = get_clock()
+        while True:
+            await clock.sleep(interval)
+            self.tick(interval)
+
+    def view(self) -> 'ConditionsView':
+        return ConditionsView(self)
+
+
+class ConditionsView(Mapping):
+    """Mapping {nó: {latency, reliability, ...}} sobre as colunas (compatível com o dict antigo)"""
+
+    def __init__(self, engine: ConditionsEngine):
+        self.engine = engine
+
+    def __getitem__(self, node: str) -> Dict:
+        index = self.engine.index(node)
+        if index is None:
+            raise KeyError(node)
+        return self.engine.get(index)
+
+    def __contains__(self, node) -> bool:
+        return isinstance(node, str) and self.engine.index(node) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.engine.name(i) for i in range(self.engine.node_count))
+
+    def __len__(self) -> int:
+        return self.engine.node_count
@@ -0,0 +1,358 @@
+import heapq
+import math
+from array import array
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from clock import get_clock
+from network_topology import Topology
+
+
+class _PathTree:
+    """Árvore de caminhos mínimos até um destino: custo e próximo salto por nó"""
+
+    __slots__ = ('destination', 'dist', 'next_hop')
+
+    def __init__(self, destination: int, node_count: int):
+        self.destination = destination
+        self.dist = array('d', [math.inf]) * node_count
+        self.next_hop = array('q', [-1]) * node_count
+
+
+class RoutePlanner:
+    """
+    Planejador de rotas sobre a topologia CSR do IntelligentNetworkSimulator.
+
+    Entrar em um nó custa 1 + 1 / (1 + pontuação), com a pontuação de
+    calculate_route_score: cada salto custa pelo menos 1, então o caminho
+    mínimo nunca troca saltos por pontuação. Por destino é mantida (em LRU)
+    uma árvore de caminhos mínimos calculada por Dijkstra no grafo
+    invertido; consultas seguintes são O(saltos). Quando um enlace falha
+    só a subárvore que passava por ele é recalculada; o mesmo vale para os
+    deltas publicados pelo motor de condições do simulador. Enlaces falhos
+    voltam após failure_cooldown segundos, melhorando só as árvores que
+    podem passar a usá-los. Com uma heurística
+    admissível (ex.: distância mínima em saltos) consultas avulsas usam A*.
+    """
+
+    def __init__(self, simulator, max_trees: int = 64,
+                 heuristic: Optional[Callable[[int, int], float]] = None,
+                 rebuild_fraction: float = 0.05, failure_cooldown: float = 30.0):
+        self.simulator = simulator
+        self.topology: Topology = simulator.topology
+        self._reverse = self.topology.transpose()
+        self.max_trees = max_trees
+        self.heuristic = heuristic  # (nó, destino) -> limite inferior do custo restante
+        self._trees: 'OrderedDict[int, _PathTree]' = OrderedDict()
+        self._failed_links: Dict[Tuple[int, int], float] = {}  # (origem, alvo) -> momento da falha
+        self.failure_cooldown = failure_cooldown  # Espera até reativar um enlace falho
+        self._next_expiry = math.inf
+        # Acima desta fração de nós alterados num delta é mais barato recalcular sob demanda
+        self.rebuild_fraction = rebuild_fraction
+
+        self.trees_built = 0
+        self.repairs = 0
+
+        conditions = getattr(simulator, "conditions", None)
+        if conditions is not None:
+            conditions.subscribe(self.on_conditions_changed)
+
+    def node_cost(self, index: int, destination: int) -> float:
+        """Custo de entrar no nó; inf se indisponível (o destino sempre aceita)"""
+        if index == destination:
+            return 1.0
+        name = self.topology.name(index)
+        if not self.simulator.is_available(name):
+            return math.inf
+        return 1.0 + 1.0 / (1.0 + self.simulator.calculate_route_score(name))
+
+    # Consultas
+
+    def next_hop(self, source: str, destination: str) -> Optional[str]:
+        self.expire_failures()
+        source_index = self.topology.index(source)
+        tree = self._tree_for(destination)
+        if source_index is None or tree is None:
+            return None
+        hop = tree.next_hop[source_index]
+        return self.topology.name(hop) if hop >= 0 else None
+
+    def path(self, source: str, destination: str) -> List[str]:
+        """Caminho mínimo (inclui origem e destino); vazio se inalcançável"""
+        self.expire_failures()
+        source_index = self.topology.index(source)
+        destination_index = self.topology.index(destination)
+        if source_index is None or destination_index is None:
+            return []
+        if source_index == destination_index:
+            return [source]
+
+        if destination_index not in self._trees and self.heuristic is not None:
+            return [self.topology.name(i) for i in self.astar(source_index, destination_index)]
+
+        tree = self._tree_for(destination)
+        if tree is None or tree.next_hop[source_index] < 0:
+            return []
+        hops = [source_index]
+        while hops[-1] != destination_index:
+            hops.append(tree.next_hop[hops[-1]])
+        return [self.topology.name(i) for i in hops]
+
+    def cost(self, source: str, destination: str) -> float:
+        self.expire_failures()
+        source_index = self.topology.index(source)
+        tree = self._tree_for(destination)
+        if source_index is None or tree is None:
+            return math.inf
+        return tree.dist[source_index]
+
+    # Falhas
+
+    def fail_link(self, source: str, target: str, now: Optional[float] = None):
+        """Marca o enlace source -> target como falho por failure_cooldown e repara as árvores afetadas"""
+        source_index = self.topology.index(source)
+        target_index = self.topology.index(target)
+        if source_index is None or target_index is None:
+            return
+        if now is None:
+            now = get_clock().time()
+        self._failed_links[(source_index, target_index)] = now
+        self._next_expiry = min(self._next_expiry, now + self.failure_cooldown)
+
+        for tree in self._trees.values():
+            if tree.next_hop[source_index] == target_index:
+                self._repair(tree, [source_index])
+
+    def expire_failures(self, now: Optional[float] = None) -> int:
+        """Reativa enlaces cuja espera acabou; retorna quantos voltaram"""
+        if now is None:
+            now = get_clock().time()
+        if now < self._next_expiry:
+            return 0
+
+        restored = [link for link, failed_at in self._failed_links.items()
+                    if now - failed_at >= self.failure_cooldown]
+        for link in restored:
+            del self._failed_links[link]
+        self._next_expiry = min((failed_at + self.failure_cooldown for failed_at in self._failed_links.values()),
+                                default=math.inf)
+
+        # Um enlace que volta só pode encurtar caminhos: relaxa a partir dele
+        for tree in self._trees.values():
+            dist = tree.dist
+            next_hop = tree.next_hop
+
+            def relax(heap: List[Tuple[float, int]]):
+                for source, target in restored:
+                    if dist[target] == math.inf:
+                        continue
+                    candidate = dist[target] + self.node_cost(target, tree.destination)
+                    if candidate < dist[source]:
+                        dist[source] = candidate
+                        next_hop[source] = target
+                        heap.append((candidate, source))
+
+            self._repair(tree, [], relax)
+        return len(restored)
+
+    def restore_links(self):
+        """Reativa todos os enlaces falhos (as árvores são recalculadas sob demanda)"""
+        self._failed_links.clear()
+        self._next_expiry = math.inf
+        self.invalidate()
+
+    def invalidate(self, destination: Optional[str] = None):
+        """Descarta árvores em cache (ex.: após mudança de condições)"""
+        if destination is None:
+            self._trees.clear()
+        else:
+            index = self.topology.index(destination)
+            self._trees.pop(index, None)
+
+    def on_conditions_changed(self, changed: List[int]):
+        """Delta do motor de condições: o custo de entrar nos nós `changed` mudou"""
+        if not self._trees:
+            return
+        if len(changed) > self.topology.node_count * self.rebuild_fraction:
+            self.invalidate()
+            return
+
+        reverse_indptr = self._reverse.indptr
+        reverse_indices = self._reverse.indices
+        failed = self._failed_links
+        for tree in self._trees.values():
+            dist = tree.dist
+            next_hop = tree.next_hop
+            changed_nodes = [node for node in changed if node != tree.destination]
+
+            # Custo maior: quem entrava pelo nó perde o caminho e é reparado
+            roots = []
+            for node in changed_nodes:
+                for position in range(reverse_indptr[node], reverse_indptr[node + 1]):
+                    predecessor = reverse_indices[position]
+                    if next_hop[predecessor] == node:
+                        roots.append(predecessor)
+
+            # Custo menor: predecessores podem passar a preferir o nó
+            def relax(heap: List[Tuple[float, int]]):
+                for node in changed_nodes:
+                    if dist[node] == math.inf:
+                        continue
+                    candidate = dist[node] + self.node_cost(node, tree.destination)
+                    for position in range(reverse_indptr[node], reverse_indptr[node + 1]):
+                        predecessor = reverse_indices[position]
+                        if candidate < dist[predecessor] and (predecessor, node) not in failed:
+                            dist[predecessor] = candidate
+                            next_hop[predecessor] = node
+                            heap.append((candidate, predecessor))
+
+            self._repair(tree, roots, relax)
+
+    # Algoritmos
+
+    def _tree_for(self, destination: str) -> Optional[_PathTree]:
+        index = self.topology.index(destination)
+        if index is None:
+            return None
+        tree = self._trees.get(index)
+        if tree is None:
+            tree = self._build_tree(index)
+            self._trees[index] = tree
+            if len(self._trees) > self.max_trees:
+                self._trees.popitem(last=False)
+        else:
+            self._trees.move_to_end(index)
+        return tree
+
+    def _build_tree(self, destination: int) -> _PathTree:
+        """Dijkstra a partir do destino no grafo invertido"""
+        tree = _PathTree(destination, self.topology.node_count)
+        tree.dist[destination] = 0.0
+        self._dijkstra(tree, [(0.0, destination)])
+        self.trees_built += 1
+        return tree
+
+    def _dijkstra(self, tree: _PathTree, heap: List[Tuple[float, int]]):
+        dist = tree.dist
+        next_hop = tree.next_hop
+        destination = tree.destination
+        reverse_indptr = self._reverse.indptr
+        reverse_indices = self._reverse.indices
+        failed = self._failed_links
+        costs: Dict[int, float] = {}
+
+        heapq.heapify(heap)
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if distance > dist[node]:
+                continue
+
+            cost = costs.get(node)
+            if cost is None:
+                cost = costs[node] = self.node_cost(node, destination)
+            if cost == math.inf:
+                continue
+            candidate = distance + cost
+
+            for position in range(reverse_indptr[node], reverse_indptr[node + 1]):
+                predecessor = reverse_indices[position]
+                if candidate < dist[predecessor] and (predecessor, node) not in failed:
+                    dist[predecessor] = candidate
+                    next_hop[predecessor] = node
+                    heapq.heappush(heap, (candidate, predecessor))
+
+    def _repair(self, tree: _PathTree, roots: List[int],
+                relax: Optional[Callable[[List[Tuple[float, int]]], None]] = None):
+        """Recalcula só os nós cujo caminho passava pelas raízes (ex.: enlace que falhou)"""
+        dist = tree.dist
+        next_hop = tree.next_hop
+        reverse_indptr = self._reverse.indptr
+        reverse_indices = self._reverse.indices
+
+        # Subárvore das raízes: nós cujo próximo salto leva até elas
+        affected = list(dict.fromkeys(roots))
+        affected_set = set(affected)
+        for node in affected:
+            for position in range(reverse_indptr[node], reverse_indptr[node + 1]):
+                predecessor = reverse_indices[position]
+                if next_hop[predecessor] == node and predecessor not in affected_set:
+                    affected_set.add(predecessor)
+                    affected.append(predecessor)
+
+        for node in affected:
+            dist[node] = math.inf
+            next_hop[node] = -1
+
+        # Reentra a partir da fronteira: vizinhos intactos dos nós afetados
+        indptr = self.topology.indptr
+        indices = self.topology.indices
+        failed = self._failed_links
+        heap = []
+        for node in affected:
+            best = math.inf
+            best_hop = -1
+            for position in range(indptr[node], indptr[node + 1]):
+                neighbor = indices[position]
+                if neighbor in affected_set or (node, neighbor) in failed or dist[neighbor] == math.inf:
+                    continue
+                candidate = dist[neighbor] + self.node_cost(neighbor, tree.destination)
+                if candidate < best:
+                    best = candidate
+                    best_hop = neighbor
+            if best_hop >= 0:
+                dist[node] = best
+                next_hop[node] = best_hop
+                heap.append((best, node))
+
+        if relax is not None:
+            relax(heap)
+        self._dijkstra(tree, heap)
+        self.repairs += 1
+
+    def astar(self, source: int, destination: int) -> List[int]:
+        """A* de source até destination com a heurística configurada"""
+        heuristic = self.heuristic or (lambda node, target: 0.0)
+        indptr = self.topology.indptr
+        indices = self.topology.indices
+        failed = self._failed_links
+
+        best = {source: 0.0}
+        came_from: Dict[int, int] = {}
+        heap = [(heuristic(source, destination), 0.0, source)]
+        closed = set()
+
+        while heap:
+            _, distance, node = heapq.heappop(heap)
+            if node == destination:
+                path = [node]
+                while path[-1] != source:
+                    path.append(came_from[path[-1]])
+                path.reverse()
+                return path
+            if node in closed:
+                continue
+            closed.add(node)
+
+            for position in range(indptr[node], indptr[node + 1]):
+                neighbor = indices[position]
+                if neighbor in closed or (node, neighbor) in failed:
+                    continue
+                cost = self.node_cost(neighbor, destination)
+                if cost == math.inf:
+                    continue
+                candidate = distance + cost
+                if candidate < best.get(neighbor, math.inf):
+                    best[neighbor] = candidate
+                    came_from[neighbor] = node
+                    heapq.heappush(heap, (candidate + heuristic(neighbor, destination), candidate, neighbor))
+
+        return []
+
+
+def hop_heuristic(positions: array, radius: float) -> Callable[[int, int], float]:
+    """Heurística admissível para grafos geométricos: distância / raio = mínimo de saltos"""
+    def estimate(node: int, target: int) -> float:
+        dx = positions[2 * node] - positions[2 * target]
+        dy = positions[2 * node + 1] - positions[2 * target + 1]
+        return math.floor(math.sqrt(dx * dx + dy * dy) / radius)
+    return estimate
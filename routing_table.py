@@ -0,0 +1,434 @@
+import bisect
+import itertools
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class RoutingTable:
+    """
+    Tabela de roteamento indexada por score base.
+
+    Cada rota é identificada por (next_hop, network_type) e mantida em uma
+    lista ordenada pelo score base pré-calculado - (latência * custo) / sinal,
+    menor é melhor - além de um sub-índice ordenado por tipo de rede. A melhor
+    rota é encontrada no início da lista, sem percorrer a tabela inteira.
+
+    A tabela é incremental: upsert atualiza a rota existente no lugar e
+    registra quando ela foi vista, record_failure() só desativa a rota após
+    failure_threshold falhas seguidas (um quadro perdido não derruba o
+    enlace), age() remove rotas que sumiram e reativa rotas que falharam após
+    o tempo de espera, e cada mudança é publicada aos
+    assinantes como (evento, rota) - "added", "updated", "removed", "failed"
+    ou "restored".
+    """
+
+    def __init__(self, max_age: float = 30.0, failure_cooldown: float = 10.0, failure_threshold: int = 3):
+        self.max_age = max_age                    # Rotas não vistas há mais tempo são removidas
+        self.failure_cooldown = failure_cooldown  # Espera antes de reativar rota com falha
+        self.failure_threshold = failure_threshold  # Falhas seguidas até desativar a rota
+        self._strikes: Dict[Tuple[str, Any], int] = {}  # (next_hop, tipo) -> falhas seguidas
+        self._subscribers: List[Callable[[str, Any], None]] = []
+        self._last_seen: "OrderedDict[Tuple[str, Any], float]" = OrderedDict()  # Mais antigas primeiro
+        self._failed: Dict[Tuple[str, Any], float] = {}  # (next_hop, tipo) -> momento da falha
+        self._routes: Dict[Tuple[str, Any], Any] = {}      # (next_hop, tipo) -> rota
+        self._keys: Dict[Tuple[str, Any], Tuple[float, int]] = {}  # (next_hop, tipo) -> (score, seq)
+        self._by_hop: Dict[str, Dict[Any, Any]] = {}       # next_hop -> {tipo: rota}
+        self._order: List[tuple] = []                      # (score, seq, rota) ordenado
+        self._by_type: Dict[Any, List[tuple]] = {}         # tipo -> (score, seq, rota) ordenado
+        self._counter = itertools.count()
+
+    @staticmethod
+    def base_score(route) -> float:
+        """Score baseado em latência, força do sinal e custo (menor = melhor)"""
+        return (route.latency * route.cost) / route.signal_strength
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+    def __bool__(self) -> bool:
+        return bool(self._routes)
+
+    def __contains__(self, next_hop: str) -> bool:
+        return next_hop in self._by_hop
+
+    @property
+    def hop_count(self) -> int:
+        """Número de vizinhos (next_hops) conhecidos"""
+        return len(self._by_hop)
+
+    def subscribe(self, callback: Callable[[str, Any], None]):
+        """Assina o feed de mudanças: callback(evento, rota)"""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[str, Any], None]):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def _publish(self, event: str, route):
+        for callback in self._subscribers:
+            callback(event, route)
+
+    def upsert(self, route, now: Optional[float] = None) -> Optional[str]:
+        """Insere ou atualiza no lugar a rota de (next_hop, network_type); retorna o evento publicado"""
+        if now is None:
+            now = time.time()
+
+        key = (route.next_hop, route.network_type)
+        self._last_seen[key] = now
+        self._last_seen.move_to_end(key)
+
+        current = self._routes.get(key)
+        if current is None:
+            self._index(key, route)
+            if not route.available:
+                self._failed[key] = now
+            self._publish("added", route)
+            return "added"
+
+        if current is route:
+            # A própria rota foi alterada por quem a inseriu
+            self._index(key, route)
+            self._publish("updated", route)
+            return "updated"
+
+        changed = (current.latency, current.cost, current.signal_strength) != \
+                  (route.latency, route.cost, route.signal_strength)
+        if not changed:
+            return None
+
+        # Mantém a identidade (e o estado de falha) da rota já conhecida
+        current.latency = route.latency
+        current.cost = route.cost
+        current.signal_strength = route.signal_strength
+        self._index(key, current)
+        self._publish("updated", current)
+        return "updated"
+
+    def _index(self, key: Tuple[str, Any], route):
+        """(Re)insere a rota nas listas ordenadas"""
+        if key in self._keys:
+            self._unindex(key)
+
+        sort_key = (self.base_score(route), next(self._counter))
+        entry = (*sort_key, route)
+        self._routes[key] = route
+        self._keys[key] = sort_key
+        self._by_hop.setdefault(route.next_hop, {})[route.network_type] = route
+        bisect.insort(self._order, entry)
+        bisect.insort(self._by_type.setdefault(route.network_type, []), entry)
+
+    def remove(self, next_hop: str, network_type) -> Optional[Any]:
+        """Remove a rota de (next_hop, network_type), se existir"""
+        key = (next_hop, network_type)
+        if key not in self._routes:
+            return None
+
+        route = self._routes[key]
+        self._unindex(key)
+        del self._routes[key]
+        del self._keys[key]
+        self._last_seen.pop(key, None)
+        self._failed.pop(key, None)
+        self._strikes.pop(key, None)
+
+        hop_routes = self._by_hop[next_hop]
+        del hop_routes[network_type]
+        if not hop_routes:
+            del self._by_hop[next_hop]
+
+        self._publish("removed", route)
+        return route
+
+    def record_failure(self, route, now: Optional[float] = None) -> bool:
+        """Conta uma falha de transmissão; desativa a rota na failure_threshold-ésima seguida"""
+        key = (route.next_hop, route.network_type)
+        strikes = self._strikes.get(key, 0) + 1
+        if strikes < self.failure_threshold:
+            self._strikes[key] = strikes
+            return False
+        self.mark_failed(route, now)
+        return True
+
+    def record_success(self, route):
+        """Transmissão bem-sucedida zera a contagem de falhas seguidas"""
+        self._strikes.pop((route.next_hop, route.network_type), None)
+
+    def mark_failed(self, route, now: Optional[float] = None):
+        """Desativa a rota até o fim do tempo de espera"""
+        key = (route.next_hop, route.network_type)
+        self._strikes.pop(key, None)
+        route.available = False
+        if key in self._routes:
+            self._failed[key] = time.time() if now is None else now
+            self._publish("failed", route)
+
+    def age(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Remove rotas não vistas há max_age e reativa falhas após failure_cooldown"""
+        if now is None:
+            now = time.time()
+
+        removed = 0
+        while self._last_seen:
+            key, seen_at = next(iter(self._last_seen.items()))
+            if now - seen_at < self.max_age:
+                break
+            self.remove(*key)
+            removed += 1
+
+        restored = 0
+        for key, failed_at in list(self._failed.items()):
+            if now - failed_at >= self.failure_cooldown:
+                del self._failed[key]
+                route = self._routes[key]
+                route.available = True
+                self._publish("restored", route)
+                restored += 1
+
+        return {"removed": removed, "restored": restored}
+
+    def last_seen(self, next_hop: str, network_type) -> Optional[float]:
+        return self._last_seen.get((next_hop, network_type))
+
+    def rescore(self, route):
+        """Recalcula o score de uma rota cujos atributos mudaram"""
+        key = (route.next_hop, route.network_type)
+        if self._routes.get(key) is route:
+            self._index(key, route)
+            self._publish("updated", route)
+
+    def get(self, next_hop: str, network_type) -> Optional[Any]:
+        return self._routes.get((next_hop, network_type))
+
+    def routes_to(self, next_hop: str) -> List[Any]:
+        """Rotas conhecidas para um vizinho"""
+        return list(self._by_hop.get(next_hop, {}).values())
+
+    def best(self) -> Optional[Any]:
+        """Melhor rota disponível em toda a tabela"""
+        for _, _, route in self._order:
+            if route.available:
+                return route
+        return None
+
+    def best_route_to(self, next_hop: str) -> Optional[Any]:
+        """Melhor rota disponível para um vizinho específico"""
+        best_route = None
+        best_key = None
+        for network_type, route in self._by_hop.get(next_hop, {}).items():
+            if not route.available:
+                continue
+            key = self._keys[(next_hop, network_type)]
+            if best_key is None or key < best_key:
+                best_key = key
+                best_route = route
+        return best_route
+
+    def network_types(self) -> List[Any]:
+        """Tipos de rede com pelo menos uma rota na tabela"""
+        return [network_type for network_type, entries in self._by_type.items() if entries]
+
+    def iter_by_type(self, network_type) -> Iterator[Tuple[float, Any]]:
+        """Itera (score, rota) de um tipo de rede em ordem crescente de score"""
+        for score, _, route in self._by_type.get(network_type, ()):
+            yield score, route
+
+    def items(self):
+        """Itera (next_hop, [rotas]) como no antigo dicionário known_routes"""
+        for next_hop, routes in self._by_hop.items():
+            yield next_hop, list(routes.values())
+
+    def as_dict(self) -> Dict[str, List[Any]]:
+        return dict(self.items())
+
+    def _unindex(self, key: Tuple[str, Any]):
+        """Remove a entrada das listas ordenadas"""
+        sort_key = self._keys[key]
+        network_type = key[1]
+        for entries in (self._order, self._by_type[network_type]):
+            index = bisect.bisect_left(entries, sort_key)
+            del entries[index]
+
+
+class DistanceVectorTable:
+    """
+    Tabela distance-vector para roteamento por destino.
+
+    Cada vizinho anuncia {destino: (custo, saltos)}; o custo até um destino é
+    o custo do enlace até o vizinho somado ao custo anunciado. O melhor próximo
+    salto por destino fica em cache e só é recalculado para os destinos
+    afetados quando um enlace ou anúncio muda. Anúncios usam split horizon:
+    destinos roteados pelo próprio vizinho não são anunciados a ele (ou são
+    retirados com custo infinito quando a rota acabou de mudar para ele).
+
+    Com announce_self=False o nó não se anuncia como destino; com
+    export_links=False vizinhos diretos só são repassados adiante se eles
+    próprios se anunciaram. Juntos mantêm o estado proporcional ao número
+    de destinos anunciados (ex.: sorvedouros) em vez do tamanho da malha.
+    """
+
+    INFINITY = float('inf')
+
+    def __init__(self, node_id: str, max_hops: int = 32, announce_self: bool = True,
+                 export_links: bool = True):
+        self.node_id = node_id
+        self.max_hops = max_hops  # Limita contagem ao infinito
+        self.announce_self = announce_self
+        self.export_links = export_links
+        self._links: Dict[str, float] = {}                            # vizinho -> custo do enlace
+        self._adverts: Dict[str, Dict[str, Tuple[float, int]]] = {}   # vizinho -> {destino: (custo, saltos)}
+        self._via: Dict[str, set] = {}                                # destino -> vizinhos que o anunciam
+        self._best: Dict[str, Tuple[float, int, str]] = {}            # destino -> (custo, saltos, próximo salto)
+        self._changed: set = set()                                    # destinos alterados desde o último anúncio
+
+    def __len__(self) -> int:
+        return len(self._best)
+
+    def neighbors(self) -> List[str]:
+        return list(self._links)
+
+    def next_hop(self, destination: str) -> Optional[str]:
+        """Próximo salto para o destino, ou None se inalcançável"""
+        best = self._best.get(destination)
+        return best[2] if best else None
+
+    def cost(self, destination: str) -> float:
+        if destination == self.node_id:
+            return 0.0
+        best = self._best.get(destination)
+        return best[0] if best else self.INFINITY
+
+    def hops(self, destination: str) -> Optional[int]:
+        best = self._best.get(destination)
+        return best[1] if best else None
+
+    def set_link(self, neighbor: str, cost: Optional[float], keep_adverts: bool = False) -> set:
+        """
+        Atualiza (ou remove, com cost=None) o enlace direto para um vizinho.
+
+        Com keep_adverts=True o enlace sai do cálculo mas os anúncios do
+        vizinho são guardados (enlace em espera após falha): quando ele volta
+        as rotas reaparecem sem esperar um novo anúncio completo.
+        """
+        if cost is None:
+            if neighbor not in self._links:
+                return set()
+            del self._links[neighbor]
+            affected = set(self._adverts.get(neighbor, ())) if keep_adverts else self._drop_adverts(neighbor)
+        else:
+            if self._links.get(neighbor) == cost:
+                return set()
+            self._links[neighbor] = cost
+            affected = set(self._adverts.get(neighbor, ()))
+
+        affected.add(neighbor)
+        return self._recompute(affected)
+
+    def receive_advertisement(self, neighbor: str, vector: Dict[str, Tuple[float, int]]) -> set:
+        """Incorpora um anúncio (incremental) de um vizinho; retorna destinos alterados"""
+        adverts = self._adverts.setdefault(neighbor, {})
+        affected = set()
+        exported = set()  # Destinos que passaram a ser (ou deixaram de ser) exportáveis
+
+        for destination, (cost, hops) in vector.items():
+            if destination == self.node_id:
+                continue
+
+            if cost == self.INFINITY:
+                if adverts.pop(destination, None) is None:
+                    continue
+                via = self._via[destination]
+                via.discard(neighbor)
+                if not via:
+                    exported.add(destination)
+            else:
+                if adverts.get(destination) == (cost, hops):
+                    continue
+                via = self._via.setdefault(destination, set())
+                if not via:
+                    exported.add(destination)
+                adverts[destination] = (cost, hops)
+                via.add(neighbor)
+
+            affected.add(destination)
+
+        changed = self._recompute(affected)
+        if not self.export_links:
+            # O melhor caminho pode não mudar (enlace direto), mas o anúncio muda
+            exported &= set(self._best)
+            self._changed |= exported
+            changed |= exported
+        return changed
+
+    def build_advertisement(self, neighbor: str,
+                            destinations: Optional[set] = None) -> Dict[str, Tuple[float, int]]:
+        """Monta o anúncio para um vizinho (completo ou apenas dos destinos dados)"""
+        if destinations is None:
+            vector = {self.node_id: (0.0, 0)} if self.announce_self else {}
+            for destination, (cost, hops, next_hop) in self._best.items():
+                if next_hop != neighbor and destination != neighbor and self._exportable(destination):
+                    vector[destination] = (cost, hops)
+            return vector
+
+        vector = {}
+        for destination in destinations:
+            best = self._best.get(destination)
+            if best is None or best[2] == neighbor or not self._exportable(destination):
+                vector[destination] = (self.INFINITY, 0)
+            elif destination != neighbor:
+                vector[destination] = (best[0], best[1])
+        return vector
+
+    def _exportable(self, destination: str) -> bool:
+        """Destinos só conhecidos pelo enlace direto não são repassados sem export_links"""
+        return self.export_links or bool(self._via.get(destination))
+
+    def pop_changes(self) -> set:
+        """Retorna e limpa os destinos alterados desde o último anúncio"""
+        changes = self._changed
+        self._changed = set()
+        return changes
+
+    def routes(self) -> Dict[str, Tuple[float, int, str]]:
+        """Árvore de caminhos mínimos atual: destino -> (custo, saltos, próximo salto)"""
+        return dict(self._best)
+
+    def _drop_adverts(self, neighbor: str) -> set:
+        """Esquece tudo o que um vizinho anunciou"""
+        adverts = self._adverts.pop(neighbor, {})
+        for destination in adverts:
+            self._via[destination].discard(neighbor)
+        return set(adverts)
+
+    def _recompute(self, destinations: set) -> set:
+        """Recalcula o melhor próximo salto apenas para os destinos afetados"""
+        changed = set()
+
+        for destination in destinations:
+            candidate = None
+
+            link_cost = self._links.get(destination)
+            if link_cost is not None:
+                candidate = (link_cost, 1, destination)
+
+            for neighbor in self._via.get(destination, ()):
+                link_cost = self._links.get(neighbor)
+                if link_cost is None:
+                    continue
+                advertised_cost, advertised_hops = self._adverts[neighbor][destination]
+                hops = advertised_hops + 1
+                if hops > self.max_hops:
+                    continue
+                option = (link_cost + advertised_cost, hops, neighbor)
+                if candidate is None or option < candidate:
+                    candidate = option
+
+            if candidate != self._best.get(destination):
+                if candidate is None:
+                    del self._best[destination]
+                else:
+                    self._best[destination] = candidate
+                changed.add(destination)
+
+        self._changed |= changed
+        return changed
@@ -0,0 +1,106 @@
+import hashlib
+import os
+import random
+from typing import Dict, Optional
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: sem ele os sorteios são feitos um a um
+    np = None
+
+
+def derive_seed(seed: int, name: str) -> int:
+    """Semente estável de um componente a partir da semente raiz"""
+    digest = hashlib.blake2b(f"{seed}:{name}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class SimRandom(random.Random):
+    """random.Random semeado que guarda a própria semente para reprodução"""
+
+    def __init__(self, seed: Optional[int] = None, name: str = "root"):
+        if seed is None:
+            seed = int.from_bytes(os.urandom(8), "little")
+        self.initial_seed = seed
+        self.name = name
+        super().__init__(seed)
+
+    def spawn(self, name: str) -> 'SimRandom':
+        """Gerador independente e determinístico para um subcomponente"""
+        return type(self)(derive_seed(self.initial_seed, name), f"{self.name}.{name}")
+
+
+class BatchedRandom(SimRandom):
+    """
+    SimRandom que sorteia random() em blocos NumPy pré-gerados.
+
+    uniform, gauss, expovariate etc. derivam de random() e também passam a
+    consumir o bloco. Sem NumPy comporta-se como SimRandom. A sequência é
+    diferente da do modo comum: uma execução só é reproduzida no mesmo modo.
+    """
+
+    BLOCK_SIZE = 65536
+
+    def __init__(self, seed: Optional[int] = None, name: str = "root", block_size: int = BLOCK_SIZE):
+        self.block_size = block_size
+        self._block = []
+        self._index = 0
+        super().__init__(seed, name)
+        self._generator = np.random.Generator(np.random.PCG64(self.initial_seed)) if np is not None else None
+
+    def random(self) -> float:
+        if self._generator is None:
+            return super().random()
+        if self._index >= len(self._block):
+            self._block = self._generator.random(self.block_size).tolist()
+            self._index = 0
+        value = self._block[self._index]
+        self._index += 1
+        return value
+
+
+class RandomRegistry:
+    """Geradores por componente, todos derivados de uma semente raiz registrada"""
+
+    def __init__(self, seed: Optional[int] = None, batched: bool = False):
+        self.batched = batched and np is not None
+        factory = BatchedRandom if self.batched else SimRandom
+        self.root = factory(seed)
+        self._components: Dict[str, SimRandom] = {}
+
+    @property
+    def seed(self) -> int:
+        return self.root.initial_seed
+
+    def get(self, component: str) -> SimRandom:
+        rng = self._components.get(component)
+        if rng is None:
+            rng = self._components[component] = self.root.spawn(component)
+        return rng
+
+    def seeds(self) -> Dict:
+        """Sementes usadas até agora (suficiente para repetir a execução)"""
+        return {
+            "seed": self.seed,
+            "batched": self.batched,
+            "components": {name: rng.initial_seed for name, rng in self._components.items()}
+        }
+
+
+_registry = RandomRegistry()
+
+
+def get_rng(component: str) -> SimRandom:
+    """Gerador do componente no registro global"""
+    return _registry.get(component)
+
+
+def seed_all(seed: Optional[int] = None, batched: bool = False) -> RandomRegistry:
+    """Recria o registro global com a semente dada (None = aleatória, mas registrada)"""
+    global _registry
+    _registry = RandomRegistry(seed, batched)
+    return _registry
+
+
+def recorded_seeds() -> Dict:
+    return _registry.seeds()
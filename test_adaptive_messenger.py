@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Testes do mensageiro adaptativo: caminho compacto, encaminhamento e deduplicação
+"""
+
+import asyncio
+
+from adaptive_messenger import AdaptiveMessenger, Message, NetworkRoute, NetworkType, NodePath
+from clock import LoopClock, run_virtual
+
+
+class DeadLink:
+    """Camada de enlace falsa em que todo quadro se perde"""
+
+    def __init__(self):
+        self.frames = 0
+
+    async def transmit(self, sender, route, messages):
+        self.frames += len(messages)
+        return [False] * len(messages)
+
+
+def _route(next_hop: str = "DEVICE_B") -> NetworkRoute:
+    return NetworkRoute(network_type=NetworkType.WIFI, signal_strength=1.0, latency=1.0,
+                        available=True, next_hop=next_hop)
+
+
+def test_node_path_copy_shares_prefix():
+    path = NodePath(["A", "B"])
+    copy = path.copy()
+    copy.append("C")
+    path.append("D")
+
+    assert list(path) == ["A", "B", "D"]
+    assert list(copy) == ["A", "B", "C"]
+    assert copy[-1] == "C" and "D" not in copy
+
+
+def test_forward_message_with_empty_path():
+    messenger = AdaptiveMessenger("DEVICE_A", verbose=False)
+    message = Message(id="msg_1", source="DEVICE_A", destination="DEVICE_B",
+                      content="Olá", timestamp=0.0, path=[])
+
+    asyncio.run(messenger.forward_message(message, _route()))
+
+    assert list(message.path) == ["DEVICE_A"]
+    assert message.ttl == 99
+
+
+def test_forward_message_does_not_repeat_hop():
+    messenger = AdaptiveMessenger("DEVICE_A", verbose=False)
+    message = Message(id="msg_2", source="DEVICE_A", destination="DEVICE_B",
+                      content="Olá", timestamp=0.0, path=["DEVICE_A"])
+
+    asyncio.run(messenger.forward_message(message, _route()))
+
+    assert list(message.path) == ["DEVICE_A"]
+
+
+def test_failed_forward_waits_retry_delay():
+    async def scenario():
+        messenger = AdaptiveMessenger("DEVICE_A", verbose=False, retry_delay=1.0, clock=LoopClock())
+        messenger.network = DeadLink()
+        messenger._loop = asyncio.get_running_loop()
+        message = Message(id="msg_3", source="DEVICE_A", destination="DEVICE_B",
+                          content="Olá", timestamp=0.0, path=[])
+
+        await messenger.forward_message(message, _route())
+        assert not messenger.message_queue  # Nada de nova tentativa imediata
+        await asyncio.sleep(1.01)
+        assert messenger.message_queue.pop() is message
+
+    run_virtual(scenario())
+
+
+def test_dead_link_is_not_a_hot_loop():
+    async def scenario():
+        # Limiar alto: a rota continua ativa e só o retry_delay segura as novas tentativas
+        messenger = AdaptiveMessenger("DEVICE_A", verbose=False, retry_delay=1.0, clock=LoopClock(),
+                                      route_failure_threshold=1000)
+        messenger.network = DeadLink()
+        messenger.routing_table.upsert(_route(), messenger.clock.time())
+        messenger.send_message("DEVICE_B", "Olá")
+
+        consumer = asyncio.ensure_future(messenger.process_message_queue())
+        await asyncio.sleep(10.0)
+        consumer.cancel()
+        await asyncio.gather(consumer, return_exceptions=True)
+        return messenger.network.frames
+
+    assert run_virtual(scenario()) <= 11  # Uma tentativa por retry_delay
+
+
+def test_receive_drops_repeated_copies():
+    messenger = AdaptiveMessenger("DEVICE_B", verbose=False)
+    message = Message(id="msg_4", source="DEVICE_A", destination="DEVICE_C",
+                      content="Olá", timestamp=0.0, path=["DEVICE_A"], cognizant=False)
+
+    messenger.receive_message(message)
+    messenger.receive_message(message)
+
+    assert len(messenger.message_queue) == 1
+
+
+def test_echo_of_own_message_is_not_requeued():
+    messenger = AdaptiveMessenger("DEVICE_A", verbose=False)
+    message = messenger.send_message("DEVICE_B", "Olá")
+    message.cognizant = False
+    assert messenger.message_queue.pop() is message
+
+    messenger.receive_message(message)  # Volta de um vizinho: já visto no envio
+    assert not messenger.message_queue
+
+
+def test_route_message_retries_a_seen_message():
+    # A deduplicação fica na entrada (send/receive): nova tentativa não é descartada como cópia
+    messenger = AdaptiveMessenger("DEVICE_A", verbose=False)
+    message = messenger.send_message("DEVICE_B", "Olá")
+    assert messenger.message_queue.pop() is message
+
+    asyncio.run(messenger.route_message(message))  # Sem rotas: volta para a fila
+
+    assert messenger.message_queue.pop() is message
+    assert message.ttl == 99
+
+
+if __name__ == "__main__":
+    for test in (test_node_path_copy_shares_prefix, test_forward_message_with_empty_path,
+                 test_forward_message_does_not_repeat_hop, test_failed_forward_waits_retry_delay,
+                 test_dead_link_is_not_a_hot_loop, test_receive_drops_repeated_copies,
+                 test_echo_of_own_message_is_not_requeued, test_route_message_retries_a_seen_message):
+        test()
+        print(f"✅ {test.__name__}")
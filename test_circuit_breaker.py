@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Testes das transições de estado do disjuntor
+"""
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from clock import set_clock
+
+
+class ManualClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self) -> float:
+        return self.now
+
+
+def _with_clock(test):
+    def run():
+        clock = ManualClock()
+        previous = set_clock(clock)
+        try:
+            test(clock)
+        finally:
+            set_clock(previous)
+    run.__name__ = test.__name__
+    return run
+
+
+@_with_clock
+def test_opens_after_failure_rate(clock):
+    breaker = CircuitBreaker(failure_rate=0.5, min_calls=4, reset_timeout=30.0)
+    for _ in range(2):
+        breaker.record_success(0.1)
+    breaker.record_failure()
+    assert breaker.state == CLOSED  # Ainda abaixo de min_calls
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert breaker.allow() is False
+    assert breaker.short_circuits == 1
+
+
+@_with_clock
+def test_half_open_probe_closes_on_success(clock):
+    breaker = CircuitBreaker(min_calls=1, reset_timeout=30.0)
+    breaker.record_failure()
+    clock.now = 30.0
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is True
+    assert breaker.allow() is False  # Só uma chamada de teste
+    breaker.record_success(0.1)
+
+    assert breaker.state == CLOSED
+    assert [transition["to"] for transition in breaker.transitions] == [OPEN, HALF_OPEN, CLOSED]
+
+
+@_with_clock
+def test_half_open_probe_reopens_on_failure(clock):
+    breaker = CircuitBreaker(min_calls=1, reset_timeout=30.0)
+    breaker.record_failure()
+    clock.now = 30.0
+    assert breaker.allow() is True
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert breaker.trips == 2
+
+
+@_with_clock
+def test_slow_calls_count_as_failures(clock):
+    breaker = CircuitBreaker(min_calls=2, latency_threshold=1.0)
+    breaker.record_success(2.0)
+    breaker.record_success(2.0)
+
+    assert breaker.state == OPEN
+    assert breaker.slow_calls == 2
+
+
+@_with_clock
+def test_released_probe_allows_new_probe(clock):
+    breaker = CircuitBreaker(min_calls=1, reset_timeout=30.0)
+    breaker.record_failure()
+    clock.now = 30.0
+    assert breaker.allow() is True
+    breaker.release_probe()  # Chamada de teste cancelada
+
+    assert breaker.allow() is True
+
+
+if __name__ == "__main__":
+    for test in (test_opens_after_failure_rate, test_half_open_probe_closes_on_success,
+                 test_half_open_probe_reopens_on_failure, test_slow_calls_count_as_failures,
+                 test_released_probe_allows_new_probe):
+        test()
+        print(f"✅ {test.__name__}")
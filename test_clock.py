@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Testes do relógio virtual: ordem dos sleeps, saltos de tempo e relógio global
+"""
+
+import asyncio
+import time
+
+from clock import SYSTEM_CLOCK, LoopClock, VirtualTimeEventLoop, get_clock, run_virtual, set_clock
+
+
+def test_virtual_sleeps_wake_in_deadline_order():
+    order = []
+
+    async def sleeper(name: str, delay: float):
+        await asyncio.sleep(delay)
+        order.append((name, asyncio.get_running_loop().time()))
+
+    async def scenario():
+        await asyncio.gather(sleeper("c", 30.0), sleeper("a", 0.5), sleeper("b", 2.0))
+
+    started = time.perf_counter()
+    run_virtual(scenario(), epoch=0.0)
+
+    assert order == [("a", 0.5), ("b", 2.0), ("c", 30.0)]
+    assert time.perf_counter() - started < 1.0  # 30 s virtuais sem espera real
+
+
+def test_global_clock_follows_the_loop():
+    async def scenario():
+        clock = get_clock()
+        before = clock.time()
+        await clock.sleep(3600.0)
+        return clock, clock.time() - before
+
+    outside = get_clock()
+    clock, elapsed = run_virtual(scenario(), epoch=1_000.0)
+    assert isinstance(clock, LoopClock) and clock.epoch == 1_000.0
+    assert elapsed == 3600.0
+    assert get_clock() is outside  # Restaurado ao sair
+
+
+def test_timeouts_fire_in_virtual_time():
+    async def scenario():
+        try:
+            await asyncio.wait_for(asyncio.sleep(10.0), timeout=1.0)
+        except asyncio.TimeoutError:
+            return asyncio.get_running_loop().time()
+
+    assert run_virtual(scenario(), epoch=0.0) == 1.0
+
+
+def test_loop_clock_outside_a_loop_is_wall_time():
+    assert abs(LoopClock(epoch=5.0).time() - time.time()) < 1.0
+
+
+def test_set_clock_returns_previous():
+    loop_clock = LoopClock()
+    previous = set_clock(loop_clock)
+    try:
+        assert get_clock() is loop_clock
+        assert set_clock(None) is loop_clock
+        assert get_clock() is SYSTEM_CLOCK  # None volta ao relógio real
+    finally:
+        set_clock(previous)
+
+
+def test_call_later_advances_without_sleeping():
+    loop = VirtualTimeEventLoop()
+    fired = []
+    try:
+        loop.call_later(120.0, lambda: fired.append(loop.time()))
+        loop.call_later(121.0, loop.stop)
+        loop.run_forever()
+    finally:
+        loop.close()
+    assert fired == [120.0]
+
+
+if __name__ == "__main__":
+    for test in (test_virtual_sleeps_wake_in_deadline_order, test_global_clock_follows_the_loop,
+                 test_timeouts_fire_in_virtual_time, test_loop_clock_outside_a_loop_is_wall_time,
+                 test_set_clock_returns_previous, test_call_later_advances_without_sleeping):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Testes do motor de decisão: tabela igual às regras, margem entre rotas e estratégia
+"""
+
+import itertools
+from types import SimpleNamespace
+
+from decision_engine import (CLEAR, CLOSE, FAILURE_BUCKETS, MARGIN_STATES, PHYSICAL_STATES, ROUTE_BUCKETS,
+                             WEAK, DecisionEngine, _rule)
+
+
+def _message(failures: int = 0, strategy: str = None, anchored: bool = False, level: int = 5):
+    return SimpleNamespace(
+        memory={"failed_attempts": [f"falha {i}" for i in range(failures)]},
+        physical_analysis={"recommended_strategy": {"strategy": strategy}} if strategy else None,
+        current_location="node_1",
+        anchored_locations=["node_1"] if anchored else [],
+        intelligence_level=level
+    )
+
+
+def test_table_matches_rules_for_every_combination():
+    engine = DecisionEngine()
+    combinations = list(itertools.product(range(FAILURE_BUCKETS), range(ROUTE_BUCKETS), range(PHYSICAL_STATES),
+                                          range(MARGIN_STATES), range(2), range(2)))
+    assert len(engine._table) == len(combinations)
+    for features in combinations:
+        assert engine.lookup(features) == _rule(*features), features
+
+
+def test_route_margin():
+    engine = DecisionEngine(close_margin=0.1, weak_score=50.0)
+    assert engine._margin([]) == CLEAR
+    assert engine._margin([90.0, 60.0]) == CLEAR
+    assert engine._margin([90.0, 85.0]) == CLOSE
+    assert engine._margin([40.0, 39.0]) == WEAK
+
+
+def test_features_from_message():
+    engine = DecisionEngine(smart_level=7)
+    message = _message(failures=5, strategy="multi_medium", anchored=True, level=8)
+    assert engine.features(message, 7, [90.0, 88.0]) == (3, 3, 2, CLOSE, 1, 1)
+    assert engine.features(_message(), 0) == (0, 0, 0, CLEAR, 0, 0)
+
+
+def test_clear_route_follows_the_best():
+    decision = DecisionEngine().decide(_message(), ["lora", "wifi", "mesh"], [30.0, 95.0, 60.0])
+    assert decision["type"] == "single_route"
+    assert decision["primary_route"] == "wifi" and decision["backup_routes"] == ["mesh", "lora"]
+    assert not decision["should_clone"] and not decision["should_anchor"]
+
+
+def test_many_failures_anchor_and_clone():
+    engine = DecisionEngine()
+    decision = engine.decide(_message(failures=4), ["a", "b", "c"])
+    assert decision["should_anchor"] and decision["should_clone"]
+    assert decision["type"] == "multi_route"
+
+    # Já ancorada aqui: não ancora de novo
+    assert not engine.decide(_message(failures=4, anchored=True), ["a", "b", "c"])["should_anchor"]
+    assert engine.decisions == 2
+
+
+def test_close_scores_clone_only_for_smart_messages():
+    engine = DecisionEngine(smart_level=7)
+    routes, scores = ["a", "b", "c"], [90.0, 88.0, 20.0]
+    assert engine.decide(_message(level=9), routes, scores)["should_clone"]
+    assert not engine.decide(_message(level=3), routes, scores)["should_clone"]
+
+
+def test_no_routes():
+    decision = DecisionEngine().decide(_message(), [])
+    assert decision["primary_route"] is None and decision["backup_routes"] == []
+    assert decision["reason"] == "sem rotas disponíveis"
+
+
+if __name__ == "__main__":
+    for test in (test_table_matches_rules_for_every_combination, test_route_margin, test_features_from_message,
+                 test_clear_route_follows_the_best, test_many_failures_anchor_and_clone,
+                 test_close_scores_clone_only_for_smart_messages, test_no_routes):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Testes do cache de deduplicação por baldes de tempo
+"""
+
+from dedup_cache import DedupCache
+
+
+class ManualClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_expire_after_ttl():
+    clock = ManualClock()
+    cache = DedupCache(ttl=10.0, buckets=5, clock=clock)
+
+    assert cache.check_and_add("msg") is False
+    assert cache.check_and_add("msg") is True
+
+    clock.now = 10.0  # Ainda dentro do TTL + um balde
+    assert "msg" in cache
+    clock.now = 12.0
+    assert "msg" not in cache
+    assert len(cache) == 0
+    assert cache.check_and_add("msg") is False
+
+
+def test_memory_bound_evicts_oldest_bucket():
+    clock = ManualClock()
+    cache = DedupCache(ttl=100.0, max_entries=10, buckets=5, clock=clock)
+    for i in range(12):
+        cache.add(f"m{i}")
+        clock.now += 1.0
+
+    assert len(cache) <= 10
+    assert "m0" not in cache
+    assert "m11" in cache
+    assert cache.stats()["evicted"] >= 2
+
+
+def test_bloom_mode_has_no_false_negatives():
+    clock = ManualClock()
+    cache = DedupCache(ttl=10.0, max_entries=1000, mode="bloom", clock=clock)
+    keys = [f"m{i}" for i in range(500)]
+    for key in keys:
+        cache.add(key)
+
+    assert all(key in cache for key in keys)
+    clock.now = 13.0
+    assert not any(key in cache for key in keys)
+
+
+if __name__ == "__main__":
+    for test in (test_entries_expire_after_ttl, test_memory_bound_evicts_oldest_bucket,
+                 test_bloom_mode_has_no_false_negatives):
+        test()
+        print(f"✅ {test.__name__}")
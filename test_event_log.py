@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Testes do log de eventos: filtro por nível, amostragem concorrente e escrita em lotes
+"""
+
+import io
+import threading
+
+from event_log import DEBUG, ERROR, INFO, NULL_LOG, WARNING, EventLog
+
+
+def _lines(log: EventLog, stream: io.StringIO):
+    log.flush()
+    return stream.getvalue().splitlines()
+
+
+def test_registered_formats_are_applied_by_the_writer():
+    stream = io.StringIO()
+    log = EventLog(stream)
+    log.register({"delivered": "📬 {} entregue em {:.1f}s", "broken": "{} {}"})
+    log.emit("node_1", "delivery", INFO, "delivered", "msg_1", 0.25)
+    log.emit("node_1", "delivery", INFO, "unknown", 1, "b")
+    log.emit("node_1", "delivery", INFO, "broken", 1)  # Campos a menos: falha na escrita, não no emit
+
+    lines = _lines(log, stream)
+    log.close()
+    assert lines[0] == "[node_1] 📬 msg_1 entregue em 0.2s"
+    assert lines[1] == "[node_1] unknown 1 b"
+    assert lines[2].startswith("[event_log] Falha ao formatar broken")
+
+
+def test_component_levels_filter_before_queueing():
+    stream = io.StringIO()
+    log = EventLog(stream, level=WARNING)
+    log.set_level(DEBUG, "transmit")
+    log.emit("a", "routing", INFO, "ignored")
+    log.emit("a", "transmit", DEBUG, "kept")
+    log.emit("a", "routing", ERROR, "also_kept")
+
+    assert log.enabled("transmit", DEBUG) and not log.enabled("routing", INFO)
+    assert _lines(log, stream) == ["[a] kept", "[a] also_kept"]
+    assert log.stats() == {"emitted": 2, "sampled_out": 0, "written": 2}
+    log.close()
+
+
+def test_concurrent_sampling_loses_no_events():
+    stream = io.StringIO()
+    log = EventLog(stream)
+    log.sample("tick", 10)
+    threads, per_thread = 8, 5000
+    start = threading.Barrier(threads)
+
+    def worker(index: int):
+        start.wait()
+        for _ in range(per_thread):
+            log.emit(f"t{index}", "sim", INFO, "tick")
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+
+    total = threads * per_thread
+    lines = _lines(log, stream)
+    log.close()
+    assert log.emitted + log.sampled_out == total
+    assert log.emitted == total // 10  # Exatamente 1 a cada 10, sem contagens perdidas
+    assert len(lines) == log.written == log.emitted
+
+
+def test_sampling_can_be_turned_off():
+    stream = io.StringIO()
+    log = EventLog(stream)
+    log.sample("tick", 3)
+    for _ in range(6):
+        log.emit("a", "sim", INFO, "tick")
+    log.sample("tick", 1)
+    for _ in range(2):
+        log.emit("a", "sim", INFO, "tick")
+
+    assert len(_lines(log, stream)) == 4
+    log.close()
+
+
+def test_null_log_does_nothing():
+    NULL_LOG.emit("a", "sim", ERROR, "anything")
+    assert not NULL_LOG.enabled("sim", ERROR)
+    assert NULL_LOG.stats() == {"emitted": 0, "sampled_out": 0, "written": 0}
+    assert NULL_LOG._thread is None
+
+
+if __name__ == "__main__":
+    for test in (test_registered_formats_are_applied_by_the_writer, test_component_levels_filter_before_queueing,
+                 test_concurrent_sampling_loses_no_events, test_sampling_can_be_turned_off, test_null_log_does_nothing):
+        test()
+        print(f"✅ {test.__name__}")
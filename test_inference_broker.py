@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Testes do broker de inferência: micro-lotes, prioridade e encerramento
+"""
+
+import asyncio
+
+from inference_broker import InferenceBroker
+
+
+class RecordingClient:
+    """Cliente LLM falso: registra a ordem dos prompts e pode ficar preso até ser liberado"""
+
+    def __init__(self, blocked: bool = False):
+        self.prompts = []
+        self.release = asyncio.Event()
+        if not blocked:
+            self.release.set()
+
+    async def generate(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        await self.release.wait()
+        return f"ok: {prompt}"
+
+
+def test_concurrent_requests_share_a_batch():
+    async def scenario():
+        client = RecordingClient()
+        broker = InferenceBroker(client, window=0.01, max_batch=16, max_concurrency=16)
+        results = await asyncio.gather(*(broker.generate(f"p{i}") for i in range(10)))
+        await broker.close()
+        return broker, results
+
+    broker, results = asyncio.run(scenario())
+    assert results == [f"ok: p{i}" for i in range(10)]
+    assert broker.batches == 1 and broker.largest_batch == 10
+    assert broker.completed == 10 and broker.failed == 0
+
+
+def test_higher_priority_is_dispatched_first():
+    async def scenario():
+        client = RecordingClient()
+        broker = InferenceBroker(client, window=0.01, max_concurrency=1)
+        await asyncio.gather(*(broker.generate(f"nivel {level}", priority=level) for level in (1, 7, 3, 9, 5)))
+        await broker.close()
+        return client.prompts
+
+    assert asyncio.run(scenario()) == ["nivel 9", "nivel 7", "nivel 5", "nivel 3", "nivel 1"]
+
+
+def test_client_error_fails_only_its_request():
+    class FlakyClient(RecordingClient):
+        async def generate(self, prompt: str) -> str:
+            if prompt == "ruim":
+                raise RuntimeError("falha do LLM")
+            return await super().generate(prompt)
+
+    async def scenario():
+        broker = InferenceBroker(FlakyClient(), window=0.01)
+        results = await asyncio.gather(broker.generate("bom"), broker.generate("ruim"), return_exceptions=True)
+        await broker.close()
+        return broker, results
+
+    broker, results = asyncio.run(scenario())
+    assert results[0] == "ok: bom"
+    assert isinstance(results[1], RuntimeError)
+    assert broker.completed == 1 and broker.failed == 1
+
+
+def test_close_cancels_in_flight_and_waiting_requests():
+    async def scenario():
+        client = RecordingClient(blocked=True)
+        broker = InferenceBroker(client, window=0.0, max_concurrency=1)
+        requests = [asyncio.ensure_future(broker.generate(f"p{i}")) for i in range(3)]
+        while not client.prompts:  # O primeiro pedido já está no cliente, os outros na fila
+            await asyncio.sleep(0)
+        lane = broker._lane()
+        worker = lane.worker
+
+        await broker.close()
+        results = await asyncio.wait_for(asyncio.gather(*requests, return_exceptions=True), timeout=1.0)
+        return broker, worker, lane, results
+
+    broker, worker, lane, results = asyncio.run(scenario())
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+    assert worker.cancelled() and not lane.tasks
+    assert broker.stats()["pending"] == 0
+
+
+if __name__ == "__main__":
+    for test in (test_concurrent_requests_share_a_batch, test_higher_priority_is_dispatched_first,
+                 test_client_error_fails_only_its_request, test_close_cancels_in_flight_and_waiting_requests):
+        test()
+        print(f"✅ {test.__name__}")
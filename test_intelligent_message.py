@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Testes da mensagem pensante: cache de pensamentos injetado
+"""
+
+import asyncio
+
+from intelligent_message import ThinkingMessage
+from thought_cache import ThoughtCache, get_thought_cache
+
+
+class CountingClient:
+    """Cliente LLM local que conta as chamadas"""
+
+    def __init__(self, reply: str = "Seguir pelo melhor vizinho."):
+        self.reply = reply
+        self.calls = 0
+
+    async def generate(self, prompt: str):
+        self.calls += 1
+        return self.reply
+
+
+def _message(cache: ThoughtCache, client: CountingClient) -> ThinkingMessage:
+    return ThinkingMessage(id="msg_1", content="Olá", destination="node_9", source="node_0",
+                           timestamp=0.0, llm_client=client, thought_cache=cache)
+
+
+def test_injected_empty_cache_is_used():
+    cache = ThoughtCache()
+    client = CountingClient()
+    global_cache = get_thought_cache()
+    global_size = len(global_cache) if global_cache is not None else 0
+
+    first = asyncio.run(_message(cache, client).think("rotas: [a, b]"))
+    second = asyncio.run(_message(cache, client).think("rotas: [b, a]"))
+
+    assert first == second == client.reply
+    assert client.calls == 1
+    assert cache.stats()["misses"] == 1 and cache.stats()["hits"] == 1
+    assert len(cache) == 1
+    if global_cache is not None:
+        assert len(global_cache) == global_size
+
+
+if __name__ == "__main__":
+    test_injected_empty_cache_is_used()
+    print("✅ test_injected_empty_cache_is_used")
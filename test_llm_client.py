@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Testes do cliente LLM: tentativa extra (hedge), prazo, disjuntor e stub local
+"""
+
+import asyncio
+
+from circuit_breaker import CLOSED, OPEN, CircuitBreaker
+from clock import run_virtual
+from llm_client import DEFAULT_API_URL, LLMClient, StubLLMServer
+
+
+def _reply(text: str):
+    return {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+
+
+class ScriptedClient(LLMClient):
+    """Cliente sem rede: cada requisição demora o atraso roteirizado (None = status de erro)"""
+
+    def __init__(self, delays, **options):
+        options.setdefault("breaker", CircuitBreaker())
+        super().__init__(api_url="http://stub.invalid/generate", api_key="", **options)
+        self.delays = list(delays)
+        self.started = []
+
+    async def _post_once(self, payload):
+        index = self.requests
+        self.requests += 1
+        loop = asyncio.get_running_loop()
+        self.started.append(loop.time())
+        delay = self.delays[index] if index < len(self.delays) else self.delays[-1]
+        await asyncio.sleep(delay or 0.0)
+        return None if delay is None else _reply(f"tentativa {index}")
+
+
+def test_hedge_fires_after_p90_latency():
+    client = ScriptedClient([5.0, 0.2], deadline=4.0)
+    client._latencies.extend(0.1 * i for i in range(1, 11))  # p90 das recentes: 0.9 s
+
+    async def scenario():
+        started = asyncio.get_running_loop().time()
+        text = await client.generate("oi")
+        return text, [moment - started for moment in client.started], asyncio.get_running_loop().time() - started
+
+    text, starts, elapsed = run_virtual(scenario(), epoch=0.0)
+    assert text == "tentativa 1"
+    assert [round(moment, 6) for moment in starts] == [0.0, 0.9]
+    assert round(elapsed, 6) == 1.1
+    assert client.hedges == 1 and client.hedge_wins == 1
+
+
+def test_fast_reply_needs_no_hedge():
+    client = ScriptedClient([0.3], deadline=4.0)
+    client._latencies.extend(0.1 * i for i in range(1, 11))
+
+    assert run_virtual(client.generate("oi"), epoch=0.0) == "tentativa 0"
+    assert client.requests == 1 and client.hedges == 0
+
+
+def test_cold_client_hedges_at_half_the_deadline():
+    client = ScriptedClient([5.0, 0.1], deadline=4.0)
+    assert client._hedge_delay() == 2.0
+
+    async def scenario():
+        await client.generate("oi")
+        return client.started
+
+    assert [round(moment, 6) for moment in run_virtual(scenario(), epoch=0.0)] == [0.0, 2.0]
+
+
+def test_deadline_returns_none():
+    client = ScriptedClient([10.0], deadline=3.0, hedge_after=1.0)
+
+    async def scenario():
+        result = await client.generate("oi")
+        return result, asyncio.get_running_loop().time()
+
+    result, finished = run_virtual(scenario(), epoch=0.0)
+    assert result is None and round(finished, 6) == 3.0
+    assert client.timeouts == 1 and client.requests == 2
+
+
+def test_breaker_opens_and_recovers():
+    breaker = CircuitBreaker(min_calls=3, failure_rate=0.5, reset_timeout=30.0)
+    client = ScriptedClient([None, None, None, None, 0.1], breaker=breaker, hedging=False)
+
+    async def scenario():
+        for _ in range(3):
+            assert await client.generate("oi") is None
+        assert breaker.state == OPEN
+        assert await client.generate("oi") is None  # Cortado sem requisição
+        assert client.requests == 3
+
+        await asyncio.sleep(30.0)
+        assert await client.generate("oi") is None  # Chamada de teste falha: abre de novo
+        assert breaker.state == OPEN
+        await asyncio.sleep(30.0)
+        return await client.generate("oi")
+
+    assert run_virtual(scenario(), epoch=0.0) == "tentativa 4"
+    assert breaker.state == CLOSED and breaker.short_circuits == 1
+
+
+def test_missing_api_key_fails_clearly():
+    client = LLMClient(api_url=DEFAULT_API_URL, api_key="")
+    try:
+        asyncio.run(client.generate("oi"))
+    except RuntimeError as e:
+        assert "GEMINI_API_KEY" in str(e)
+    else:
+        raise AssertionError("chamada sem chave aceita")
+    assert client.requests == 0 and client.breaker.failures == 0
+
+
+def test_stub_server_reuses_pooled_connections():
+    async def scenario():
+        async with StubLLMServer(latency=0.01, reply="pong") as server:
+            client = LLMClient(api_url=server.url, api_key="", limit_per_host=4)
+            replies = await asyncio.gather(*(client.generate("ping") for _ in range(20)))
+            await client.close()
+            return replies, server.connections, client.sessions_created
+
+    replies, connections, sessions = asyncio.run(scenario())
+    assert replies == ["pong"] * 20
+    assert connections <= 4 and sessions == 1
+
+
+if __name__ == "__main__":
+    for test in (test_hedge_fires_after_p90_latency, test_fast_reply_needs_no_hedge,
+                 test_cold_client_hedges_at_half_the_deadline, test_deadline_returns_none,
+                 test_breaker_opens_and_recovers, test_missing_api_key_fails_clearly,
+                 test_stub_server_reuses_pooled_connections):
+        test()
+        print(f"✅ {test.__name__}")
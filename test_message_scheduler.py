@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Testes da fila de prioridade de mensagens
+"""
+
+from dataclasses import dataclass
+
+from message_scheduler import MessageScheduler
+
+
+@dataclass
+class QueuedMessage:
+    id: str
+    priority: int = 1
+
+
+class ManualClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_priority_then_fifo():
+    clock = ManualClock()
+    queue = MessageScheduler(clock=clock)
+    for message_id, priority in (("a", 1), ("b", 5), ("c", 1), ("d", 5)):
+        queue.push(QueuedMessage(message_id, priority))
+        clock.now += 1
+
+    assert [queue.pop().id for _ in range(4)] == ["b", "d", "a", "c"]
+    assert queue.pop() is None
+
+
+def test_drop_is_lazy_and_compacts():
+    queue = MessageScheduler()
+    for i in range(10):
+        queue.push(QueuedMessage(f"m{i}"))
+    queue.push(QueuedMessage("m3"))
+
+    assert queue.drop("m3") == 2
+    assert len(queue) == 9
+    assert "m3" not in {message.id for message in queue}
+    assert len(queue._heap) == 11  # Entradas removidas continuam no heap até a compactação
+
+    for i in range(6):
+        queue.drop(f"m{i}")
+    assert len(queue) == 4
+    assert len(queue._heap) < 11  # Muitas remoções: o heap foi compactado
+    assert [queue.pop().id for _ in range(4)] == ["m6", "m7", "m8", "m9"]
+
+
+def test_reprioritize_keeps_enqueue_time():
+    clock = ManualClock()
+    queue = MessageScheduler(clock=clock)
+    queue.push(QueuedMessage("old", 1))
+    clock.now = 1
+    queue.push(QueuedMessage("new", 3))
+
+    assert queue.reprioritize("old", 3) == 1
+    assert queue.peek().id == "old"
+    assert [queue.pop().id, queue.pop().id] == ["old", "new"]
+
+
+def test_stats_track_wait():
+    clock = ManualClock()
+    queue = MessageScheduler(clock=clock)
+    queue.push(QueuedMessage("a"))
+    clock.now = 4
+    queue.pop()
+
+    stats = queue.stats()
+    assert stats["enqueued"] == stats["dequeued"] == 1
+    assert stats["avg_wait"] == stats["max_wait"] == 4
+
+
+if __name__ == "__main__":
+    for test in (test_priority_then_fifo, test_drop_is_lazy_and_compacts,
+                 test_reprioritize_keeps_enqueue_time, test_stats_track_wait):
+        test()
+        print(f"✅ {test.__name__}")
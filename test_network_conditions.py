@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Testes do motor de condições: volume de deltas nos padrões e planejador incremental
+"""
+
+import random
+
+from network_conditions import ConditionsEngine
+from network_topology import grid
+from route_planner import RoutePlanner
+
+
+class ConditionsSimulator:
+    """Simulador mínimo sobre o motor de condições (disponibilidade e pontuação por confiabilidade)"""
+
+    def __init__(self, topology, seed: int = 7):
+        self.topology = topology
+        self.conditions = ConditionsEngine(topology.node_count, topology.name, topology.index,
+                                           rng=random.Random(seed))
+
+    def is_available(self, name: str) -> bool:
+        return self.conditions.is_available(self.topology.index(name))
+
+    def calculate_route_score(self, name: str) -> float:
+        return self.conditions.get(self.topology.index(name))["reliability"] * 10
+
+
+def test_default_threshold_follows_volatility():
+    engine = ConditionsEngine(10, str, int, rng=random.Random(1))
+    assert engine.delta_threshold == engine.DELTA_SPREADS * engine.spread
+    calmer = ConditionsEngine(10, str, int, rng=random.Random(1), volatility=0.01)
+    assert calmer.delta_threshold < engine.delta_threshold
+    assert ConditionsEngine(10, str, int, delta_threshold=0.5).delta_threshold == 0.5
+
+
+def test_default_ticks_publish_few_deltas():
+    # Abaixo de RoutePlanner.rebuild_fraction (5%): deltas reparam árvores em vez de descartá-las
+    for dt in (0.5, 1.0):
+        engine = ConditionsEngine(2000, str, int, rng=random.Random(3))
+        fractions = [len(engine.tick(dt)) / engine.node_count for _ in range(60)]
+        assert sum(fractions) / len(fractions) < 0.05, dt
+        if dt == 0.5:
+            assert max(fractions) < 0.05
+
+
+def test_decaying_congestion_settles():
+    engine = ConditionsEngine(500, str, int, rng=random.Random(5), volatility=0.0, delta_threshold=0.2,
+                              degrade_rate=0.0, recover_rate=0.0)
+    deltas = [0] * engine.node_count
+    for _ in range(120):
+        for index in engine.tick(1.0):
+            deltas[index] += 1
+    # Mudança absoluta: o congestionamento cai no máximo 0.8, então cada nó publica até 4 vezes
+    # (relativa, a queda exponencial da carga publicaria o nó a cada poucos ticks para sempre)
+    assert max(deltas) <= 4
+
+
+def test_planner_repairs_instead_of_rebuilding():
+    simulator = ConditionsSimulator(grid(20, 20))
+    planner = RoutePlanner(simulator)
+    names = list(simulator.topology.node_names())
+    destination = names[-1]
+    planner.path(names[0], destination)
+
+    for _ in range(20):
+        simulator.conditions.tick(0.5)
+        planner.path(names[0], destination)
+    assert planner.trees_built == 1 and planner.repairs > 0
+
+    # A árvore reparada só ignora a deriva abaixo do limiar, ainda não publicada
+    fresh = RoutePlanner(simulator)
+    for name in names:
+        repaired, rebuilt = planner.cost(name, destination), fresh.cost(name, destination)
+        assert repaired == rebuilt or abs(repaired - rebuilt) <= 0.01 * rebuilt
+
+
+if __name__ == "__main__":
+    for test in (test_default_threshold_follows_volatility, test_default_ticks_publish_few_deltas,
+                 test_decaying_congestion_settles, test_planner_repairs_instead_of_rebuilding):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Testes da topologia CSR: nomes, índices e persistência
+"""
+
+import os
+import struct
+import tempfile
+
+from network_topology import Topology, _HEADER, grid
+
+
+def test_index_accepts_only_canonical_names():
+    topology = grid(4)
+
+    assert topology.index("node_0") == 0
+    assert topology.index("node_15") == 15
+    for name in ("node_16", "node_01", "node_", "node_-1", "node_١", "node_²", "relay_3"):
+        assert topology.index(name) is None
+
+
+def test_save_load_round_trip_in_network_order():
+    topology = grid(3)
+    named = Topology.from_adjacency({"a": ["b"], "b": ["a", "c"], "c": ["b"]})
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "grid.topo")
+        topology.save(path)
+        loaded = Topology.load(path)
+        assert list(loaded.indptr) == list(topology.indptr)
+        assert list(loaded.indices) == list(topology.indices)
+
+        # indptr logo após cabeçalho e prefixo, em big-endian como o cabeçalho
+        with open(path, "rb") as f:
+            data = f.read()
+        offset = _HEADER.size + 2 + len(topology.prefix)
+        assert struct.unpack_from("!q", data, offset + 8)[0] == topology.indptr[1]
+
+        path = os.path.join(directory, "named.topo")
+        named.save(path)
+        loaded = Topology.load(path)
+        assert loaded.names == ["a", "b", "c"]
+        assert loaded.neighbors("b") == named.neighbors("b")
+
+
+if __name__ == "__main__":
+    for test in (test_index_accepts_only_canonical_names, test_save_load_round_trip_in_network_order):
+        test()
+        print(f"✅ {test.__name__}")
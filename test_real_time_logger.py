@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Testes do RealTimeLogger: entrega em lote aos assinantes e formatação preguiçosa
+"""
+
+import asyncio
+import json
+
+import advanced_messaging_system as ams
+from advanced_messaging_system import LogEntry, RealTimeLogger
+
+
+def test_callbacks_receive_json_serialisable_dicts():
+    received = []
+    logger = RealTimeLogger(received.append, echo=False)
+    logger.log("INFO", "olá", {"hop": 3})
+
+    assert received == [{"seq": 1, "timestamp": received[0]["timestamp"], "level": "INFO",
+                         "message": "olá", "data": {"hop": 3}}]
+    json.dumps(received)  # Assinantes antigos serializam a entrada direto
+
+
+def test_raw_subscribers_receive_log_entries():
+    raw, batches = [], []
+    logger = RealTimeLogger(echo=False)
+    logger.subscribe(raw.append, raw=True)
+    logger.subscribe(batches.append, batched=True)
+    logger.log("WARNING", "a")
+    logger.log("DEBUG", "b")
+
+    assert all(isinstance(entry, LogEntry) for entry in raw)
+    assert [entry.message for entry in raw] == ["a", "b"]
+    assert [[entry["message"] for entry in batch] for batch in batches] == [["a"], ["b"]]
+
+
+def test_delivery_is_batched_inside_the_event_loop():
+    batches = []
+
+    async def scenario():
+        logger = RealTimeLogger(echo=False)
+        logger.subscribe(batches.append, batched=True)
+        for i in range(5):
+            logger.log("INFO", f"m{i}")
+        assert batches == []  # Só no próximo ciclo do loop
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert [[entry["message"] for entry in batch] for batch in batches] == [[f"m{i}" for i in range(5)]]
+
+
+def test_timestamps_are_formatted_lazily():
+    formatted = []
+    original = LogEntry.timestamp.fget
+
+    def counting(entry):
+        formatted.append(entry.seq)
+        return original(entry)
+
+    LogEntry.timestamp = property(counting)
+    try:
+        logger = RealTimeLogger(echo=False)
+        for i in range(100):
+            logger.log("INFO", f"m{i}")
+        assert formatted == []  # Sem assinante de dict nada é formatado
+
+        received = []
+        logger.subscribe(received.append)
+        logger.subscribe(received.append)
+        logger.log("INFO", "com assinantes")
+        assert formatted == [101]  # Um dict por entrega, compartilhado pelos assinantes
+        assert received[0] is received[1]
+    finally:
+        LogEntry.timestamp = property(original)
+
+
+def test_echo_formats_the_clock_once_per_second():
+    calls = []
+    original = ams.time.strftime
+
+    def counting(fmt, moment):
+        calls.append(moment)
+        return original(fmt, moment)
+
+    logger = RealTimeLogger(echo=True)
+    ams.time.strftime = counting
+    try:
+        lines = [logger._echo_line(LogEntry(i, ts, "INFO", f"m{i}", None))
+                 for i, ts in enumerate((100.1, 100.5, 100.9, 101.2))]
+    finally:
+        ams.time.strftime = original
+    assert len(calls) == 2
+    assert lines[0].endswith("m0") and lines[0][:10] == lines[2][:10] != lines[3][:10]
+
+
+def test_level_filter_and_cursor():
+    logger = RealTimeLogger(echo=False, min_level="INFO")
+    logger.log("DEBUG", "descartada")
+    logger.log("INFO", "a")
+    logger.log("ERROR", "b")
+
+    assert logger.total_logged == 2
+    assert [entry.message for entry in logger.after(1)] == ["b"]
+    assert [entry.message for entry in logger.recent(min_level="ERROR")] == ["b"]
+
+
+if __name__ == "__main__":
+    for test in (test_callbacks_receive_json_serialisable_dicts, test_raw_subscribers_receive_log_entries,
+                 test_delivery_is_batched_inside_the_event_loop, test_timestamps_are_formatted_lazily,
+                 test_echo_formats_the_clock_once_per_second, test_level_filter_and_cursor):
+        test()
+        print(f"✅ {test.__name__}")
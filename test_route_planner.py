@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Testes do planejador de rotas: falha e volta de enlaces, reparo incremental
+"""
+
+import math
+
+from clock import get_clock
+from network_topology import grid
+from route_planner import RoutePlanner
+
+
+class FlatSimulator:
+    """Simulador mínimo: todos os nós disponíveis com a mesma pontuação"""
+
+    def __init__(self, topology):
+        self.topology = topology
+        self.down = set()
+
+    def is_available(self, name: str) -> bool:
+        return name not in self.down
+
+    def calculate_route_score(self, name: str) -> float:
+        return 0.0
+
+
+def line_with_detour():
+    """Grade 3x2: o caminho direto n0 -> n1 -> n2 e o desvio pela linha de baixo"""
+    return FlatSimulator(grid(3, 2))
+
+
+def test_failed_link_is_avoided():
+    simulator = line_with_detour()
+    planner = RoutePlanner(simulator, failure_cooldown=30.0)
+    source, target = simulator.topology.name(0), simulator.topology.name(2)
+
+    direct = planner.path(source, target)
+    assert len(direct) == 3
+
+    planner.fail_link(direct[0], direct[1])
+    detour = planner.path(source, target)
+    assert detour[1] != direct[1]
+    assert len(detour) == 5
+
+
+def test_failed_link_is_restored_after_cooldown():
+    simulator = line_with_detour()
+    planner = RoutePlanner(simulator, failure_cooldown=30.0)
+    source, target = simulator.topology.name(0), simulator.topology.name(2)
+    direct = planner.path(source, target)
+    direct_cost = planner.cost(source, target)
+
+    failed_at = get_clock().time()
+    planner.fail_link(direct[0], direct[1], now=failed_at)
+    assert planner.expire_failures(now=failed_at + 10.0) == 0
+    assert planner.cost(source, target) > direct_cost
+
+    assert planner.expire_failures(now=failed_at + 30.0) == 1
+    assert planner.path(source, target) == direct
+    assert planner.cost(source, target) == direct_cost
+
+
+def test_repair_matches_full_rebuild():
+    simulator = FlatSimulator(grid(8, 8))
+    planner = RoutePlanner(simulator)
+    names = list(simulator.topology.node_names())
+    destination = names[-1]
+    planner.path(names[0], destination)
+
+    path = planner.path(names[0], destination)
+    for hop in range(len(path) - 1):
+        planner.fail_link(path[hop], path[hop + 1])
+    assert planner.trees_built == 1 and planner.repairs > 0
+
+    rebuilt = RoutePlanner(simulator)
+    for source, target in planner._failed_links:
+        rebuilt.fail_link(simulator.topology.name(source), simulator.topology.name(target))
+    for name in names:
+        assert planner.cost(name, destination) == rebuilt.cost(name, destination)
+
+
+def test_unreachable_destination():
+    simulator = line_with_detour()
+    planner = RoutePlanner(simulator)
+    source, target = simulator.topology.name(0), simulator.topology.name(2)
+    simulator.down.update({simulator.topology.name(1), simulator.topology.name(4)})
+    planner.invalidate()
+
+    assert planner.path(source, target) == []
+    assert planner.next_hop(source, target) is None
+    assert planner.cost(source, target) == math.inf
+
+
+if __name__ == "__main__":
+    for test in (test_failed_link_is_avoided, test_failed_link_is_restored_after_cooldown,
+                 test_repair_matches_full_rebuild, test_unreachable_destination):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Testes da tabela de roteamento indexada e do distance-vector
+"""
+
+from adaptive_messenger import NetworkRoute, NetworkType
+from routing_table import DistanceVectorTable, RoutingTable
+
+
+def _route(next_hop: str, network_type: NetworkType = NetworkType.WIFI, latency: float = 10.0,
+           signal_strength: float = 1.0) -> NetworkRoute:
+    return NetworkRoute(network_type=network_type, signal_strength=signal_strength, latency=latency,
+                        available=True, next_hop=next_hop)
+
+
+def test_best_route_follows_score_index():
+    table = RoutingTable()
+    table.upsert(_route("B", latency=30.0), now=0.0)
+    table.upsert(_route("C", latency=10.0), now=0.0)
+    table.upsert(_route("C", NetworkType.LORA, latency=300.0), now=0.0)
+
+    assert table.best().next_hop == "C"
+    assert [route.next_hop for _, route in table.iter_by_type(NetworkType.WIFI)] == ["C", "B"]
+
+    # Atualização no lugar reordena o índice
+    table.upsert(_route("C", latency=50.0), now=1.0)
+    assert table.best().next_hop == "B"
+    assert table.best_route_to("C").latency == 50.0
+
+
+def test_change_feed_and_ageing():
+    table = RoutingTable(max_age=30.0, failure_cooldown=10.0, failure_threshold=2)
+    events = []
+    table.subscribe(lambda event, route: events.append((event, route.next_hop)))
+
+    route = _route("B")
+    assert table.upsert(route, now=0.0) == "added"
+    assert table.upsert(_route("B"), now=1.0) is None  # Nada mudou: nada publicado
+
+    assert table.record_failure(route, now=2.0) is False
+    assert route.available
+    assert table.record_failure(route, now=3.0) is True
+    assert table.best() is None
+
+    assert table.age(now=13.0) == {"removed": 0, "restored": 1}
+    assert table.best() is route
+    assert table.age(now=31.0) == {"removed": 1, "restored": 0}
+    assert "B" not in table
+
+    assert events == [("added", "B"), ("failed", "B"), ("restored", "B"), ("removed", "B")]
+
+
+def test_success_resets_failure_count():
+    table = RoutingTable(failure_threshold=2)
+    route = _route("B")
+    table.upsert(route, now=0.0)
+
+    table.record_failure(route, now=1.0)
+    table.record_success(route)
+    assert table.record_failure(route, now=2.0) is False
+    assert route.available
+
+
+def test_distance_vector_split_horizon():
+    table = DistanceVectorTable("A")
+    table.set_link("B", 1.0)
+    table.receive_advertisement("B", {"B": (0.0, 0), "D": (2.0, 1)})
+
+    assert table.next_hop("D") == "B"
+    assert table.cost("D") == 3.0
+
+    # Rotas aprendidas de B não voltam para B
+    assert "D" not in table.build_advertisement("B")
+    assert table.build_advertisement("C")["D"] == (3.0, 2)
+
+    # Em updates incrementais o destino é retirado de B com custo infinito
+    assert table.build_advertisement("B", {"D"}) == {"D": (DistanceVectorTable.INFINITY, 0)}
+
+
+def test_distance_vector_keeps_adverts_while_link_waits():
+    table = DistanceVectorTable("A")
+    table.set_link("B", 1.0)
+    table.receive_advertisement("B", {"D": (2.0, 1)})
+
+    table.set_link("B", None, keep_adverts=True)
+    assert table.next_hop("D") is None
+    table.set_link("B", 1.0)
+    assert table.next_hop("D") == "B"
+
+    table.set_link("B", None)
+    table.set_link("B", 1.0)
+    assert table.next_hop("D") is None  # Sem keep_adverts o anúncio foi esquecido
+
+
+if __name__ == "__main__":
+    for test in (test_best_route_follows_score_index, test_change_feed_and_ageing,
+                 test_success_resets_failure_count, test_distance_vector_split_horizon,
+                 test_distance_vector_keeps_adverts_while_link_waits):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Testes do cache de pensamentos: chave normalizada, LRU, TTL e persistência em SQLite
+"""
+
+import os
+import tempfile
+
+from clock import set_clock
+from thought_cache import ThoughtCache, failure_bucket, fingerprint, normalize_context
+
+
+class ManualClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+def _with_clock(test):
+    def run():
+        clock = ManualClock()
+        previous = set_clock(clock)
+        try:
+            test(clock)
+        finally:
+            set_clock(previous)
+    run.__name__ = test.__name__
+    return run
+
+
+def test_similar_situations_share_a_key():
+    first = normalize_context("Falhou  3 vezes em ['wifi', 'lora'] a 12.5 m")
+    second = normalize_context("falhou 7 vezes em ['lora','wifi'] a 3 m")
+    assert first == second
+    assert fingerprint("node_1", first, failure_bucket(3)) == fingerprint("node_1", second, failure_bucket(2))
+    assert [failure_bucket(n) for n in (0, 1, 2, 3, 4, 7, 8, 100)] == [0, 1, 2, 2, 3, 3, 4, 4]
+
+
+@_with_clock
+def test_entries_expire_after_ttl(clock):
+    cache = ThoughtCache(ttl=60.0)
+    cache.put("k", "seguir pelo wifi")
+    assert cache.get("k") == "seguir pelo wifi"
+
+    clock.now += 59.0
+    assert cache.get("k") == "seguir pelo wifi"
+    clock.now += 1.0
+    assert cache.get("k") is None
+    assert cache.stats()["hits"] == 2 and cache.misses == 1 and cache.expirations == 1 and len(cache) == 0
+
+
+@_with_clock
+def test_least_recently_used_is_evicted(clock):
+    cache = ThoughtCache(capacity=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.get("a")  # "b" passa a ser o menos usado
+    cache.put("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+    assert cache.evictions == 1
+
+
+@_with_clock
+def test_purge_expired(clock):
+    cache = ThoughtCache(ttl=10.0)
+    cache.put("curto", "x")
+    cache.put("longo", "y", ttl=100.0)
+    clock.now += 20.0
+
+    assert cache.purge_expired() == 1
+    assert len(cache) == 1 and cache.get("longo") == "y"
+
+
+@_with_clock
+def test_sqlite_survives_a_restart(clock):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "thoughts.db")
+        cache = ThoughtCache(ttl=60.0, path=path)
+        cache.put("k", "ancorar aqui")
+        cache.put("vencido", "z", ttl=5.0)
+        cache.close()
+
+        clock.now += 30.0
+        reloaded = ThoughtCache(ttl=60.0, path=path)
+        assert len(reloaded) == 0
+        assert reloaded.get("k") == "ancorar aqui"  # Vem do disco e sobe para a memória
+        assert reloaded.get("k") == "ancorar aqui"
+        assert reloaded.get("vencido") is None
+        assert reloaded.disk_hits == 1 and reloaded.hits == 1 and reloaded.misses == 1
+
+        clock.now += 31.0  # O vencimento gravado vale também depois de recarregar
+        assert reloaded.get("k") is None
+        reloaded.close()
+
+
+if __name__ == "__main__":
+    for test in (test_similar_situations_share_a_key, test_entries_expire_after_ttl,
+                 test_least_recently_used_is_evicted, test_purge_expired, test_sqlite_survives_a_restart):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Testes do agrupamento de transmissões por enlace
+"""
+
+import asyncio
+
+from transmission_batcher import TransmissionBatcher, decode_bundle, encode_bundle, frame_size
+
+
+class Frame:
+    def __init__(self, id: str, payload: bytes = b"dados"):
+        self.id = id
+        self.payload = payload
+
+
+class Route:
+    next_hop = "B"
+    network_type = "lora"
+
+
+def test_bundle_round_trip_with_long_non_ascii_ids():
+    frames = [Frame("ç" * 200), Frame("id_curto", b"")]
+    assert decode_bundle(encode_bundle(frames)) == [(frame.id, frame.payload) for frame in frames]
+    assert frame_size(frames[0]) == 6 + 400 + 5  # Cabeçalho + id em bytes UTF-8 + conteúdo
+
+
+def test_messages_share_one_bundle():
+    sent = []
+
+    async def send_bundle(route, messages, data):
+        sent.append(len(messages))
+        return [True] * len(messages)
+
+    async def main():
+        batcher = TransmissionBatcher(send_bundle, {"lora": 0.01})
+        return await asyncio.gather(*(batcher.submit(Frame(f"m{i}"), Route()) for i in range(5)))
+
+    assert asyncio.run(main()) == [True] * 5
+    assert sent == [5]
+
+
+def test_send_error_fails_bundle_and_is_reported():
+    errors = []
+
+    async def send_bundle(route, messages, data):
+        raise ConnectionError("enlace caiu")
+
+    async def main():
+        batcher = TransmissionBatcher(send_bundle, {"lora": 0.01},
+                                      on_error=lambda route, messages, e: errors.append((len(messages), e)))
+        results = await asyncio.gather(*(batcher.submit(Frame(f"m{i}"), Route()) for i in range(3)))
+        return batcher, results
+
+    batcher, results = asyncio.run(main())
+    assert results == [False] * 3
+    assert batcher.bundles_failed == 1 and batcher.bundles_sent == 0
+    assert len(errors) == 1 and errors[0][0] == 3 and isinstance(errors[0][1], ConnectionError)
+
+
+def test_oversized_id_is_rejected_alone():
+    async def send_bundle(route, messages, data):
+        return [True] * len(messages)
+
+    async def main():
+        batcher = TransmissionBatcher(send_bundle, {"lora": 0.01})
+        try:
+            await batcher.submit(Frame("x" * 70_000), Route())
+        except ValueError:
+            rejected = True
+        else:
+            rejected = False
+        return rejected, await batcher.submit(Frame("ok"), Route())
+
+    assert asyncio.run(main()) == (True, True)
+
+
+if __name__ == "__main__":
+    for test in (test_bundle_round_trip_with_long_non_ascii_ids, test_messages_share_one_bundle,
+                 test_send_error_fails_bundle_and_is_reported, test_oversized_id_is_rejected_alone):
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,150 @@
+import hashlib
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from clock import get_clock
+
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LIST = re.compile(r"\[([^\[\]]*)\]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_context(context: str) -> str:
+    """Remove o que é volátil no contexto: números soltos, ordem de listas e espaços"""
+    text = _LIST.sub(lambda m: "[" + ",".join(sorted(item.strip(" '\"") for item in m.group(1).split(","))) + "]", context)
+    text = _NUMBER.sub("#", text)
+    return _SPACES.sub(" ", text).strip().lower()
+
+
+def failure_bucket(failures: int) -> int:
+    """Faixa de falhas: 0, 1, 2-3, 4-7, 8+"""
+    return min(failures.bit_length(), 4)
+
+
+def fingerprint(*parts: Any) -> str:
+    """Chave estável da situação a partir das partes já normalizadas"""
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+
+class ThoughtCache:
+    """
+    Cache de pensamentos com TTL e expulsão LRU.
+
+    A chave é uma impressão digital da situação (localização, conjunto de
+    rotas, faixa de falhas, estratégia física) em vez do prompt literal, então
+    mensagens em situações parecidas reaproveitam a decisão. Com `path` os
+    pensamentos também vão para um SQLite (modo WAL) compartilhado entre
+    processos; a memória funciona como primeiro nível.
+    """
+
+    def __init__(self, capacity: int = 1024, ttl: float = 300.0, path: Optional[str] = None):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.path = path
+        self._entries: 'OrderedDict[str, Tuple[float, str]]' = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS thoughts (key TEXT PRIMARY KEY, thought TEXT, expires REAL)")
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[str]:
+        now = get_clock().time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, thought = entry
+            if expires > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return thought
+            del self._entries[key]
+            self.expirations += 1
+
+        if self._db is not None:
+            with self._db_lock:
+                row = self._db.execute("SELECT thought, expires FROM thoughts WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[1] > now:
+                self._remember(key, row[1], row[0])
+                self.disk_hits += 1
+                return row[0]
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, thought: str, ttl: Optional[float] = None):
+        expires = get_clock().time() + (self.ttl if ttl is None else ttl)
+        self._remember(key, expires, thought)
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("INSERT OR REPLACE INTO thoughts (key, thought, expires) VALUES (?, ?, ?)",
+                                 (key, thought, expires))
+
+    def _remember(self, key: str, expires: float, thought: str):
+        self._entries[key] = (expires, thought)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def purge_expired(self) -> int:
+        """Remove entradas vencidas da memória e do disco; retorna quantas saíram da memória"""
+        now = get_clock().time()
+        expired = [key for key, (expires, _) in self._entries.items() if expires <= now]
+        for key in expired:
+            del self._entries[key]
+        self.expirations += len(expired)
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM thoughts WHERE expires <= ?", (now,))
+        return len(expired)
+
+    def clear(self):
+        self._entries.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM thoughts")
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+
+_thought_cache: Optional[ThoughtCache] = ThoughtCache()
+
+
+def get_thought_cache() -> Optional[ThoughtCache]:
+    return _thought_cache
+
+
+def set_thought_cache(cache: Optional[ThoughtCache]) -> Optional[ThoughtCache]:
+    """Troca o cache global (None desliga o cache); retorna o anterior"""
+    global _thought_cache
+    previous = _thought_cache
+    _thought_cache = cache
+    return previous
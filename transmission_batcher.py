@@ -0,0 +1,143 @@
+import asyncio
+import struct
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Cabeçalho do pacote: quantidade de quadros
+_BUNDLE_HEADER = struct.Struct("!H")
+# Cabeçalho de cada quadro: tamanho do id (bytes UTF-8) e tamanho do conteúdo
+_FRAME_HEADER = struct.Struct("!HI")
+_MAX_ID_BYTES = 0xFFFF
+
+
+def encode_bundle(messages: List[Any]) -> bytes:
+    """Enquadra mensagens em um único pacote: [n] ([len id][len payload] id payload)*"""
+    parts = [_BUNDLE_HEADER.pack(len(messages))]
+    for message in messages:
+        message_id = message.id.encode('utf-8')
+        payload = message.payload
+        parts.append(_FRAME_HEADER.pack(len(message_id), len(payload)))
+        parts.append(message_id)
+        parts.append(payload)
+    return b"".join(parts)
+
+
+def decode_bundle(data: bytes) -> List[Tuple[str, bytes]]:
+    """Desfaz o enquadramento de um pacote em (id, payload)"""
+    (count,) = _BUNDLE_HEADER.unpack_from(data, 0)
+    offset = _BUNDLE_HEADER.size
+    frames = []
+    for _ in range(count):
+        id_length, payload_length = _FRAME_HEADER.unpack_from(data, offset)
+        offset += _FRAME_HEADER.size
+        message_id = data[offset:offset + id_length].decode('utf-8')
+        offset += id_length
+        frames.append((message_id, data[offset:offset + payload_length]))
+        offset += payload_length
+    return frames
+
+
+def frame_size(message: Any) -> int:
+    """Bytes que a mensagem ocupa no pacote (id medido em UTF-8, como é enquadrado)"""
+    return _FRAME_HEADER.size + len(message.id.encode('utf-8')) + len(message.payload)
+
+
+class _Batch:
+    __slots__ = ('route', 'items', 'size', 'timer')
+
+    def __init__(self, route):
+        self.route = route
+        self.items: List[Tuple[Any, asyncio.Future]] = []
+        self.size = _BUNDLE_HEADER.size
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class TransmissionBatcher:
+    """
+    Agrupa mensagens para o mesmo (next_hop, network_type) em um pacote.
+
+    Cada lote é enviado quando a janela do meio expira ou quando atinge o
+    orçamento de bytes/mensagens, pagando a latência do enlace uma única vez.
+    submit() devolve o resultado individual de cada mensagem. Erros do
+    envio marcam o pacote inteiro como falho e são repassados a on_error.
+    """
+
+    def __init__(self, send_bundle: Callable[[Any, List[Any], bytes], Awaitable[List[bool]]],
+                 windows: Dict[Any, float], max_bytes: int = 4096, max_messages: int = 64,
+                 on_error: Optional[Callable[[Any, List[Any], Exception], None]] = None):
+        self.send_bundle = send_bundle
+        self.on_error = on_error          # on_error(rota, mensagens, exceção)
+        self.windows = windows            # tipo de rede -> janela de agrupamento (s)
+        self.max_bytes = max_bytes
+        self.max_messages = max_messages
+        self._pending: Dict[Tuple[str, Any], _Batch] = {}
+        self._sending = set()  # Envios em andamento (mantém referência às tarefas)
+
+        self.bundles_sent = 0
+        self.bundles_failed = 0
+        self.messages_sent = 0
+
+    def enabled_for(self, route) -> bool:
+        return self.windows.get(route.network_type, 0.0) > 0.0
+
+    async def submit(self, message, route) -> bool:
+        """Adiciona a mensagem ao lote do enlace e espera o resultado do envio"""
+        return await self.enqueue(message, route)
+
+    def enqueue(self, message, route) -> asyncio.Future:
+        """Adiciona a mensagem ao lote do enlace; o future recebe o resultado do envio"""
+        loop = asyncio.get_running_loop()
+        key = (route.next_hop, route.network_type)
+
+        size = frame_size(message)
+        if len(message.id.encode('utf-8')) > _MAX_ID_BYTES:
+            # Recusa só esta mensagem em vez de derrubar o pacote inteiro no enquadramento
+            raise ValueError(f"id de mensagem longo demais para o quadro: {message.id[:32]}...")
+        batch = self._pending.get(key)
+        if batch is not None and batch.size + size > self.max_bytes:
+            self._flush(key)
+            batch = None
+
+        if batch is None:
+            batch = self._pending[key] = _Batch(route)
+            batch.timer = loop.call_later(self.windows[route.network_type], self._flush, key)
+
+        future = loop.create_future()
+        batch.items.append((message, future))
+        batch.size += size
+
+        if len(batch.items) >= self.max_messages or batch.size >= self.max_bytes:
+            self._flush(key)
+
+        return future
+
+    def flush_all(self):
+        """Envia imediatamente todos os lotes pendentes"""
+        for key in list(self._pending):
+            self._flush(key)
+
+    def _flush(self, key: Tuple[str, Any]):
+        batch = self._pending.pop(key, None)
+        if batch is None:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+        task = asyncio.ensure_future(self._send(batch))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _send(self, batch: _Batch):
+        messages = [message for message, _ in batch.items]
+        results: List[bool] = []
+        try:
+            results = await self.send_bundle(batch.route, messages, encode_bundle(messages))
+            self.bundles_sent += 1
+            self.messages_sent += len(messages)
+        except Exception as e:
+            self.bundles_failed += 1
+            if self.on_error is not None:
+                self.on_error(batch.route, messages, e)
+        finally:
+            # Toda mensagem recebe um resultado, mesmo com erro ou cancelamento
+            for index, (_, future) in enumerate(batch.items):
+                if not future.done():
+                    future.set_result(bool(results[index]) if index < len(results) else False)